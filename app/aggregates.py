@@ -0,0 +1,230 @@
+# Per-business rating aggregates.
+# `business_daily_ratings` holds one review count per (business, UTC day, rating).
+# Ingest adds the counts of the reviews it actually inserts in the same
+# transaction as the reviews themselves (`record_new_reviews`), so the table
+# never needs a rescan of `reviews`; reads roll daily buckets up to months in
+# Python, costing O(buckets) per business. `rebuild` recomputes the table from
+# `reviews` and `check` reports drift without writing:
+#
+#     python -m app.aggregates --check
+#     python -m app.aggregates --rebuild
+
+import argparse
+from collections import defaultdict
+from typing import Iterable
+
+import pandas as pd
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, engine
+from .models import BusinessDailyRating, Review
+from app.constants import F_BUSINESS_ID, F_CREATED_AT, F_DAY, F_RATING, F_REVIEW_COUNT
+
+# Rating bucket for reviews without a (valid integer) rating.
+UNRATED = 0
+# Ratings always present in a histogram, even with a zero count.
+RATING_SCALE = [1, 2, 3, 4, 5]
+
+
+def daily_rating_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Count review rows per (business, UTC day, rating).
+
+    Ratings are coerced like the loader does for the integer `rating`
+    column; missing or non-integer ratings count as `UNRATED`. Rows without
+    `created_at` fall on today's date, matching the column's load-time default.
+
+    Args:
+        df: Normalised review rows (`business_id`, optional `rating`, `created_at`).
+
+    Returns:
+        pandas.DataFrame with columns business_id, day (datetime.date), rating, review_count.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=[F_BUSINESS_ID, F_DAY, F_RATING, F_REVIEW_COUNT])
+    now = pd.Timestamp.now(tz="UTC")
+    if F_CREATED_AT in df.columns:
+        created = pd.to_datetime(df[F_CREATED_AT], errors="coerce", utc=True).fillna(now)
+    else:
+        created = pd.Series(now, index=df.index)
+    if F_RATING in df.columns:
+        num = pd.to_numeric(df[F_RATING], errors="coerce")
+        rating = num.where(num == num.round()).fillna(UNRATED).astype("int64")
+    else:
+        rating = pd.Series(UNRATED, index=df.index, dtype="int64")
+    keys = pd.DataFrame({
+        F_BUSINESS_ID: df[F_BUSINESS_ID].astype(str),
+        F_DAY: created.dt.floor("D"),
+        F_RATING: rating,
+    })
+    counts = keys.groupby([F_BUSINESS_ID, F_DAY, F_RATING], sort=False).size().reset_index(name=F_REVIEW_COUNT)
+    counts[F_DAY] = counts[F_DAY].dt.date
+    return counts
+
+
+def _dialect_name(conn) -> str:
+    bind = conn if hasattr(conn, "dialect") else conn.get_bind()
+    return bind.dialect.name
+
+
+def _upsert(session: Session):
+    table = BusinessDailyRating.__table__
+    dialect = postgresql if _dialect_name(session) == "postgresql" else sqlite
+    stmt = dialect.insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.business_id, table.c.day, table.c.rating],
+        set_={F_REVIEW_COUNT: table.c.review_count + stmt.excluded.review_count},
+    )
+
+
+def add_counts(session: Session, counts: pd.DataFrame) -> int:
+    """Add `counts` onto the stored buckets (insert or increment). Does not commit.
+
+    Args:
+        session: SQLAlchemy Session.
+        counts: Output of `daily_rating_counts`.
+
+    Returns:
+        int: number of buckets touched.
+    """
+    if counts.empty:
+        return 0
+    conn = session.connection()
+    stmt = _upsert(session)
+    columns = {
+        F_BUSINESS_ID: counts[F_BUSINESS_ID].tolist(),
+        F_DAY: counts[F_DAY].tolist(),
+        F_RATING: counts[F_RATING].astype(int).tolist(),
+        F_REVIEW_COUNT: counts[F_REVIEW_COUNT].astype(int).tolist(),
+    }
+    if conn.dialect.name == "sqlite":
+        # Precompiled executemany with positional tuples, as in app/loader.py;
+        # days are bound in the `YYYY-MM-DD` text form the Date type stores.
+        columns[F_DAY] = [day.isoformat() for day in columns[F_DAY]]
+        compiled = stmt.compile(dialect=conn.dialect)
+        conn.exec_driver_sql(compiled.string, list(zip(*(columns[name] for name in compiled.positiontup))))
+    else:
+        conn.execute(stmt, [dict(zip(columns, values)) for values in zip(*columns.values())])
+    return len(counts)
+
+
+def record_new_reviews(session: Session, df: pd.DataFrame) -> int:
+    """Count freshly inserted review rows into the aggregates (see `add_counts`).
+
+    `df` must hold only the rows the insert actually added; ingest selects
+    them by the keys its `INSERT ... RETURNING` reported.
+    """
+    return add_counts(session, daily_rating_counts(df))
+
+
+def _aggregate_select(dialect_name: str):
+    """`SELECT business_id, day, rating, count(*)` over `reviews`, grouped into buckets."""
+    if dialect_name == "sqlite":
+        day = func.date(Review.created_at)
+    else:
+        day = cast(func.timezone("UTC", Review.created_at), Date)
+    rating = func.coalesce(Review.rating, UNRATED)
+    return (
+        select(Review.business_id, day, rating, func.count())
+        .where(Review.created_at.is_not(None))
+        .group_by(Review.business_id, day, rating)
+    )
+
+
+def rebuild(conn) -> int:
+    """Recompute `business_daily_ratings` from `reviews` with one grouped scan.
+
+    Args:
+        conn: SQLAlchemy Connection or Session (the caller owns the transaction).
+
+    Returns:
+        int: number of buckets written.
+    """
+    table = BusinessDailyRating.__table__
+    conn.execute(delete(table))
+    conn.execute(
+        insert(table).from_select(
+            [F_BUSINESS_ID, F_DAY, F_RATING, F_REVIEW_COUNT], _aggregate_select(_dialect_name(conn))
+        )
+    )
+    return conn.scalar(select(func.count()).select_from(table))
+
+
+def check(conn) -> list[tuple]:
+    """Compare stored buckets with a fresh aggregation of `reviews`.
+
+    Args:
+        conn: SQLAlchemy Connection or Session.
+
+    Returns:
+        list[tuple]: (business_id, day, rating, stored count, actual count) for every bucket that differs.
+    """
+    actual = {(b, str(d), r): n for b, d, r, n in conn.execute(_aggregate_select(_dialect_name(conn)))}
+    stored = {
+        (b, str(d), r): n
+        for b, d, r, n in conn.execute(
+            select(BusinessDailyRating.business_id, BusinessDailyRating.day, BusinessDailyRating.rating, BusinessDailyRating.review_count)
+        )
+    }
+    return sorted(
+        (*key, stored.get(key, 0), actual.get(key, 0))
+        for key in stored.keys() | actual.keys()
+        if stored.get(key, 0) != actual.get(key, 0)
+    )
+
+
+def _summary(histogram: dict) -> dict:
+    rated = sum(n for r, n in histogram.items() if r != UNRATED)
+    total = sum(histogram.values())
+    rating_sum = sum(r * n for r, n in histogram.items() if r != UNRATED)
+    return {
+        "review_count": total,
+        "rated_count": rated,
+        "average_rating": round(rating_sum / rated, 4) if rated else None,
+        "histogram": {str(r): histogram.get(r, 0) for r in sorted(set(RATING_SCALE) | histogram.keys() - {UNRATED})},
+    }
+
+
+def summarise_rating_counts(rows: Iterable[tuple], granularity: str = "month") -> dict:
+    """Roll daily (day, rating, count) buckets up into totals and per-period histograms.
+
+    Args:
+        rows: (day, rating, review_count) tuples ordered by day.
+        granularity: "day" (periods `YYYY-MM-DD`) or "month" (`YYYY-MM`).
+
+    Returns:
+        dict: `total` and a `buckets` list, each with review_count, rated_count,
+        average_rating (None without rated reviews) and a rating histogram.
+    """
+    width = 10 if granularity == "day" else 7
+    periods = defaultdict(lambda: defaultdict(int))
+    total = defaultdict(int)
+    for day, rating, count in rows:
+        periods[str(day)[:width]][rating] += count
+        total[rating] += count
+    return {
+        "total": _summary(total),
+        "buckets": [{"period": period, **_summary(histogram)} for period, histogram in periods.items()],
+    }
+
+
+if __name__ == "__main__":
+    from .migrate import upgrade
+
+    parser = argparse.ArgumentParser(description="Check or rebuild per-business rating aggregates")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--check", action="store_true", help="Report buckets that differ from a fresh aggregation of reviews")
+    mode.add_argument("--rebuild", action="store_true", help="Recompute the aggregates table from reviews")
+    args = parser.parse_args()
+    upgrade(engine)
+    with SessionLocal() as session:
+        if args.rebuild:
+            print(f"Rebuilt {rebuild(session)} bucket(s).")
+            session.commit()
+        else:
+            drift = check(session)
+            for business_id, day, rating, stored, actual in drift:
+                print(f"{business_id} {day} rating={rating}: stored {stored}, actual {actual}")
+            print(f"{len(drift)} bucket(s) differ." if drift else "Aggregates are consistent.")
+            raise SystemExit(1 if drift else 0)
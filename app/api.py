@@ -1,46 +1,302 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from fastapi.responses import StreamingResponse
-import csv, io
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+import csv
+import io
+import json
+import os
 from datetime import date
-from typing import Optional, Annotated
+from typing import Literal, Optional, Annotated
 
-from app.models import Business, Review, User
+from app.config import (
+    LOOKUP_MAX_IDS,
+    SEARCH_MAX_QUERY_CHARS,
+    SLOW_QUERY_SECONDS,
+    STREAM_BATCH_SIZE,
+    STREAM_CHUNK_BYTES,
+)
+from app.constants import EXPORT_COMPLETE, EXPORT_FORMATS, F_BUSINESS_ID, F_USER_ID, FMT_CSV
 from app.schemas import HEADERS
-from .database import get_db
-from .crud import query_reviews_by_business, query_reviews_by_user, get_user, to_expanded_review_dict, to_review_dict, to_user_dict
-from .pii import mask_row
+from sqlalchemy.ext.asyncio import AsyncResult
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from .database import get_db, pool_status
+from .aggregates import summarise_rating_counts
+from .compression import aiter_compressed, iter_compressed, negotiate_encoding
+from .cache import etag_matches, make_etag, make_key, response_cache
+from .crud import (
+    query_reviews_by_business, query_reviews_by_user, get_user_row, mask_user_row,
+    query_business_rating_counts, get_ingest_generation,
+    iter_users_by_ids, iter_reviews_by_businesses, search_reviews,
+)
+from .jobs import export_filename, export_media_type, get_job, job_status, submit_export
+from .metrics import PROMETHEUS_CONTENT_TYPE, render_metrics, slow_queries
+from .query import statement_cache
+from .search import parse_query
+from .export import ENCODERS, FILE_EXTENSIONS, MEDIA_TYPES, aiter_encoded, encode_csv, format_from_accept, iter_encoded
+from .utils import decode_cursor
 
 router = APIRouter()
 
-def stream_csv(dict_rows, headers, filename: str):
-    """Stream an iterable of dict rows as a CSV HTTP response.
+def stream_csv(
+    rows,
+    headers,
+    filename: str,
+    batch_size: int = STREAM_BATCH_SIZE,
+    chunk_bytes: int = STREAM_CHUNK_BYTES,
+    extra_headers: Optional[dict] = None,
+    encoding: Optional[str] = None,
+):
+    """Stream an iterable of tuple rows as a CSV HTTP response.
+
+    The header line is sent immediately; rows are then encoded (see
+    `encode_csv`) and flushed as bytes in chunks of up to `batch_size` rows
+    / about `chunk_bytes` bytes as they are pulled from `rows`, so a lazy
+    iterable (e.g. a server-side cursor) is never materialised in memory.
+    With an `encoding`, each chunk is compressed as it is produced.
 
     Args:
-        dict_rows: Iterable of dict-like rows (order implied by `headers`).
-        headers: List of column names (fieldnames for CSV DictWriter).
+        rows: Iterable of tuples in `headers` order.
+        headers: List of column names (CSV header line).
         filename: Suggested filename included in Content-Disposition header.
+        batch_size: Maximum rows encoded per yielded chunk.
+        chunk_bytes: Target bytes per yielded chunk.
+        extra_headers: Optional additional HTTP response headers.
+        encoding: Optional `Content-Encoding` (`gzip` or `zstd`, see `negotiate_content_encoding`).
 
     Returns:
-        fastapi.responses.StreamingResponse streaming CSV bytes/text.
+        fastapi.responses.StreamingResponse streaming CSV bytes.
     """
-    def iter_rows():
-        buf = io.StringIO()
-        writer = csv.DictWriter(buf, fieldnames=headers)
-        writer.writeheader()
-        yield buf.getvalue()
-        buf.seek(0); buf.truncate(0)
-        for row in dict_rows:
-            writer.writerow(row)
-            yield buf.getvalue()
-            buf.seek(0); buf.truncate(0)
-
+    body = encode_csv(rows, headers, batch_size, chunk_bytes)
     return StreamingResponse(
-        iter_rows(),
+        iter_compressed(body, encoding) if encoding else body,
         media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            **_encoding_headers(encoding),
+            **(extra_headers or {}),
+        },
+    )
+
+def _encoding_headers(encoding: Optional[str]) -> dict:
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+def stream_extract(
+    fmt: str,
+    items,
+    headers,
+    filename: str,
+    to_row=None,
+    extra_headers: Optional[dict] = None,
+    mask_pii: bool = False,
+    encoding: Optional[str] = None,
+):
+    """Stream query results in the negotiated extract format.
+
+    Every format is encoded from tuple rows in batches (see `app/export.py`),
+    without per-row dicts. An `AsyncResult` (async DB mode) or an async
+    iterator of row batches is consumed batch by batch on the event loop;
+    sync iterables are pulled in the threadpool by `StreamingResponse`.
+
+    Args:
+        fmt: One of `EXPORT_FORMATS` (see `negotiate_format`).
+        items: Iterable or AsyncResult of query results, or an async iterator of
+            row batches (lazy results stay lazy).
+        headers: List of column names, in output order.
+        filename: Suggested filename without extension.
+        to_row: Maps one item to a tuple row in `headers` order; None when
+            `items` already yields rows in that order (projected Core rows).
+        extra_headers: Optional additional HTTP response headers.
+        mask_pii: Mask the PII columns of `headers`, a whole column per batch.
+        encoding: Optional `Content-Encoding` (`gzip` or `zstd`); each encoded
+            chunk is compressed as it is produced, so the body is never buffered.
+
+    Returns:
+        fastapi.responses.StreamingResponse.
+    """
+    encoder = ENCODERS[fmt](headers, mask_pii=mask_pii)
+    if isinstance(items, AsyncResult) or hasattr(items, "__aiter__"):
+        batches = items.partitions() if isinstance(items, AsyncResult) else items
+        if to_row is not None:
+            batches = ([to_row(x) for x in batch] async for batch in batches)
+        body = aiter_encoded(encoder, batches)
+        if encoding:
+            body = aiter_compressed(body, encoding)
+    else:
+        body = iter_encoded(encoder, items if to_row is None else map(to_row, items))
+        if encoding:
+            body = iter_compressed(body, encoding)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{FILE_EXTENSIONS[fmt]}"',
+            **_encoding_headers(encoding),
+            **(extra_headers or {}),
+        },
     )
 
+def negotiate_format(request: Request, format: Optional[str] = None) -> str:
+    """Resolve the extract format from the `format` query param or `Accept` header.
+
+    Args:
+        request: Incoming request (for the `Accept` header).
+        format: Optional explicit format; wins over `Accept`.
+
+    Returns:
+        str: one of `EXPORT_FORMATS`; CSV when nothing specific is requested.
+    """
+    if format is not None:
+        if format not in EXPORT_FORMATS:
+            raise HTTPException(status_code=422, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        return format
+    return format_from_accept(request.headers.get("accept")) or FMT_CSV
+
+def negotiate_content_encoding(request: Request, fmt: str = Depends(negotiate_format)) -> Optional[str]:
+    """Resolve the `Content-Encoding` of a CSV extract from `Accept-Encoding`.
+
+    Args:
+        request: Incoming request (for the `Accept-Encoding` header).
+        fmt: Negotiated extract format; Parquet and Arrow are sent as they are.
+
+    Returns:
+        str | None: `zstd` or `gzip`, or None for an uncompressed body.
+    """
+    if fmt != FMT_CSV:
+        return None
+    return negotiate_encoding(request.headers.get("accept-encoding"))
+
+async def cached_response(request: Request, db, key: str, build, as_of: Optional[int] = None):
+    """Serve a response from the in-process cache, or build it and cache it while streaming.
+
+    The ETag is derived from `key` and the current ingest generation, so a
+    matching `If-None-Match` is answered with 304 without running the query.
+    Every response reports that generation in `X-Ingest-Generation`, for
+    clients to pin later pages with `as_of`.
+
+    Args:
+        request: Incoming request (for `If-None-Match`).
+        db: DB session dependency (reads the ingest generation).
+        key: Cache key from `make_key` (endpoint, path params, format, filters).
+        build: Async callable returning the `StreamingResponse` on a cache miss.
+        as_of: Snapshot generation requested by the client; one not yet
+            committed is rejected, as later commits would change its rows.
+
+    Returns:
+        fastapi.responses.Response: 304, a cached body, or the streaming response.
+    """
+    generation = await get_ingest_generation(db)
+    if as_of is not None and as_of > generation:
+        raise HTTPException(status_code=422, detail=f"as_of is ahead of the current ingest generation ({generation})")
+    etag = make_etag(key, generation)
+    validators = {"ETag": etag, "Cache-Control": "private, no-cache", "X-Ingest-Generation": str(generation)}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=validators)
+    entry = response_cache.get(key, generation)
+    if entry is not None:
+        return Response(entry.body, headers={**entry.headers, **validators, "X-Cache": "hit"})
+    response = await build()
+    response.headers.update({**validators, "X-Cache": "miss"})
+    return response_cache.capture(key, generation, response)
+
+def parse_ids(text: str, header_names: tuple = ()) -> list[str]:
+    """Parse newline-delimited ids, or a CSV whose first column holds the ids.
+
+    Blank lines are skipped, as is a first line naming the column (e.g. `user_id`).
+
+    Args:
+        text: Uploaded or posted text.
+        header_names: Column names recognised as a header line.
+
+    Returns:
+        list[str]: ids in input order (duplicates kept).
+    """
+    ids = [row[0].strip() for row in csv.reader(io.StringIO(text)) if row and row[0].strip()]
+    if ids and ids[0] in header_names:
+        ids = ids[1:]
+    return ids
+
+async def read_id_batch(request: Request, header_names: tuple = ("id",)) -> list[str]:
+    """Read a batch of ids from the request body.
+
+    Accepted bodies: JSON (`["a", "b"]` or `{"ids": [...]}`), a multipart
+    upload (`file` field) of newline-delimited ids or a CSV with ids in the
+    first column, or the same text posted directly (`text/plain`, `text/csv`).
+
+    Args:
+        request: Incoming request.
+        header_names: Column names skipped as a header line in text/CSV input.
+
+    Returns:
+        list[str]: distinct ids in first-seen order.
+
+    Raises:
+        HTTPException: 422 for an unreadable or empty batch, 413 above `LOOKUP_MAX_IDS`.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid JSON body")
+        ids = payload.get("ids") if isinstance(payload, dict) else payload
+        if not isinstance(ids, list):
+            raise HTTPException(status_code=422, detail='JSON body must be a list of ids or {"ids": [...]}')
+        ids = [str(i) for i in ids if i is not None and str(i) != ""]
+    elif content_type.startswith("multipart/form-data"):
+        upload = (await request.form()).get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=422, detail="Multipart body must include a `file` field")
+        ids = parse_ids((await upload.read()).decode("utf-8-sig"), header_names)
+    else:
+        ids = parse_ids((await request.body()).decode("utf-8-sig"), header_names)
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=422, detail="No ids supplied")
+    if len(ids) > LOOKUP_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"At most {LOOKUP_MAX_IDS} ids per request")
+    return ids
+
+async def user_id_batch(request: Request) -> list[str]:
+    """`read_id_batch` dependency for user ids."""
+    return await read_id_batch(request, ("id", F_USER_ID))
+
+async def business_id_batch(request: Request) -> list[str]:
+    """`read_id_batch` dependency for business ids."""
+    return await read_id_batch(request, ("id", F_BUSINESS_ID))
+
+def page_headers(next_cursor: Optional[str]) -> dict:
+    """Build pagination response headers.
+
+    Args:
+        next_cursor: opaque cursor for the next page, or None on the last page.
+
+    Returns:
+        dict: `X-Next-Cursor` header when another page exists, else empty.
+    """
+    return {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+def parse_search(q: Annotated[Optional[str], Query(max_length=SEARCH_MAX_QUERY_CHARS)] = None) -> Optional[list]:
+    """Parse the `q` full-text parameter into search terms.
+
+    Words are ANDed; a trailing `*` makes a word a prefix (`deliv*`). Other
+    punctuation is ignored, so any input is a valid query.
+
+    Args:
+        q: Raw query string, or None.
+
+    Returns:
+        list | None: (term, is_prefix) pairs, or None when `q` is absent.
+    """
+    if q is None:
+        return None
+    terms = parse_query(q)
+    if not terms:
+        raise HTTPException(status_code=422, detail="q must contain at least one word")
+    return terms
+
 def validate_review_filters(
     min_rating: Annotated[Optional[int], Query(ge=1, le=5)] = None,
     max_rating: Annotated[Optional[int], Query(ge=1, le=5)] = None,
@@ -48,6 +304,10 @@ def validate_review_filters(
     end_date: Optional[date] = None,
     limit: Annotated[int, Query(gt=0, le=1000)] = 100,
     offset: Annotated[int, Query(ge=0)] = 0,
+    cursor: Optional[str] = None,
+    q: Annotated[Optional[str], Query(max_length=SEARCH_MAX_QUERY_CHARS)] = None,
+    as_of: Annotated[Optional[int], Query(ge=0)] = None,
+    since: Annotated[Optional[int], Query(ge=0)] = None,
 ):
     """Validate and normalise common query parameters used by review endpoints.
 
@@ -58,14 +318,29 @@ def validate_review_filters(
         end_date: Optional exclusive end date.
         limit: Pagination limit (1..1000).
         offset: Pagination offset (>=0).
+        cursor: Opaque keyset cursor from a previous page's `X-Next-Cursor` header.
+        q: Optional full-text query over title and text (see `parse_search`).
+        as_of: Optional ingest generation to read as of (`X-Ingest-Generation` of an earlier response).
+        since: Optional ingest generation; only reviews committed after it are returned.
 
     Returns:
-        dict: normalised filter values.
+        dict: normalised filter values (`cursor` decoded to (created_at, review_id),
+        `q` parsed to search terms).
     """
     if min_rating is not None and max_rating is not None and min_rating > max_rating:
         raise HTTPException(status_code=422, detail="min_rating cannot exceed max_rating")
     if start_date and end_date and start_date > end_date:
         raise HTTPException(status_code=422, detail="start_date cannot exceed end_date")
+    if cursor is not None and offset:
+        raise HTTPException(status_code=422, detail="cursor and offset cannot be combined")
+    if as_of is not None and since is not None and since >= as_of:
+        raise HTTPException(status_code=422, detail="since must be below as_of")
+    if cursor is not None and q is not None:
+        raise HTTPException(status_code=422, detail="cursor cannot be combined with q; page search results with offset")
+    try:
+        decoded_cursor = decode_cursor(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
     return {
         "min_rating": min_rating,
         "max_rating": max_rating,
@@ -73,10 +348,14 @@ def validate_review_filters(
         "end_date": end_date,
         "limit": limit,
         "offset": offset,
+        "cursor": decoded_cursor,
+        "q": parse_search(q),
+        "as_of": as_of,
+        "since": since,
     }
 
 @router.get("/health")
-def health():
+async def health():
     """Healthcheck endpoint.
 
     Returns:
@@ -84,138 +363,480 @@ def health():
     """
     return {"status": "ok"}
 
+@router.get("/health/cache")
+async def health_cache():
+    """Response cache occupancy and hit/miss counters.
+
+    Returns:
+        dict: see `ResponseCache.stats`.
+    """
+    return response_cache.stats()
+
+@router.get("/health/pool")
+async def health_pool():
+    """Connection pool metrics for each engine (occupancy, checkout waits, timeouts).
+
+    Returns:
+        dict: `{"sync": {...}}`, plus `"async"` when serving from an async engine.
+    """
+    return pool_status()
+
+@router.get("/health/slow-queries")
+async def health_slow_queries():
+    """Most recent statements slower than SLOW_QUERY_SECONDS (statement text only, no parameters).
+
+    Returns:
+        dict: `threshold_seconds` and `queries`, newest first.
+    """
+    return {"threshold_seconds": SLOW_QUERY_SECONDS, "queries": slow_queries.recent()}
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: per-route request, SQL and extract metrics plus pool and cache counters.
+
+    Returns:
+        fastapi.responses.Response: text exposition format 0.0.4.
+    """
+    return Response(
+        render_metrics(pool_status(), response_cache.stats(), statement_cache.stats()),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+    )
+
+@router.get("/reviews/search")
+async def reviews_search(
+    request: Request,
+    filters: dict = Depends(validate_review_filters),
+    fmt: str = Depends(negotiate_format),
+    encoding: Optional[str] = Depends(negotiate_content_encoding),
+    db=Depends(get_db),
+):
+    """Full-text search over all reviews' title and text, best match first.
+
+    Args:
+        request: incoming request (`If-None-Match` revalidation).
+        filters: dependency-provided dict of filter values; `q` is required.
+        fmt: negotiated extract format (`format` param or `Accept`; CSV by default).
+        encoding: negotiated CSV `Content-Encoding` (`Accept-Encoding`), or None.
+        db: DB session dependency (AsyncSession in async mode).
+
+    Returns:
+        StreamingResponse: CSV, Parquet or Arrow IPC stream of rows matching HEADERS['reviews'],
+        ranked by relevance and paged with `limit` / `offset`.
+    """
+    if filters["q"] is None:
+        raise HTTPException(status_code=422, detail="q is required")
+
+    async def build():
+        items = await search_reviews(
+            db,
+            filters["q"],
+            filters["start_date"],
+            filters["end_date"],
+            filters["min_rating"],
+            filters["max_rating"],
+            filters["limit"],
+            filters["offset"],
+            as_of=filters["as_of"],
+            since=filters["since"],
+        )
+        return stream_extract(fmt, items, HEADERS["reviews"], "reviews_search", encoding=encoding)
+    key = make_key("reviews_search", fmt, encoding, filters)
+    return await cached_response(request, db, key, build, filters["as_of"])
+
 @router.get("/reviews/business/{business_id}")
-def reviews_for_business(
+async def reviews_for_business(
     business_id: str,
+    request: Request,
     filters: dict = Depends(validate_review_filters),
-    db: Session = Depends(get_db),
+    fmt: str = Depends(negotiate_format),
+    encoding: Optional[str] = Depends(negotiate_content_encoding),
+    db=Depends(get_db),
 ):
-    """Return narrow (normalized) CSV extract of reviews for a business.
+    """Return narrow (normalized) extract of reviews for a business.
 
     Args:
         business_id: business identifier path param.
+        request: incoming request (`If-None-Match` revalidation).
         filters: dependency-provided dict of filter values.
-        db: DB session dependency.
+        fmt: negotiated extract format (`format` param or `Accept`; CSV by default).
+        encoding: negotiated CSV `Content-Encoding` (`Accept-Encoding`), or None.
+        db: DB session dependency (AsyncSession in async mode).
 
     Returns:
-        StreamingResponse: CSV response of rows matching HEADERS['reviews'].
+        StreamingResponse: CSV, Parquet or Arrow IPC stream of rows matching
+        HEADERS['reviews'], with an `X-Next-Cursor` header when more rows are available.
     """
-    items = query_reviews_by_business(
-        db,
-        business_id,
-        filters["start_date"],
-        filters["end_date"],
-        filters["min_rating"],
-        filters["max_rating"],
-        filters["limit"],
-        filters["offset"],
-    )
-    dicts = [to_review_dict(x) for x in items]
-    return stream_csv(dicts, HEADERS["reviews"], f"reviews_business_{business_id}.csv")
+    async def build():
+        items, next_cursor = await query_reviews_by_business(
+            db,
+            business_id,
+            filters["start_date"],
+            filters["end_date"],
+            filters["min_rating"],
+            filters["max_rating"],
+            filters["limit"],
+            filters["offset"],
+            filters["cursor"],
+            q=filters["q"],
+            as_of=filters["as_of"],
+            since=filters["since"],
+        )
+        return stream_extract(
+            fmt, items, HEADERS["reviews"], f"reviews_business_{business_id}",
+            extra_headers=page_headers(next_cursor), encoding=encoding,
+        )
+    key = make_key("reviews_business", business_id, fmt, encoding, filters)
+    return await cached_response(request, db, key, build, filters["as_of"])
+
+@router.get("/reviews/business/{business_id}/aggregates")
+async def business_rating_aggregates(
+    business_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: Literal["day", "month"] = "month",
+    db=Depends(get_db),
+):
+    """Review counts, average rating and rating histograms for a business, per day or month.
+
+    Served from the precomputed `business_daily_ratings` buckets, so the cost
+    follows the number of days covered rather than the number of reviews.
+
+    Args:
+        business_id: business identifier path param.
+        start_date: Optional inclusive start date (UTC day).
+        end_date: Optional exclusive end date (UTC day).
+        granularity: "month" (default) or "day" buckets.
+        db: DB session dependency (AsyncSession in async mode).
+
+    Returns:
+        dict: `total` plus one entry per period in `buckets` (see `summarise_rating_counts`).
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=422, detail="start_date cannot exceed end_date")
+    rows = await query_business_rating_counts(db, business_id, start_date, end_date)
+    return {"business_id": business_id, "granularity": granularity, **summarise_rating_counts(rows, granularity)}
 
 @router.get("/reviews/user/{user_id}")
-def reviews_by_user(
+async def reviews_by_user(
     user_id: str,
+    request: Request,
     filters: dict = Depends(validate_review_filters),
-    db: Session = Depends(get_db),
+    fmt: str = Depends(negotiate_format),
+    encoding: Optional[str] = Depends(negotiate_content_encoding),
+    db=Depends(get_db),
 ):
-    """Return narrow (normalized) CSV extract of reviews for a user.
+    """Return narrow (normalized) extract of reviews for a user.
 
     Args:
         user_id: user identifier path param.
+        request: incoming request (`If-None-Match` revalidation).
         filters: dependency-provided dict of filter values.
-        db: DB session dependency.
+        fmt: negotiated extract format (`format` param or `Accept`; CSV by default).
+        encoding: negotiated CSV `Content-Encoding` (`Accept-Encoding`), or None.
+        db: DB session dependency (AsyncSession in async mode).
 
     Returns:
-        StreamingResponse: CSV response of rows matching HEADERS['reviews'].
+        StreamingResponse: CSV, Parquet or Arrow IPC stream of rows matching
+        HEADERS['reviews'], with an `X-Next-Cursor` header when more rows are available.
     """
-    items = query_reviews_by_user(
-        db,
-        user_id,
-        filters["start_date"],
-        filters["end_date"],
-        filters["min_rating"],
-        filters["max_rating"],
-        filters["limit"],
-        filters["offset"],
-    )
-    dicts = [to_review_dict(x) for x in items]
-    return stream_csv(dicts, HEADERS["reviews"], f"reviews_user_{user_id}.csv")
+    async def build():
+        items, next_cursor = await query_reviews_by_user(
+            db,
+            user_id,
+            filters["start_date"],
+            filters["end_date"],
+            filters["min_rating"],
+            filters["max_rating"],
+            filters["limit"],
+            filters["offset"],
+            filters["cursor"],
+            q=filters["q"],
+            as_of=filters["as_of"],
+            since=filters["since"],
+        )
+        return stream_extract(
+            fmt, items, HEADERS["reviews"], f"reviews_user_{user_id}",
+            extra_headers=page_headers(next_cursor), encoding=encoding,
+        )
+    key = make_key("reviews_user", user_id, fmt, encoding, filters)
+    return await cached_response(request, db, key, build, filters["as_of"])
 
 @router.get("/users/{user_id}")
-def user_info(user_id: str, db: Session = Depends(get_db)):
+async def user_info(user_id: str, request: Request, db=Depends(get_db)):
     """Return a single-user CSV row (masked PII by default).
 
     Args:
         user_id: user identifier path param.
-        db: DB session dependency.
+        request: incoming request (`If-None-Match` revalidation).
+        db: DB session dependency (AsyncSession in async mode).
 
     Returns:
         StreamingResponse: CSV with a single row matching HEADERS['users'].
     """
-    u = get_user(db, user_id)
-    if not u:
-        raise HTTPException(status_code=404, detail="User not found")
-    row = mask_row(to_user_dict(u))
-    return stream_csv([row], HEADERS["users"], f"user_{user_id}.csv")
+    async def build():
+        row = await get_user_row(db, user_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return stream_csv([mask_user_row(row)], HEADERS["users"], f"user_{user_id}.csv", encoding=encoding)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    return await cached_response(request, db, make_key("user", user_id, encoding), build)
+
+@router.post("/users/batch")
+async def users_batch(
+    user_ids: list[str] = Depends(user_id_batch),
+    fmt: str = Depends(negotiate_format),
+    encoding: Optional[str] = Depends(negotiate_content_encoding),
+    db=Depends(get_db),
+):
+    """Return masked rows for many users in one streamed extract.
+
+    Ids are resolved with chunked `IN` queries (`LOOKUP_CHUNK_SIZE` per
+    query); unknown ids are omitted.
+
+    Args:
+        user_ids: distinct user ids from the request body (see `read_id_batch`).
+        fmt: negotiated extract format (`format` param or `Accept`; CSV by default).
+        encoding: negotiated CSV `Content-Encoding` (`Accept-Encoding`), or None.
+        db: DB session dependency (AsyncSession in async mode).
+
+    Returns:
+        StreamingResponse: CSV, Parquet or Arrow IPC stream of masked rows matching HEADERS['users'].
+    """
+    return stream_extract(
+        fmt, iter_users_by_ids(db, user_ids), HEADERS["users"], "users_batch",
+        extra_headers={"X-Requested-Count": str(len(user_ids))}, mask_pii=True, encoding=encoding,
+    )
+
+@router.post("/reviews/business/batch")
+async def reviews_for_businesses_batch(
+    business_ids: list[str] = Depends(business_id_batch),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    min_rating: Annotated[Optional[int], Query(ge=1, le=5)] = None,
+    max_rating: Annotated[Optional[int], Query(ge=1, le=5)] = None,
+    fmt: str = Depends(negotiate_format),
+    encoding: Optional[str] = Depends(negotiate_content_encoding),
+    db=Depends(get_db),
+):
+    """Return the normalized reviews of many businesses in one streamed extract.
+
+    Args:
+        business_ids: distinct business ids from the request body (see `read_id_batch`).
+        start_date: optional inclusive start date.
+        end_date: optional exclusive end date.
+        min_rating: optional minimum rating (1..5).
+        max_rating: optional maximum rating (1..5).
+        fmt: negotiated extract format (`format` param or `Accept`; CSV by default).
+        encoding: negotiated CSV `Content-Encoding` (`Accept-Encoding`), or None.
+        db: DB session dependency (AsyncSession in async mode).
+
+    Returns:
+        StreamingResponse: CSV, Parquet or Arrow IPC stream of rows matching HEADERS['reviews'],
+        grouped by business, newest first within each business.
+    """
+    if min_rating is not None and max_rating is not None and min_rating > max_rating:
+        raise HTTPException(status_code=422, detail="min_rating cannot exceed max_rating")
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=422, detail="start_date cannot exceed end_date")
+    rows = iter_reviews_by_businesses(db, business_ids, start_date, end_date, min_rating, max_rating)
+    return stream_extract(
+        fmt, rows, HEADERS["reviews"], "reviews_business_batch",
+        extra_headers={"X-Requested-Count": str(len(business_ids))}, encoding=encoding,
+    )
 
 @router.get("/reviews/business/{business_id}/expanded")
-def reviews_for_business_expanded(
+async def reviews_for_business_expanded(
     business_id: str,
+    request: Request,
     mask_pii: bool = True,
-    limit: int = 1000,
-    offset: int = 0,
-    db: Session = Depends(get_db),
+    filters: dict = Depends(validate_review_filters),
+    fmt: str = Depends(negotiate_format),
+    encoding: Optional[str] = Depends(negotiate_content_encoding),
+    db=Depends(get_db),
 ):
-    """Return expanded (joined) CSV extract of reviews for a business.
+    """Return expanded (joined) extract of reviews for a business.
+
+    Rows are filtered, ordered and paged exactly like the narrow extract.
 
     Args:
         business_id: business identifier path param.
+        request: incoming request (`If-None-Match` revalidation).
         mask_pii: whether to mask PII fields (default True).
-        limit: pagination limit.
-        offset: pagination offset.
-        db: DB session dependency.
+        filters: dependency-provided dict of filter values.
+        fmt: negotiated extract format (`format` param or `Accept`; CSV by default).
+        encoding: negotiated CSV `Content-Encoding` (`Accept-Encoding`), or None.
+        db: DB session dependency (AsyncSession in async mode).
 
     Returns:
-        StreamingResponse: CSV with columns HEADERS['reviews_expanded'].
+        StreamingResponse: CSV, Parquet or Arrow IPC stream with columns HEADERS['reviews_expanded'],
+        with an `X-Next-Cursor` header when more rows are available.
     """
-    q = (
-        db.query(Review, User, Business)
-        .join(User, Review.user_id == User.user_id)
-        .join(Business, Review.business_id == Business.business_id)
-        .filter(Review.business_id == business_id)
-        .offset(offset).limit(limit).all()
-    )
-    dicts = [to_expanded_review_dict(r, u, b, mask_pii) for r, u, b in q]
-    return stream_csv(dicts, HEADERS["reviews_expanded"], f"reviews_business_{business_id}_expanded.csv")
+    async def build():
+        items, next_cursor = await query_reviews_by_business(
+            db,
+            business_id,
+            filters["start_date"],
+            filters["end_date"],
+            filters["min_rating"],
+            filters["max_rating"],
+            filters["limit"],
+            filters["offset"],
+            filters["cursor"],
+            q=filters["q"],
+            as_of=filters["as_of"],
+            since=filters["since"],
+            projection="reviews_expanded",
+        )
+        return stream_extract(
+            fmt, items, HEADERS["reviews_expanded"], f"reviews_business_{business_id}_expanded",
+            extra_headers=page_headers(next_cursor), mask_pii=mask_pii, encoding=encoding,
+        )
+    key = make_key("reviews_business_expanded", business_id, fmt, encoding, mask_pii, filters)
+    return await cached_response(request, db, key, build, filters["as_of"])
 
 
 @router.get("/reviews/user/{user_id}/expanded")
-def reviews_by_user_expanded(
+async def reviews_by_user_expanded(
     user_id: str,
+    request: Request,
     mask_pii: bool = True,
-    limit: int = 1000,
-    offset: int = 0,
-    db: Session = Depends(get_db),
+    filters: dict = Depends(validate_review_filters),
+    fmt: str = Depends(negotiate_format),
+    encoding: Optional[str] = Depends(negotiate_content_encoding),
+    db=Depends(get_db),
 ):
-    """Return expanded (joined) CSV extract of reviews for a user.
+    """Return expanded (joined) extract of reviews for a user.
+
+    Rows are filtered, ordered and paged exactly like the narrow extract.
 
     Args:
         user_id: user identifier path param.
+        request: incoming request (`If-None-Match` revalidation).
         mask_pii: whether to mask PII fields (default True).
-        limit: pagination limit.
-        offset: pagination offset.
-        db: DB session dependency.
+        filters: dependency-provided dict of filter values.
+        fmt: negotiated extract format (`format` param or `Accept`; CSV by default).
+        encoding: negotiated CSV `Content-Encoding` (`Accept-Encoding`), or None.
+        db: DB session dependency (AsyncSession in async mode).
 
     Returns:
-        StreamingResponse: CSV with columns HEADERS['reviews_expanded'].
+        StreamingResponse: CSV, Parquet or Arrow IPC stream with columns HEADERS['reviews_expanded'],
+        with an `X-Next-Cursor` header when more rows are available.
     """
-    q = (
-        db.query(Review, User, Business)
-        .join(User, Review.user_id == User.user_id)
-        .join(Business, Review.business_id == Business.business_id)
-        .filter(Review.user_id == user_id)
-        .offset(offset).limit(limit).all()
-    )
-    dicts = [to_expanded_review_dict(r, u, b, mask_pii) for r, u, b in q]
-    return stream_csv(dicts, HEADERS["reviews_expanded"], f"reviews_user_{user_id}_expanded.csv")
+    async def build():
+        items, next_cursor = await query_reviews_by_user(
+            db,
+            user_id,
+            filters["start_date"],
+            filters["end_date"],
+            filters["min_rating"],
+            filters["max_rating"],
+            filters["limit"],
+            filters["offset"],
+            filters["cursor"],
+            q=filters["q"],
+            as_of=filters["as_of"],
+            since=filters["since"],
+            projection="reviews_expanded",
+        )
+        return stream_extract(
+            fmt, items, HEADERS["reviews_expanded"], f"reviews_user_{user_id}_expanded",
+            extra_headers=page_headers(next_cursor), mask_pii=mask_pii, encoding=encoding,
+        )
+    key = make_key("reviews_user_expanded", user_id, fmt, encoding, mask_pii, filters)
+    return await cached_response(request, db, key, build, filters["as_of"])
+
+async def _submit_export(
+    kind: str, entity_id: str, fmt: str, mask_pii: bool, q: Optional[str], since: Optional[int],
+) -> JSONResponse:
+    parse_search(q)  # 422 before queueing a query without words
+    status = await run_in_threadpool(submit_export, kind, entity_id, fmt, mask_pii, q, since)
+    return JSONResponse(status, status_code=202, headers={"Location": f"/exports/{status['id']}"})
+
+@router.post("/exports/reviews/business/{business_id}/expanded", status_code=202)
+async def export_business_expanded(
+    business_id: str,
+    mask_pii: bool = True,
+    q: Annotated[Optional[str], Query(max_length=SEARCH_MAX_QUERY_CHARS)] = None,
+    since: Annotated[Optional[int], Query(ge=0)] = None,
+    fmt: str = Depends(negotiate_format),
+):
+    """Queue a background export of every expanded review for a business.
+
+    Unlike `GET /reviews/business/{id}/expanded` there is no `limit`: the
+    whole extract is written to a file by a worker (gzipped for CSV). Poll
+    `GET /exports/{job_id}` for progress, then download the file. The job
+    reads the snapshot of the ingest generation current when it starts, so
+    loads committed while it runs are not mixed in.
+
+    Args:
+        business_id: business identifier path param.
+        mask_pii: whether to mask PII fields (default True).
+        q: optional full-text query; restricts to matches, best first.
+        since: optional ingest generation; only reviews committed after it are exported.
+        fmt: negotiated extract format of the file (`format` param or `Accept`; CSV by default).
+
+    Returns:
+        JSONResponse: 202 with the job status and a `Location` header.
+    """
+    return await _submit_export("reviews_business_expanded", business_id, fmt, mask_pii, q, since)
+
+@router.post("/exports/reviews/user/{user_id}/expanded", status_code=202)
+async def export_user_expanded(
+    user_id: str,
+    mask_pii: bool = True,
+    q: Annotated[Optional[str], Query(max_length=SEARCH_MAX_QUERY_CHARS)] = None,
+    since: Annotated[Optional[int], Query(ge=0)] = None,
+    fmt: str = Depends(negotiate_format),
+):
+    """Queue a background export of every expanded review for a user.
+
+    Args:
+        user_id: user identifier path param.
+        mask_pii: whether to mask PII fields (default True).
+        q: optional full-text query; restricts to matches, best first.
+        since: optional ingest generation; only reviews committed after it are exported.
+        fmt: negotiated extract format of the file (`format` param or `Accept`; CSV by default).
+
+    Returns:
+        JSONResponse: 202 with the job status and a `Location` header.
+    """
+    return await _submit_export("reviews_user_expanded", user_id, fmt, mask_pii, q, since)
+
+@router.get("/exports/{job_id}")
+async def export_status(job_id: str):
+    """Status, progress and lineage of an export job.
+
+    Args:
+        job_id: id returned when the job was submitted.
+
+    Returns:
+        dict: see `app.jobs.job_status`.
+    """
+    job = await run_in_threadpool(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job_status(job)
+
+@router.get("/exports/{job_id}/download")
+async def export_download(job_id: str):
+    """Download a finished export's file.
+
+    `Range` requests are answered with 206 partial content, so an
+    interrupted download can be resumed.
+
+    Args:
+        job_id: id returned when the job was submitted.
+
+    Returns:
+        FileResponse: the file (`application/gzip` for CSV, the format's
+        media type for Parquet / Arrow); 409 while the job is not complete,
+        410 if the file has been removed.
+    """
+    job = await run_in_threadpool(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job.status != EXPORT_COMPLETE:
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    if not os.path.exists(job.file_path):
+        raise HTTPException(status_code=410, detail="Export file is no longer available")
+    return FileResponse(job.file_path, media_type=export_media_type(job), filename=export_filename(job))
@@ -0,0 +1,174 @@
+# In-process cache of encoded extract responses.
+# Dashboards request the same extract URLs over and over between ingests, so
+# the encoded body of a response is kept in an LRU with a memory budget and a
+# TTL. Entries are keyed on the endpoint, path params, negotiated format and
+# normalised filters, and are valid only for the ingest generation they were
+# encoded under: every ingest commit advances the generation (see
+# `ingest.bump_generation`), so stale bodies are never served. The same
+# (key, generation) pair yields the response's ETag, which lets `If-None-Match`
+# be answered with 304 before any query runs.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_MAX_ENTRY_BYTES, RESPONSE_CACHE_TTL
+
+# Response headers that describe the body and are replayed from the cache.
+_REPLAYED_HEADERS = ("content-type", "content-encoding", "content-disposition", "vary", "x-next-cursor")
+
+
+def make_key(*parts) -> str:
+    """Build a cache key from request parts (dicts are order-insensitive).
+
+    Args:
+        *parts: Endpoint name, path params, format, normalised filter dict, ...
+
+    Returns:
+        str: stable hex digest.
+    """
+    normalised = [sorted(p.items()) if isinstance(p, dict) else p for p in parts]
+    return hashlib.blake2b(repr(normalised).encode(), digest_size=16).hexdigest()
+
+
+def make_etag(key: str, generation: int) -> str:
+    """Weak ETag for a response: identical while the ingest generation is unchanged."""
+    return f'W/"{key}-{generation}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an `If-None-Match` header against `etag` (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: dict
+    generation: int
+    expires: float
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded response bodies bounded by total bytes and age.
+
+    Args:
+        max_bytes: Memory budget for all bodies; 0 disables caching.
+        max_entry_bytes: Bodies larger than this are never cached.
+        ttl: Seconds an entry stays valid.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        max_entry_bytes: int = RESPONSE_CACHE_MAX_ENTRY_BYTES,
+        ttl: float = RESPONSE_CACHE_TTL,
+    ):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.ttl = ttl
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: str, generation: int) -> Optional[CachedResponse]:
+        """Return the entry for `key` if it was stored under `generation` and has not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.generation != generation or entry.expires <= time.monotonic()):
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, generation: int, body: bytes, headers: dict) -> bool:
+        """Store a body, evicting least recently used entries to stay within budget.
+
+        Returns:
+            bool: False if the body is too large to cache.
+        """
+        if len(body) > self.max_entry_bytes:
+            return False
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = CachedResponse(body, headers, generation, time.monotonic() + self.ttl)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def capture(self, key: str, generation: int, response):
+        """Tee a `StreamingResponse` body into the cache while it is sent.
+
+        The client still receives chunks as they are encoded; the body is
+        stored only if the stream completes within `max_entry_bytes`.
+
+        Args:
+            key: Cache key.
+            generation: Ingest generation the response was built under.
+            response: StreamingResponse (its `body_iterator` is wrapped).
+
+        Returns:
+            The same response.
+        """
+        if self.max_entry_bytes <= 0:
+            return response
+        source = response.body_iterator
+
+        async def tee():
+            chunks, size = [], 0
+            async for chunk in source:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode(response.charset)
+                if chunks is not None:
+                    size += len(chunk)
+                    if size <= self.max_entry_bytes:
+                        chunks.append(chunk)
+                    else:  # too large to cache: stop buffering, keep streaming
+                        chunks = None
+                yield chunk
+            if chunks is not None:
+                headers = {k: v for k, v in response.headers.items() if k in _REPLAYED_HEADERS}
+                self.put(key, generation, b"".join(chunks), headers)
+
+        response.body_iterator = tee()
+        return response
+
+    def stats(self) -> dict:
+        """Return occupancy and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache()
@@ -2,3 +2,88 @@ import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./reviews.db")
 # If using SQLite, enable check_same_thread=False in engine creation (see database.py).
+
+# Rows fetched per round-trip from the server-side cursor and encoded per CSV chunk.
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+# Target size of one streamed CSV chunk; wide rows shrink the batch below STREAM_BATCH_SIZE.
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", str(256 * 1024)))
+
+# Rows per executemany batch when bulk-loading reviews/dimensions during ingest.
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "10000"))
+
+# --- Connection pool (QueuePool; ignored for in-memory SQLite) ---
+# Persistent connections kept open, and extra connections allowed under bursts.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# Seconds a request waits for a free connection before failing with 503.
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Recycle connections older than this many seconds (-1 disables).
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test connections with a lightweight ping on checkout.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Pool checkouts slower than this are logged as warnings.
+DB_POOL_SLOW_WAIT = float(os.getenv("DB_POOL_SLOW_WAIT", "1.0"))
+
+# Per-statement timeout in milliseconds for API requests on Postgres (0 disables). Ingest, migrations and
+# export jobs run without one. SQLite has no statement timeout.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "60000"))
+
+# --- SQLite PRAGMAs applied to every new connection ---
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+# Negative values are KiB (SQLite convention): -65536 = 64 MiB page cache per connection.
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Milliseconds to wait on a locked database (e.g. during ingest) before erroring.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# --- In-process response cache (see app/cache.py) ---
+# Memory budget for cached extract bodies across all entries (0 disables caching; ETags still apply).
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Larger responses are streamed without being cached.
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024)))
+# Seconds an entry may be served before it is re-encoded, even without a new ingest.
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+# --- Batch lookups (POST /users/batch, /reviews/business/batch) ---
+# IDs per `IN (...)` query when resolving a batch.
+LOOKUP_CHUNK_SIZE = int(os.getenv("LOOKUP_CHUNK_SIZE", "2000"))
+# Largest number of distinct IDs accepted in one request (413 beyond).
+LOOKUP_MAX_IDS = int(os.getenv("LOOKUP_MAX_IDS", "100000"))
+
+# --- Request metrics and slow-query capture (see app/metrics.py, GET /metrics) ---
+# Record per-route request metrics and SQL timings (disable to skip the middleware and engine hooks).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Statements slower than this many seconds are logged and kept for GET /health/slow-queries (0 disables).
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+# Most recent slow statements kept in memory.
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "50"))
+
+# --- Full-text search (q= on review endpoints, see app/search.py) ---
+# Postgres text search configuration used for the tsvector column (changing it requires re-adding the column).
+SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "english")
+# Longest accepted `q` value and most terms used from it.
+SEARCH_MAX_QUERY_CHARS = int(os.getenv("SEARCH_MAX_QUERY_CHARS", "256"))
+SEARCH_MAX_TERMS = int(os.getenv("SEARCH_MAX_TERMS", "16"))
+
+# --- Background export jobs (POST /exports/..., see app/jobs.py) ---
+# Directory export files are written to (created on demand).
+EXPORT_DIR = os.getenv("EXPORT_DIR", "./exports")
+# Export jobs run concurrently in this many worker threads; further jobs wait queued.
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+# Rows written between progress updates of a running job's `export_jobs` row.
+EXPORT_PROGRESS_ROWS = int(os.getenv("EXPORT_PROGRESS_ROWS", "50000"))
+# gzip level for CSV export files (1 = fastest, 9 = smallest); Parquet/Arrow files are not gzipped.
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+# --- Compressed CSV responses (Accept-Encoding, see app/compression.py) ---
+# Content-Encodings offered for CSV extracts, in server preference order (empty disables compression).
+RESPONSE_ENCODINGS = [e.strip() for e in os.getenv("RESPONSE_ENCODINGS", "zstd,gzip").split(",") if e.strip()]
+# Compression levels: gzip 1-9, zstd 1-22 (higher = smaller bodies, more CPU per request).
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "3"))
+RESPONSE_ZSTD_LEVEL = int(os.getenv("RESPONSE_ZSTD_LEVEL", "3"))
+
+# --- Review query builder (see app/query.py) ---
+# Built review statements kept per query shape, so repeated shapes reuse SQLAlchemy's compiled SQL (0 disables).
+STATEMENT_CACHE_SIZE = int(os.getenv("STATEMENT_CACHE_SIZE", "256"))
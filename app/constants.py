@@ -26,9 +26,32 @@ F_EMAIL = "email"
 F_COUNTRY = "country"
 F_BUSINESS_NAME = "business_name"
 F_FILE_HASH = "file_hash"
+F_FILE_SIZE = "file_size"
 F_SOURCE_PATH = "source_path"
 F_TOTAL_ROWS = "total_rows"
 F_LOADED_ROWS = "loaded_rows"
+F_STATUS = "status"
+F_ROWS_PROCESSED = "rows_processed"
+F_DAY = "day"
+F_REVIEW_COUNT = "review_count"
+# Ingest generation that committed a review (snapshot / incremental reads).
+F_INGEST_GENERATION = "ingest_generation"
+
+# --- Ingest run statuses (ingest_metadata.status) ---
+INGEST_RUNNING = "running"
+INGEST_COMPLETE = "complete"
+
+# --- Export job statuses (export_jobs.status) ---
+EXPORT_QUEUED = "queued"
+EXPORT_RUNNING = "running"
+EXPORT_COMPLETE = "complete"
+EXPORT_FAILED = "failed"
+
+# --- Extract formats (`format` query parameter / Accept negotiation) ---
+FMT_CSV = "csv"
+FMT_PARQUET = "parquet"
+FMT_ARROW = "arrow"
+EXPORT_FORMATS = [FMT_CSV, FMT_PARQUET, FMT_ARROW]
 
 # Ordered collections (optional convenience)
 SOURCE_COLUMNS = [
@@ -82,6 +105,12 @@ TBL_USERS = "users"
 TBL_BUSINESSES = "businesses"
 TBL_REVIEWS = "reviews"
 TBL_INGEST_METADATA = "ingest_metadata"
+TBL_BUSINESS_DAILY_RATINGS = "business_daily_ratings"
+TBL_INGEST_GENERATION = "ingest_generation"
+TBL_EXPORT_JOBS = "export_jobs"
+# Full-text index over reviews.title/text: SQLite FTS5 table / Postgres tsvector column.
+TBL_REVIEWS_FTS = "reviews_fts"
+F_SEARCH_VECTOR = "search_vector"
 
 __all__ = [
     "COL_REVIEW_ID",
@@ -115,8 +144,29 @@ __all__ = [
     "TBL_BUSINESSES",
     "TBL_REVIEWS",
     "TBL_INGEST_METADATA",
+    "TBL_BUSINESS_DAILY_RATINGS",
+    "TBL_INGEST_GENERATION",
+    "TBL_EXPORT_JOBS",
+    "TBL_REVIEWS_FTS",
+    "F_SEARCH_VECTOR",
     "F_SOURCE_PATH",
     "F_TOTAL_ROWS",
     "F_LOADED_ROWS",
     "F_FILE_HASH",
+    "F_FILE_SIZE",
+    "F_STATUS",
+    "F_ROWS_PROCESSED",
+    "F_DAY",
+    "F_REVIEW_COUNT",
+    "F_INGEST_GENERATION",
+    "INGEST_RUNNING",
+    "INGEST_COMPLETE",
+    "EXPORT_QUEUED",
+    "EXPORT_RUNNING",
+    "EXPORT_COMPLETE",
+    "EXPORT_FAILED",
+    "FMT_CSV",
+    "FMT_PARQUET",
+    "FMT_ARROW",
+    "EXPORT_FORMATS",
 ]
\ No newline at end of file
@@ -1,62 +1,146 @@
+from datetime import date, datetime
 from typing import Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import Integer, bindparam, select
 
-from app.constants import F_CREATED_AT, F_EMAIL, F_IP, F_USER_NAME
-from app.pii import mask_email, mask_ip, mask_name
-from .models import Business, User, Review
-from .utils import sa_to_dict
+from app.config import LOOKUP_CHUNK_SIZE, STREAM_BATCH_SIZE
+from app.constants import F_BUSINESS_ID, F_USER_ID
+from app.pii import compile_row_masker
+from .database import execute, stream, stream_partitions
+from .metadata import IngestGeneration
+from .models import BusinessDailyRating, User, Review
+from .query import (
+    P_CURSOR_CREATED_AT, P_CURSOR_REVIEW_ID, P_IDS, P_LIMIT, P_OFFSET, P_PEEK_OFFSET,
+    ReviewQuery, created_at_key, keyset_predicate, limit_offset,
+)
+from .utils import encode_cursor, header_columns
 from .schemas import HEADERS
 
-def query_reviews_by_business(
-    db: Session, business_id: str,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
+# Projections and row builders for extracts, resolved once from HEADERS.
+USER_COLUMNS = header_columns(User, HEADERS["users"])
+mask_user_row = compile_row_masker(HEADERS["users"])
+
+async def query_reviews(
+    db, query: ReviewQuery, limit: int = 1000, offset: int = 0, cursor: Optional[tuple] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+):
+    """Run one page of a review query, with keyset or offset paging.
+
+    Every statement comes from the statement cache (see `app.query`), keyed by
+    the query's shape and the cursor kind; the request's values are bound at
+    execution.
+
+    Args:
+        db: AsyncSession or sync Session (see `app.database.execute`).
+        query: Projection and filters.
+        limit: Max rows to return.
+        offset: Row offset (only meaningful when no cursor is given).
+        cursor: Decoded (created_at, review_id) cursor or None.
+        batch_size: Rows fetched per round-trip from the server-side cursor.
+
+    Returns:
+        tuple: (Result or AsyncResult streaming the page's rows, next cursor str or None).
+        With `query.terms`, rows are the matches ranked best first, paged by
+        offset, with no next cursor.
+    """
+    dialect_name = db.get_bind().dialect.name
+    params = {**query.params(dialect_name), P_LIMIT: limit, P_OFFSET: offset}
+    if query.terms:
+        # Relevance order has no keyset; search results page by offset only.
+        page = query.cached(("page",), dialect_name, lambda: limit_offset(query.select(dialect_name)))
+        return await stream(db, page, batch_size, params), None
+    seek = None
+    if cursor is not None:
+        created_at, review_id = cursor
+        include_nulls = False
+        if created_at is not None and dialect_name != "postgresql":
+            # Index probe: (entity, created_at IS NULL) is a prefix lookup.
+            probe = query.cached(("probe",), dialect_name, lambda: (
+                query.select(dialect_name).with_only_columns(Review.review_id)
+                .where(Review.created_at.is_(None)).order_by(None).limit(1)
+            ))
+            include_nulls = (await execute(db, probe, params=params)).first() is not None
+        if created_at is not None:
+            params[P_CURSOR_CREATED_AT] = created_at if dialect_name == "sqlite" else datetime.fromisoformat(created_at)
+        params[P_CURSOR_REVIEW_ID] = review_id
+        seek = (created_at is None, include_nulls)
+
+    def ordered():
+        stmt = query.select(dialect_name)
+        return stmt if seek is None else stmt.where(keyset_predicate(seek[0], dialect_name, seek[1]))
+
+    # Peek at the page's last key and whether a row follows it, reading keys only.
+    peek = query.cached(("peek", seek), dialect_name, lambda: (
+        ordered().with_only_columns(created_at_key(dialect_name), Review.review_id)
+        .limit(2).offset(bindparam(P_PEEK_OFFSET, type_=Integer))
+    ))
+    keys = (await execute(db, peek, params={**params, P_PEEK_OFFSET: offset + limit - 1})).all()
+    next_cursor = encode_cursor(*keys[0]) if len(keys) == 2 else None
+
+    page = query.cached(("page", seek), dialect_name, lambda: limit_offset(ordered()))
+    return await stream(db, page, batch_size, params), next_cursor
+
+async def query_reviews_by_business(
+    db, business_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     min_rating: Optional[int] = None,
     max_rating: Optional[int] = None,
     limit: int = 1000,
     offset: int = 0,
+    cursor: Optional[tuple] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+    q: Optional[list] = None,
+    projection: str = "reviews",
+    as_of: Optional[int] = None,
+    since: Optional[int] = None,
 ):
     """Query reviews filtered by business and optional criteria.
 
     Args:
-        db: SQLAlchemy Session.
+        db: AsyncSession or sync Session.
         business_id: Business identifier to filter reviews.
-        start_date: Inclusive start date (ISO / date) to filter created_at.
+        start_date: Inclusive start date to filter created_at.
         end_date: Exclusive end date to filter created_at.
         min_rating: Minimum rating (inclusive).
         max_rating: Maximum rating (inclusive).
         limit: Max rows to return.
         offset: Row offset for pagination.
+        cursor: Decoded keyset cursor (created_at, review_id); rows after it are returned.
+        batch_size: Rows fetched per round-trip from the server-side cursor.
+        q: Parsed full-text query; restricts to matching reviews, ranked by relevance.
+        projection: "reviews" or "reviews_expanded" (joined with users and businesses);
+            rows are tuples in that HEADERS order.
+        as_of: Ingest generation to read as of (rows committed later are excluded).
+        since: Only rows committed after this ingest generation.
 
     Returns:
-        List[Review]: ORM Review objects matching filters.
+        tuple: (Result or AsyncResult lazily streaming matching rows, next page cursor or None).
     """
-    stmt = select(Review).where(Review.business_id == business_id)
-    if start_date:
-        stmt = stmt.where(Review.created_at >= start_date)
-    if end_date:
-        stmt = stmt.where(Review.created_at < end_date)
-    if min_rating is not None:
-        stmt = stmt.where(Review.rating >= min_rating)
-    if max_rating is not None:
-        stmt = stmt.where(Review.rating <= max_rating)
-    stmt = stmt.order_by(Review.created_at.desc()).limit(limit).offset(offset)
-    return db.execute(stmt).scalars().all()
-
-def query_reviews_by_user(
-    db: Session, user_id: str,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
+    query = ReviewQuery(
+        projection, F_BUSINESS_ID, business_id, False, start_date, end_date, min_rating, max_rating,
+        tuple(q) if q else None, as_of, since,
+    )
+    return await query_reviews(db, query, limit, offset, cursor, batch_size)
+
+async def query_reviews_by_user(
+    db, user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     min_rating: Optional[int] = None,
     max_rating: Optional[int] = None,
     limit: int = 1000,
     offset: int = 0,
+    cursor: Optional[tuple] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+    q: Optional[list] = None,
+    projection: str = "reviews",
+    as_of: Optional[int] = None,
+    since: Optional[int] = None,
 ):
     """Query reviews filtered by user and optional criteria.
 
     Args:
-        db: SQLAlchemy Session.
+        db: AsyncSession or sync Session.
         user_id: User identifier to filter reviews.
         start_date: Inclusive start date to filter created_at.
         end_date: Exclusive end date to filter created_at.
@@ -64,91 +148,164 @@ def query_reviews_by_user(
         max_rating: Maximum rating (inclusive).
         limit: Max rows to return.
         offset: Row offset for pagination.
+        cursor: Decoded keyset cursor (created_at, review_id); rows after it are returned.
+        batch_size: Rows fetched per round-trip from the server-side cursor.
+        q: Parsed full-text query; restricts to matching reviews, ranked by relevance.
+        projection: "reviews" or "reviews_expanded" (joined with users and businesses);
+            rows are tuples in that HEADERS order.
+        as_of: Ingest generation to read as of (rows committed later are excluded).
+        since: Only rows committed after this ingest generation.
 
     Returns:
-        List[Review]: ORM Review objects matching filters.
+        tuple: (Result or AsyncResult lazily streaming matching rows, next page cursor or None).
     """
-    stmt = select(Review).where(Review.user_id == user_id)
+    query = ReviewQuery(
+        projection, F_USER_ID, user_id, False, start_date, end_date, min_rating, max_rating,
+        tuple(q) if q else None, as_of, since,
+    )
+    return await query_reviews(db, query, limit, offset, cursor, batch_size)
+
+async def search_reviews(
+    db, q: list,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    limit: int = 100,
+    offset: int = 0,
+    batch_size: int = STREAM_BATCH_SIZE,
+    as_of: Optional[int] = None,
+    since: Optional[int] = None,
+):
+    """Full-text search across all reviews, best match first.
+
+    Args:
+        db: AsyncSession or sync Session.
+        q: Parsed full-text query (`app.search.parse_query`), non-empty.
+        start_date: Inclusive start date to filter created_at.
+        end_date: Exclusive end date to filter created_at.
+        min_rating: Minimum rating (inclusive).
+        max_rating: Maximum rating (inclusive).
+        limit: Max rows to return.
+        offset: Row offset for pagination.
+        batch_size: Rows fetched per round-trip from the server-side cursor.
+        as_of: Ingest generation to read as of (rows committed later are excluded).
+        since: Only rows committed after this ingest generation.
+
+    Returns:
+        Result or AsyncResult lazily streaming matching rows as tuples in HEADERS['reviews'] order.
+    """
+    query = ReviewQuery(
+        start_date=start_date, end_date=end_date, min_rating=min_rating, max_rating=max_rating, terms=tuple(q),
+        as_of=as_of, since=since,
+    )
+    result, _ = await query_reviews(db, query, limit, offset, None, batch_size)
+    return result
+
+async def query_business_rating_counts(
+    db, business_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> list:
+    """Fetch a business's daily rating buckets from the precomputed aggregates.
+
+    Reads only `business_daily_ratings` (primary-key range scan), never `reviews`.
+
+    Args:
+        db: AsyncSession or sync Session.
+        business_id: Business identifier.
+        start_date: Inclusive start day (UTC).
+        end_date: Exclusive end day (UTC).
+
+    Returns:
+        list[tuple]: (day, rating, review_count) rows ordered by day, rating.
+    """
+    stmt = select(BusinessDailyRating.day, BusinessDailyRating.rating, BusinessDailyRating.review_count).where(
+        BusinessDailyRating.business_id == business_id
+    )
     if start_date:
-        stmt = stmt.where(Review.created_at >= start_date)
+        stmt = stmt.where(BusinessDailyRating.day >= start_date)
     if end_date:
-        stmt = stmt.where(Review.created_at < end_date)
-    if min_rating is not None:
-        stmt = stmt.where(Review.rating >= min_rating)
-    if max_rating is not None:
-        stmt = stmt.where(Review.rating <= max_rating)
-    stmt = stmt.order_by(Review.created_at.desc()).limit(limit).offset(offset)
-    return db.execute(stmt).scalars().all()
+        stmt = stmt.where(BusinessDailyRating.day < end_date)
+    stmt = stmt.order_by(BusinessDailyRating.day, BusinessDailyRating.rating)
+    return (await execute(db, stmt)).all()
 
-def get_user(db: Session, user_id: str) -> Optional[User]:
-    """Retrieve a User ORM instance by primary key.
+async def get_ingest_generation(db) -> int:
+    """Read the ingest generation (0 before the first ingest).
 
     Args:
-        db: SQLAlchemy Session.
-        user_id: Primary key of the user.
+        db: AsyncSession or sync Session.
 
     Returns:
-        User or None if not found.
+        int: counter advanced by every ingest commit.
     """
-    return db.get(User, user_id)
+    result = await execute(db, select(IngestGeneration.generation).where(IngestGeneration.id == 1))
+    return result.scalar() or 0
+
+async def _rows_for_ids(db, stmt, ids: list, chunk_size: int, batch_size: int, params: Optional[dict] = None):
+    """Run `stmt` (with an expanding `ids` bind) once per chunk of `ids`, yielding row batches."""
+    for start in range(0, len(ids), chunk_size):
+        chunk_params = {**(params or {}), P_IDS: ids[start:start + chunk_size]}
+        async for batch in stream_partitions(db, stmt, batch_size, chunk_params):
+            yield batch
 
-def to_review_dict(r: Review) -> dict:
-    """Convert a Review ORM object to a dict matching HEADERS['reviews'] order.
+def iter_users_by_ids(db, user_ids: list, chunk_size: int = LOOKUP_CHUNK_SIZE, batch_size: int = STREAM_BATCH_SIZE):
+    """Resolve many users with chunked `IN` queries.
 
     Args:
-        r: Review ORM instance.
+        db: AsyncSession or sync Session.
+        user_ids: Distinct user ids; unknown ids are skipped.
+        chunk_size: Ids per `IN (...)` query.
+        batch_size: Rows per yielded batch.
 
     Returns:
-        dict: projected mapping containing only the keys in HEADERS['reviews'].
+        Async iterator of row batches in HEADERS['users'] order (unmasked).
     """
-    row = sa_to_dict(r)
-    # Convert datetime to isoformat string
-    if "created_at" in row and row["created_at"]:
-        row["created_at"] = row["created_at"].isoformat()
-    # Only keep keys in HEADERS["reviews"] (or reviews_with_ip)
-    return {k: row.get(k) for k in HEADERS["reviews"]}
+    stmt = select(*USER_COLUMNS).where(User.user_id.in_(bindparam(P_IDS, expanding=True)))
+    return _rows_for_ids(db, stmt, user_ids, chunk_size, batch_size)
+
+def iter_reviews_by_businesses(
+    db, business_ids: list,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    min_rating: Optional[int] = None,
+    max_rating: Optional[int] = None,
+    chunk_size: int = LOOKUP_CHUNK_SIZE,
+    batch_size: int = STREAM_BATCH_SIZE,
+):
+    """Stream the reviews of many businesses with chunked `IN` queries.
 
-def to_user_dict(u: User) -> dict:
-    """Convert a User ORM object to a dict matching HEADERS['users'] order.
+    Within a chunk, rows come grouped by business, newest first (served by
+    the `(business_id, created_at, review_id)` index).
 
     Args:
-        u: User ORM instance.
+        db: AsyncSession or sync Session.
+        business_ids: Distinct business ids.
+        start_date: Inclusive start date to filter created_at.
+        end_date: Exclusive end date to filter created_at.
+        min_rating: Minimum rating (inclusive).
+        max_rating: Maximum rating (inclusive).
+        chunk_size: Business ids per `IN (...)` query.
+        batch_size: Rows per yielded batch.
 
     Returns:
-        dict: projected mapping containing only the keys in HEADERS['users'].
+        Async iterator of row batches in HEADERS['reviews'] order.
     """
-    row = sa_to_dict(u)
-    return {k: row.get(k) for k in HEADERS["users"]}
+    query = ReviewQuery(
+        entity=F_BUSINESS_ID, many=True, start_date=start_date, end_date=end_date,
+        min_rating=min_rating, max_rating=max_rating,
+    )
+    dialect_name = db.get_bind().dialect.name
+    return _rows_for_ids(db, query.select(dialect_name), business_ids, chunk_size, batch_size, query.params(dialect_name))
 
-def to_expanded_review_dict(r, u, b, mask_pii: bool = True) -> dict:
-    """Build a denormalised review row joining review, user and business fields.
+async def get_user_row(db, user_id: str):
+    """Fetch one user's HEADERS['users'] columns as a plain row.
 
     Args:
-        r: Review ORM instance.
-        u: User ORM instance (author of the review).
-        b: Business ORM instance (subject of the review).
-        mask_pii: If True, apply masking to PII fields (email, user_name, ip_address).
+        db: AsyncSession or sync Session.
+        user_id: Primary key of the user.
 
     Returns:
-        dict: projected mapping containing only the keys in HEADERS['reviews_expanded'].
+        Row in HEADERS['users'] order, or None if not found.
     """
-    rd = sa_to_dict(r)
-    ud = sa_to_dict(u)
-    bd = sa_to_dict(b)
-
-    # Convert datetime to iso
-    if F_CREATED_AT in rd and rd[F_CREATED_AT]:
-        rd[F_CREATED_AT] = rd[F_CREATED_AT].isoformat()
-
-    combined = {**rd, **ud, **bd}
-
-    # Apply PII masking
-    if mask_pii:
-        if F_EMAIL in combined:
-            combined[F_EMAIL] = mask_email(combined[F_EMAIL])
-        if F_USER_NAME in combined:
-            combined[F_USER_NAME] = mask_name(combined[F_USER_NAME])
-        if F_IP in combined:
-            combined[F_IP] = mask_ip(combined[F_IP])
-
-    return {k: combined.get(k) for k in HEADERS["reviews_expanded"]}
\ No newline at end of file
+    return (await execute(db, select(*USER_COLUMNS).where(User.user_id == user_id))).first()
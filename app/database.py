@@ -1,26 +1,265 @@
-from sqlalchemy import create_engine
-from .config import DATABASE_URL
-from sqlalchemy.orm import sessionmaker, declarative_base
-
-engine = create_engine(
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from .config import (
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS,
+    METRICS_ENABLED,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS,
 )
+from .metrics import instrument_engine
+from .pool import PoolMetrics, instrumented_pool
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+
+# Sync drivers used for ingest, migrations and the CLI when DATABASE_URL names an async driver.
+SYNC_DRIVERS = {
+    "aiosqlite": "sqlite",
+    "asyncpg": "postgresql+psycopg2",
+}
+
+
+def is_async_url(url: str) -> bool:
+    """Return True if `url` names an asyncio driver (e.g. `sqlite+aiosqlite`, `postgresql+asyncpg`)."""
+    return make_url(url).get_dialect().is_async
+
+
+def sync_database_url(url: str) -> str:
+    """Map an async DATABASE_URL to the equivalent sync URL (sync URLs are returned unchanged).
+
+    Args:
+        url: SQLAlchemy database URL.
+
+    Returns:
+        str: URL usable with `create_engine`.
+    """
+    parsed = make_url(url)
+    if not is_async_url(url):
+        return url
+    return parsed.set(drivername=SYNC_DRIVERS.get(parsed.get_driver_name(), parsed.get_backend_name())).render_as_string(hide_password=False)
+
+
+def sqlite_pragmas() -> dict:
+    """PRAGMAs applied to every new SQLite connection (from config)."""
+    return {
+        "journal_mode": SQLITE_JOURNAL_MODE,
+        "synchronous": SQLITE_SYNCHRONOUS,
+        "cache_size": SQLITE_CACHE_SIZE,
+        "mmap_size": SQLITE_MMAP_SIZE,
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def engine_options(url: str, metrics: PoolMetrics = None) -> dict:
+    """Build `create_engine` / `create_async_engine` keyword arguments from config.
+
+    Pool sizing, timeout, recycle and pre-ping apply to every file or server
+    database (in-memory SQLite keeps SQLAlchemy's single-connection pool).
+
+    Args:
+        url: SQLAlchemy database URL.
+        metrics: Optional pool metrics; the queue pool is instrumented to update them.
+
+    Returns:
+        dict: engine keyword arguments.
+    """
+    parsed = make_url(url)
+    dialect = parsed.get_dialect()
+    options = {"connect_args": {}}
+    if parsed.get_backend_name() == "sqlite":
+        if not dialect.is_async:
+            options["connect_args"]["check_same_thread"] = False
+        if parsed.database in (None, "", ":memory:"):
+            return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    if metrics is not None:
+        options["poolclass"] = instrumented_pool(AsyncAdaptedQueuePool if dialect.is_async else QueuePool, metrics)
+    return options
+
+
+def make_engine(url: str, metrics: PoolMetrics = None):
+    """Create a sync engine with the configured pool and SQLite PRAGMAs.
+
+    Args:
+        url: Sync SQLAlchemy database URL.
+        metrics: Optional pool metrics to record checkouts into.
+
+    Returns:
+        sqlalchemy.engine.Engine
+    """
+    engine = create_engine(url, **engine_options(url, metrics))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    if METRICS_ENABLED:
+        instrument_engine(engine)
+    return engine
+
+
+def make_async_engine(url: str, metrics: PoolMetrics = None):
+    """Create an async engine with the configured pool and SQLite PRAGMAs.
+
+    Args:
+        url: Async SQLAlchemy database URL.
+        metrics: Optional pool metrics to record checkouts into.
+
+    Returns:
+        sqlalchemy.ext.asyncio.AsyncEngine
+    """
+    engine = create_async_engine(url, **engine_options(url, metrics))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    if METRICS_ENABLED:
+        instrument_engine(engine.sync_engine)
+    return engine
+
+
+class ApiSession(Session):
+    """Session used to serve API requests; each transaction gets the request `statement_timeout`."""
+
+
+@event.listens_for(ApiSession, "after_begin")
+def _set_statement_timeout(session, transaction, connection):
+    # SET LOCAL lasts until the transaction ends, so the pooled connection goes
+    # back without it and ingest, migrations, aggregate rebuilds and export jobs
+    # (which share the engine) keep running without a limit.
+    if connection.dialect.name == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(DB_STATEMENT_TIMEOUT_MS)}")
+
+
+SYNC_DATABASE_URL = sync_database_url(DATABASE_URL)
+ASYNC_DB = SYNC_DATABASE_URL != DATABASE_URL
+
+pool_metrics = PoolMetrics("sync")
+engine = make_engine(SYNC_DATABASE_URL, pool_metrics)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ApiSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=ApiSession)
 Base = declarative_base()
 
+# Async mode: the API serves requests from an AsyncSession on this engine,
+# so a request waiting on the database holds no worker thread.
+async_pool_metrics = PoolMetrics("async") if ASYNC_DB else None
+async_engine = make_async_engine(DATABASE_URL, async_pool_metrics) if ASYNC_DB else None
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, sync_session_class=ApiSession)
+    if ASYNC_DB else None
+)
+
 
-def get_db():
-    """Dependency generator that yields a SQLAlchemy Session.
+def pool_status() -> dict:
+    """Return pool metrics for the engines in use.
+
+    Returns:
+        dict: `{"sync": {...}}`, plus `"async"` in async mode.
+    """
+    status = {"sync": pool_metrics.snapshot(engine.pool)}
+    if ASYNC_DB:
+        status["async"] = async_pool_metrics.snapshot(async_engine.pool)
+    return status
+
+
+async def get_db():
+    """Dependency generator that yields a database session for the request.
+
+    Yields an `AsyncSession` when DATABASE_URL uses an async driver, else a
+    sync `Session`; route code runs statements through `execute` / `stream`,
+    which handle both. On Postgres every transaction of the session runs
+    under `DB_STATEMENT_TIMEOUT_MS`.
 
     Usage:
-        as a FastAPI dependency: db: Session = Depends(get_db)
+        as a FastAPI dependency: db = Depends(get_db)
 
     Yields:
-        sqlalchemy.orm.Session: a database session that will be closed after use.
+        sqlalchemy.ext.asyncio.AsyncSession or sqlalchemy.orm.Session, closed after use.
     """
-    db = SessionLocal()
+    if ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = ApiSessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
+
+
+async def execute(db, stmt, **kwargs):
+    """Execute `stmt` without blocking the event loop.
+
+    Args:
+        db: AsyncSession, or a sync Session (run in the threadpool for the call only).
+        stmt: SQLAlchemy executable.
+        **kwargs: Passed to `execute` (e.g. `execution_options`).
+
+    Returns:
+        Buffered sqlalchemy Result.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.execute(stmt, **kwargs)
+    return await run_in_threadpool(db.execute, stmt, **kwargs)
+
+
+async def stream(db, stmt, batch_size: int, params: dict = None):
+    """Start a server-side cursor over `stmt`, fetching `batch_size` rows per round-trip.
+
+    Args:
+        db: AsyncSession or sync Session.
+        stmt: SQLAlchemy executable.
+        batch_size: Rows per fetch (`yield_per`).
+        params: Bound parameter values for `stmt`.
+
+    Returns:
+        AsyncResult for an AsyncSession, else a sync Result (iterated in the
+        threadpool by the streaming response).
+    """
+    if isinstance(db, AsyncSession):
+        return await db.stream(stmt, params, execution_options={"yield_per": batch_size})
+    return await run_in_threadpool(db.execute, stmt, params, execution_options={"yield_per": batch_size})
+
+
+async def stream_partitions(db, stmt, batch_size: int, params: dict = None):
+    """Iterate `stmt`'s rows in lists of up to `batch_size`, without blocking the event loop.
+
+    Unlike `stream`, sync sessions also fetch each batch in the threadpool,
+    so callers can consume several statements in sequence from one async
+    generator.
+
+    Args:
+        db: AsyncSession or sync Session.
+        stmt: SQLAlchemy executable.
+        batch_size: Rows per fetch and per yielded list.
+        params: Bound parameter values for `stmt`.
+
+    Yields:
+        list: rows.
+    """
+    if isinstance(db, AsyncSession):
+        result = await db.stream(stmt, params, execution_options={"yield_per": batch_size})
+        async for batch in result.partitions():
+            yield batch
+        return
+    result = await run_in_threadpool(db.execute, stmt, params, execution_options={"yield_per": batch_size})
+    while batch := await run_in_threadpool(result.fetchmany, batch_size):
+        yield batch
@@ -0,0 +1,386 @@
+# Extract encoders (CSV, Parquet and Arrow IPC stream).
+# Rows arrive as tuples in `HEADERS` order and are encoded a batch at a time:
+# CSV batches go through one `csv.writer.writerows` call each, columnar ones are
+# transposed into Arrow record batches. Each batch is flushed as bytes as soon as
+# it is encoded, so a server-side cursor is streamed without building per-row
+# dicts or materialising the whole result. Encoders are incremental objects so
+# the same code serves sync row iterators (`iter_encoded`) and async result
+# partitions (`aiter_encoded`). Both drivers report rows, cursor-fetch time and
+# encode time per batch to the current request's metrics (`app/metrics.py`).
+
+import csv
+import io
+import time
+from datetime import datetime
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.config import STREAM_BATCH_SIZE, STREAM_CHUNK_BYTES
+from app.constants import F_CREATED_AT, F_RATING, FMT_ARROW, FMT_CSV, FMT_PARQUET
+from app.metrics import record_extract
+from app.pii import PII_COLUMNS, mask_array
+
+MEDIA_TYPES = {
+    FMT_CSV: "text/csv",
+    FMT_PARQUET: "application/vnd.apache.parquet",
+    FMT_ARROW: "application/vnd.apache.arrow.stream",
+}
+
+# Media types accepted in `Accept` (including common legacy aliases) -> format.
+ACCEPT_FORMATS = {
+    **{media_type: fmt for fmt, media_type in MEDIA_TYPES.items()},
+    "application/x-parquet": FMT_PARQUET,
+    "application/parquet": FMT_PARQUET,
+    "application/vnd.apache.arrow.file": FMT_ARROW,
+    "application/x-arrow": FMT_ARROW,
+}
+
+FILE_EXTENSIONS = {FMT_CSV: "csv", FMT_PARQUET: "parquet", FMT_ARROW: "arrows"}
+
+# Non-string extract columns; everything else is encoded as UTF-8 strings.
+ARROW_TYPES = {
+    F_RATING: pa.int32(),
+    F_CREATED_AT: pa.timestamp("us", tz="UTC"),
+}
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+# Rows in the first CSV batch, before the bytes per row are known.
+_CSV_PROBE_ROWS = 16
+
+# Per-column text conversions applied before CSV encoding (csv.writer would use str()).
+CSV_CONVERTERS = {
+    F_CREATED_AT: _isoformat,
+}
+
+
+def format_from_accept(accept: Optional[str]) -> Optional[str]:
+    """Pick an export format from an HTTP `Accept` header.
+
+    Media ranges are considered in descending `q` order (ties keep header
+    order); the first one naming a supported format wins.
+
+    Args:
+        accept: Raw `Accept` header value, or None.
+
+    Returns:
+        str or None: a `FMT_*` value, or None if nothing specific was requested.
+    """
+    if not accept:
+        return None
+    ranges = []
+    for pos, part in enumerate(accept.split(",")):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        ranges.append((-q, pos, media_type.lower()))
+    for neg_q, _, media_type in sorted(ranges):
+        if neg_q < 0 and media_type in ACCEPT_FORMATS:
+            return ACCEPT_FORMATS[media_type]
+    return None
+
+
+def arrow_schema(headers: list[str]) -> pa.Schema:
+    """Build the Arrow schema for an extract from its column list.
+
+    Args:
+        headers: Column names (e.g. `HEADERS["reviews"]`).
+
+    Returns:
+        pyarrow.Schema with one nullable field per header.
+    """
+    return pa.schema([(name, ARROW_TYPES.get(name, pa.string())) for name in headers])
+
+
+def record_batch(rows: list, schema: pa.Schema, masked: tuple = ()) -> pa.RecordBatch:
+    """Transpose a list of tuple rows into one Arrow record batch.
+
+    Args:
+        rows: Tuples ordered like `schema`.
+        schema: Target Arrow schema.
+        masked: Names of PII columns to mask, whole column at a time (`app.pii.mask_array`).
+
+    Returns:
+        pyarrow.RecordBatch with `len(rows)` rows.
+    """
+    columns = zip(*rows)
+    arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+    if masked:
+        arrays = [mask_array(field.name, a) if field.name in masked else a for a, field in zip(arrays, schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _pii_columns(headers: list[str], mask_pii: bool) -> tuple:
+    return tuple(name for name in headers if name in PII_COLUMNS) if mask_pii else ()
+
+
+def _masking(mask: Callable, convert: Optional[Callable] = None) -> Callable:
+    """Value function masking non-empty values with `mask`, then applying `convert`.
+
+    CSV cells are Python objects on their way to `csv.writer`, so a plain call
+    per value is cheaper than a round-trip through an Arrow array and back.
+    """
+    if convert is None:
+        return lambda v: mask(v) if v else v
+    return lambda v: convert(mask(v) if v else v)
+
+
+class CsvEncoder:
+    """Incremental UTF-8 CSV encoder.
+
+    `start` returns the header line on its own so it can be sent straight
+    away. Each batch is written with `writerows` in slices of at most
+    `batch_size` rows; after a small first slice, slices are sized from the
+    bytes per row seen so far to stay near `chunk_bytes`.
+
+    Args:
+        headers: Column names.
+        batch_size: Maximum rows per chunk.
+        chunk_bytes: Target bytes per chunk.
+        converters: Column name -> callable applied to that column's values
+            before encoding (default `CSV_CONVERTERS`).
+        mask_pii: Mask PII columns with the row-wise functions (`app.pii.PII_COLUMNS`),
+            applied in the same per-column pass as the converters.
+    """
+
+    def __init__(
+        self,
+        headers: list[str],
+        batch_size: int = STREAM_BATCH_SIZE,
+        chunk_bytes: int = STREAM_CHUNK_BYTES,
+        converters: Optional[dict] = None,
+        mask_pii: bool = False,
+    ):
+        converters = CSV_CONVERTERS if converters is None else converters
+        self.headers = headers
+        self.batch_size = batch_size
+        self.chunk_bytes = chunk_bytes
+        masked = _pii_columns(headers, mask_pii)
+        self._convert = [
+            (i, _masking(PII_COLUMNS[name], converters.get(name)) if name in masked else converters[name])
+            for i, name in enumerate(headers)
+            if name in masked or name in converters
+        ]
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf)
+        self._step = min(batch_size, _CSV_PROBE_ROWS)
+
+    def _drain(self) -> bytes:
+        data = self._buf.getvalue().encode()
+        self._buf.seek(0)
+        self._buf.truncate(0)
+        return data
+
+    def start(self) -> list[bytes]:
+        self._writer.writerow(self.headers)
+        return [self._drain()]
+
+    def encode(self, rows: list) -> list[bytes]:
+        chunks = []
+        pos = 0
+        while pos < len(rows):
+            batch = rows[pos:pos + self._step]
+            pos += len(batch)
+            if self._convert:
+                columns = list(zip(*batch))
+                for i, fn in self._convert:
+                    columns[i] = map(fn, columns[i])
+                self._writer.writerows(zip(*columns))
+            else:
+                self._writer.writerows(batch)
+            chunk = self._drain()
+            chunks.append(chunk)
+            self._step = max(1, min(self.batch_size, self.chunk_bytes * len(batch) // max(len(chunk), 1)))
+        return chunks
+
+    def finish(self) -> list[bytes]:
+        return []
+
+
+class _ChunkSink:
+    """Write-only file object that hands out what was written since the last drain.
+
+    Keeps a running position for `tell()`, which Parquet needs for the
+    offsets it records in the footer.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ArrowEncoder:
+    """Incremental Arrow IPC stream encoder (zstd-compressed buffers), one message per batch.
+
+    Args:
+        headers: Column names.
+        batch_size: Rows per record batch.
+        mask_pii: Mask PII columns of each batch (`app.pii.mask_array`).
+    """
+
+    def __init__(self, headers: list[str], batch_size: int = STREAM_BATCH_SIZE, mask_pii: bool = False):
+        self.batch_size = batch_size
+        self.schema = arrow_schema(headers)
+        self._masked = _pii_columns(headers, mask_pii)
+        self._sink = _ChunkSink()
+        self._writer = None
+
+    def start(self) -> list[bytes]:
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        self._writer = pa.ipc.new_stream(self._sink, self.schema, options=options)
+        return [self._sink.drain()]
+
+    def encode(self, rows: list) -> list[bytes]:
+        self._writer.write_batch(record_batch(rows, self.schema, self._masked))
+        return [self._sink.drain()]
+
+    def finish(self) -> list[bytes]:
+        self._writer.close()
+        return [self._sink.drain()]
+
+
+class ParquetEncoder:
+    """Incremental Parquet encoder, one row group per batch.
+
+    Row groups are flushed as they are written; the footer (with the schema
+    and row-group offsets) follows the last one.
+
+    Args:
+        headers: Column names.
+        batch_size: Rows per row group.
+        mask_pii: Mask PII columns of each row group (`app.pii.mask_array`).
+    """
+
+    def __init__(self, headers: list[str], batch_size: int = STREAM_BATCH_SIZE, mask_pii: bool = False):
+        self.batch_size = batch_size
+        self.schema = arrow_schema(headers)
+        self._masked = _pii_columns(headers, mask_pii)
+        self._sink = _ChunkSink()
+        self._writer = None
+
+    def start(self) -> list[bytes]:
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression="snappy")
+        return [self._sink.drain()]
+
+    def encode(self, rows: list) -> list[bytes]:
+        self._writer.write_batch(record_batch(rows, self.schema, self._masked))
+        return [self._sink.drain()]
+
+    def finish(self) -> list[bytes]:
+        self._writer.close()
+        return [self._sink.drain()]
+
+
+def iter_encoded(encoder, rows: Iterable[tuple]) -> Iterator[bytes]:
+    """Drive `encoder` over a sync row iterable, pulling `encoder.batch_size` rows at a time.
+
+    Args:
+        encoder: `CsvEncoder`, `ArrowEncoder` or `ParquetEncoder`.
+        rows: Iterable of tuples in header order.
+
+    Yields:
+        bytes: non-empty encoded chunks.
+    """
+    yield from filter(None, encoder.start())
+    rows = iter(rows)
+    while True:
+        fetched = time.perf_counter()
+        batch = list(islice(rows, encoder.batch_size))
+        if not batch:
+            break
+        encoded = time.perf_counter()
+        chunks = encoder.encode(batch)
+        record_extract(len(batch), encoded - fetched, time.perf_counter() - encoded)
+        yield from filter(None, chunks)
+    finished = time.perf_counter()
+    chunks = encoder.finish()
+    record_extract(0, 0.0, time.perf_counter() - finished)
+    yield from filter(None, chunks)
+
+
+async def aiter_encoded(encoder, batches: AsyncIterable[list]) -> AsyncIterator[bytes]:
+    """Drive `encoder` over async batches of rows (e.g. `AsyncResult.partitions()`).
+
+    Args:
+        encoder: `CsvEncoder`, `ArrowEncoder` or `ParquetEncoder`.
+        batches: Async iterable of lists of tuples in header order.
+
+    Yields:
+        bytes: non-empty encoded chunks.
+    """
+    for chunk in filter(None, encoder.start()):
+        yield chunk
+    fetched = time.perf_counter()
+    async for batch in batches:
+        encoded = time.perf_counter()
+        chunks = encoder.encode(batch)
+        record_extract(len(batch), encoded - fetched, time.perf_counter() - encoded)
+        for chunk in filter(None, chunks):
+            yield chunk
+        fetched = time.perf_counter()
+    finished = time.perf_counter()
+    chunks = encoder.finish()
+    record_extract(0, 0.0, time.perf_counter() - finished)
+    for chunk in filter(None, chunks):
+        yield chunk
+
+
+def encode_csv(
+    rows: Iterable[tuple],
+    headers: list[str],
+    batch_size: int = STREAM_BATCH_SIZE,
+    chunk_bytes: int = STREAM_CHUNK_BYTES,
+    converters: Optional[dict] = None,
+) -> Iterator[bytes]:
+    """Encode tuple rows as UTF-8 CSV chunks (see `CsvEncoder`)."""
+    return iter_encoded(CsvEncoder(headers, batch_size, chunk_bytes, converters), rows)
+
+
+def encode_arrow(rows: Iterable[tuple], headers: list[str], batch_size: int = STREAM_BATCH_SIZE) -> Iterator[bytes]:
+    """Encode tuple rows as an Arrow IPC stream (see `ArrowEncoder`)."""
+    return iter_encoded(ArrowEncoder(headers, batch_size), rows)
+
+
+def encode_parquet(rows: Iterable[tuple], headers: list[str], batch_size: int = STREAM_BATCH_SIZE) -> Iterator[bytes]:
+    """Encode tuple rows as a Parquet file (see `ParquetEncoder`)."""
+    return iter_encoded(ParquetEncoder(headers, batch_size), rows)
+
+
+ENCODERS = {
+    FMT_CSV: CsvEncoder,
+    FMT_PARQUET: ParquetEncoder,
+    FMT_ARROW: ArrowEncoder,
+}
@@ -1,11 +1,23 @@
 import argparse
+import glob
 import hashlib
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterable, Iterator, Optional
 import pandas as pd
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import text
+from .aggregates import record_new_reviews
 from .database import SessionLocal, engine
-from .models import Base, User, Business, Review
-from .metadata import IngestMetadata
+from .loader import bulk_insert
+from .migrate import upgrade
+from .models import User, Business, Review
+from .search import index_new_reviews, reviews_watermark
+from .metadata import IngestGeneration, IngestMetadata
+from .validate import basic_validations
 from app.constants import (
     RENAME_MAP,
     F_REVIEW_ID,
@@ -24,6 +36,12 @@ from app.constants import (
     F_TOTAL_ROWS,
     F_LOADED_ROWS,
     F_FILE_HASH,
+    F_FILE_SIZE,
+    F_STATUS,
+    F_ROWS_PROCESSED,
+    F_INGEST_GENERATION,
+    INGEST_RUNNING,
+    INGEST_COMPLETE,
 )
 
 
@@ -43,26 +61,108 @@ def compute_file_hash(file_path: str) -> str:
     return h.hexdigest()
 
 
-def load_dataframe(path: str) -> pd.DataFrame:
-    """Load CSV into a pandas DataFrame and normalise column names.
+class HashingReader:
+    """Binary file wrapper that SHA-256 hashes bytes as they are read.
+
+    Handing this to `pd.read_csv` hashes the file in the same pass as parsing
+    instead of reading it twice.
+    """
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._sha = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        self._sha.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        """Hash of the whole file (drains anything the parser left unread)."""
+        for chunk in iter(lambda: self.read(1 << 20), b""):
+            pass
+        return self._sha.hexdigest()
+
+
+def normalise_frame(df: pd.DataFrame, source: Optional[str] = None) -> pd.DataFrame:
+    """Rename source columns to the normalized schema, parse timestamps and validate.
+
+    Whole-file and chunked loads both validate here, so a file without the
+    review, user and business id columns is rejected the same way on either path.
 
     Args:
-        path: Path to CSV file.
+        df: DataFrame (or chunk) as read from the source CSV.
+        source: Path of the source file, named in the error message.
 
     Returns:
         pandas.DataFrame with renamed columns and parsed `created_at` UTC timestamps where present.
+
+    Raises:
+        ValueError: if required key columns are missing (see `basic_validations`).
     """
-    df = pd.read_csv(path)
     df = df.rename(columns=RENAME_MAP)
     if F_CREATED_AT in df.columns:
         df[F_CREATED_AT] = pd.to_datetime(df[F_CREATED_AT], errors="coerce", utc=True)
+    try:
+        basic_validations(df)
+    except ValueError as e:
+        if source is None:
+            raise
+        raise ValueError(f"Cannot ingest {source}: {e}; nothing was loaded from this file") from None
     return df
 
 
+def load_dataframe(path: str) -> pd.DataFrame:
+    """Load CSV into a pandas DataFrame and normalise column names.
+
+    Args:
+        path: Path to CSV file.
+
+    Returns:
+        pandas.DataFrame with renamed columns and parsed `created_at` UTC timestamps where present.
+    """
+    return normalise_frame(pd.read_csv(path), path)
+
+
+def load_dataframe_hashed(path: str) -> tuple[str, pd.DataFrame]:
+    """Load and normalise a CSV, hashing it in the same read.
+
+    Args:
+        path: Path to CSV file.
+
+    Returns:
+        tuple: (SHA-256 hex digest of the file, normalised DataFrame).
+    """
+    with open(path, "rb") as f:
+        reader = HashingReader(f)
+        df = normalise_frame(pd.read_csv(reader), path)
+        return reader.hexdigest(), df
+
+
+def iter_dataframes(path: str, chunk_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Yield the CSV as normalised DataFrames of at most `chunk_size` rows.
+
+    Args:
+        path: Path to CSV file.
+        chunk_size: Rows per chunk; None reads the whole file as one frame.
+
+    Yields:
+        pandas.DataFrame chunks in file order.
+    """
+    if chunk_size is None:
+        yield load_dataframe(path)
+        return
+    with pd.read_csv(path, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield normalise_frame(chunk, path)
+
+
 def upsert_dimension(session: Session, model, key_field: str, df: pd.DataFrame, fields: list[str]):
     """Batch upsert new rows into a dimension table (users or businesses).
 
-    This function inserts only keys that do not already exist to keep the operation idempotent.
+    This function inserts only keys that do not already exist to keep the operation idempotent;
+    existing keys are skipped by the database (`ON CONFLICT DO NOTHING`), so
+    the first-seen attributes for a key are kept.
 
     Args:
         session: SQLAlchemy Session to use for DB operations.
@@ -71,86 +171,423 @@ def upsert_dimension(session: Session, model, key_field: str, df: pd.DataFrame,
         df: DataFrame with rows to insert (must include key_field column).
         fields: List of additional field names (columns) to insert besides the key.
     """
-    existing_keys = set(
-        k for (k,) in session.execute(text(f"SELECT {key_field} FROM {model.__tablename__}")).all()
+    to_insert = df[[key_field] + fields].drop_duplicates(subset=[key_field])
+    bulk_insert(session, model.__table__, to_insert, ignore_conflicts=True)
+
+
+def load_frame(db: Session, df: pd.DataFrame, generation: int = 0) -> int:
+    """Load one normalised DataFrame (or chunk) into the database.
+
+    Upserts users and businesses, then appends reviews whose review_id is
+    unseen and adds them to the per-business rating aggregates and the
+    full-text index in the same transaction. Does not commit.
+
+    Args:
+        db: SQLAlchemy Session.
+        df: Normalised DataFrame as produced by `normalise_frame`.
+        generation: Ingest generation the caller commits this frame under
+            (`bump_generation`), stamped on every new review.
+
+    Returns:
+        int: number of reviews inserted.
+    """
+    # --- Upsert users & businesses ---
+    user_cols = [c for c in [F_USER_ID, F_USER_NAME, F_EMAIL, F_COUNTRY] if c in df.columns]
+    biz_cols = [c for c in [F_BUSINESS_ID, F_BUSINESS_NAME] if c in df.columns]
+
+    upsert_dimension(db, User, F_USER_ID, df[user_cols], [c for c in user_cols if c != F_USER_ID])
+    upsert_dimension(db, Business, F_BUSINESS_ID, df[biz_cols], [c for c in biz_cols if c != F_BUSINESS_ID])
+
+    # --- Insert reviews (append-only) ---
+    review_cols = [c for c in [F_REVIEW_ID, F_USER_ID, F_BUSINESS_ID, F_RATING, F_TITLE, F_TEXT, F_IP, F_CREATED_AT] if c in df.columns]
+    review_df = df[review_cols].drop_duplicates(subset=[F_REVIEW_ID])
+    if F_CREATED_AT in review_df.columns:
+        # Fix load-time defaults once so the stored rows and their aggregate buckets agree.
+        review_df = review_df.assign(**{F_CREATED_AT: review_df[F_CREATED_AT].fillna(pd.Timestamp.now(tz="UTC"))})
+    watermark = reviews_watermark(db)
+    inserted_ids = bulk_insert(
+        db, Review.__table__, review_df.assign(**{F_INGEST_GENERATION: generation}),
+        ignore_conflicts=True, returning=F_REVIEW_ID,
     )
-    to_insert = df[[key_field] + fields].drop_duplicates()
-    to_insert = to_insert[~to_insert[key_field].isin(existing_keys)]
-    objects = [
-        model(**{k: (None if pd.isna(v) else v) for k, v in rec.items()})
-        for rec in to_insert.to_dict("records")
-    ]
-    if objects:
-        session.add_all(objects)
+    # Only the rows the insert reported as added count into the aggregates.
+    if len(inserted_ids) < len(review_df):
+        inserted = set(inserted_ids)
+        review_df = review_df[[value in inserted for value in review_df[F_REVIEW_ID].astype(str).tolist()]]
+    record_new_reviews(db, review_df)
+    index_new_reviews(db, watermark)
+    return len(inserted_ids)
+
+
+def bump_generation(db: Session) -> int:
+    """Advance the ingest generation inside the caller's transaction.
 
+    Committed together with the rows it covers, so the API's response cache
+    and ETags (see app/cache.py) change exactly when the visible data does,
+    including from a separate ingest process. The bumped row stays locked
+    until commit, so generations become visible in order.
+
+    Args:
+        db: SQLAlchemy Session.
+
+    Returns:
+        int: the new generation, to stamp on the rows committed with it.
+    """
+    table = IngestGeneration.__table__
+    bumped = db.execute(update(table).where(table.c.id == 1).values(generation=table.c.generation + 1))
+    if not bumped.rowcount:
+        db.execute(insert(table).values(id=1, generation=1))
+    return db.scalar(select(table.c.generation).where(table.c.id == 1))
+
+
+def start_run(db: Session, csv_path: str, file_hash: str, file_size: Optional[int] = None) -> IngestMetadata:
+    """Return the lineage row for this load, resuming an interrupted one.
+
+    A previous run of the same file (by hash) that never reached "complete"
+    is picked up from its checkpoint; otherwise a new "running" row is
+    committed so progress is visible while the load is in flight.
+
+    Args:
+        db: SQLAlchemy Session.
+        csv_path: Path to the CSV file being ingested.
+        file_hash: SHA-256 of the file contents.
+        file_size: Size of the file in bytes.
+
+    Returns:
+        IngestMetadata: row whose `rows_processed` is the resume point.
+    """
+    meta = db.scalars(
+        select(IngestMetadata)
+        .where(IngestMetadata.file_hash == file_hash, IngestMetadata.status == INGEST_RUNNING)
+        .order_by(IngestMetadata.id.desc())
+        .limit(1)
+    ).first()
+    if meta is None:
+        meta = IngestMetadata(
+            **{
+                F_SOURCE_PATH: csv_path,
+                F_TOTAL_ROWS: 0,
+                F_LOADED_ROWS: 0,
+                F_FILE_HASH: file_hash,
+                F_FILE_SIZE: file_size,
+                F_STATUS: INGEST_RUNNING,
+                F_ROWS_PROCESSED: 0,
+            }
+        )
+        db.add(meta)
+        db.commit()
+    return meta
+
+
+def identify_file(db: Session, csv_path: str, need_hash: bool = False, force: bool = False):
+    """Decide cheaply whether a file has already been ingested.
+
+    Only files whose size matches a completed run are hashed up front; any
+    other file cannot be a duplicate, so its hash is left to the parsing pass
+    (see `load_dataframe_hashed`). The hash lookup is served by the
+    `ingest_metadata.file_hash` index.
+
+    Args:
+        db: SQLAlchemy Session.
+        csv_path: Path to the CSV file.
+        need_hash: Hash up front regardless (chunked loads need it to resume).
+        force: Ignore previous runs; never report the file as already ingested.
 
-def ingest_csv(db: Session, csv_path: str):
+    Returns:
+        tuple: (file size, SHA-256 or None if not computed yet, completed IngestMetadata or None).
+    """
+    file_size = os.path.getsize(csv_path)
+    size_seen = not force and db.scalar(
+        select(IngestMetadata.id)
+        .where(IngestMetadata.file_size == file_size, IngestMetadata.status == INGEST_COMPLETE)
+        .limit(1)
+    ) is not None
+    if not (need_hash or size_seen):
+        return file_size, None, None
+    file_hash = compute_file_hash(csv_path)
+    done = None
+    if size_seen:
+        done = db.scalars(
+            select(IngestMetadata)
+            .where(IngestMetadata.file_hash == file_hash, IngestMetadata.status == INGEST_COMPLETE)
+            .order_by(IngestMetadata.id.desc())
+            .limit(1)
+        ).first()
+    return file_size, file_hash, done
+
+
+def ingest_frames(
+    db: Session,
+    csv_path: str,
+    file_hash: str,
+    frames: Iterable[pd.DataFrame],
+    started: Optional[float] = None,
+    file_size: Optional[int] = None,
+):
+    """Load a file's normalised frames as one checkpointed ingest run.
+
+    Each frame is loaded and committed together with the run's checkpoint,
+    so a re-run of the same file (by hash) resumes after the last committed
+    frame.
+
+    Args:
+        db: SQLAlchemy Session to use for ingestion.
+        csv_path: Path of the source file (recorded for lineage).
+        file_hash: SHA-256 of the source file.
+        frames: Normalised DataFrames in file order (one, or one per chunk).
+        started: Optional `time.perf_counter()` start used for the throughput report.
+        file_size: Size of the source file in bytes (recorded for `identify_file`).
+
+    Returns:
+        IngestMetadata: the lineage row written for this load.
+    """
+    started = time.perf_counter() if started is None else started
+    meta = start_run(db, csv_path, file_hash, file_size)
+    resume_from = meta.rows_processed
+    seen = rows_in = 0
+
+    for df in frames:
+        if seen + len(df) <= resume_from:
+            seen += len(df)
+            continue
+        skip = max(resume_from - seen, 0)
+        seen += len(df)
+        df = df.iloc[skip:]
+        rows_in += len(df)
+
+        meta.generation = bump_generation(db)
+        meta.loaded_rows += load_frame(db, df, meta.generation)
+        meta.rows_processed = meta.total_rows = seen
+        db.commit()
+        del df
+
+    meta.status = INGEST_COMPLETE
+    db.commit()
+    elapsed = time.perf_counter() - started
+    print(
+        f"Ingest complete ({csv_path}). Rows in: {meta.total_rows}, reviews loaded: {meta.loaded_rows} "
+        f"in {elapsed:.2f}s ({rows_in / elapsed if elapsed else 0:,.0f} rows/s)"
+        + (f" [resumed after row {resume_from}]" if resume_from else "")
+    )
+    return meta
+
+
+def _report_skip(csv_path: str, done: IngestMetadata):
+    print(f"Skipping {csv_path}: identical to ingest run {done.id} ({done.source_path}); use --force to reload")
+
+
+def _ingest_identified(db: Session, csv_path: str, file_size: int, file_hash: Optional[str], chunk_size: Optional[int], started: float):
+    """Load a file that `identify_file` did not find, hashing it while parsing if needed."""
+    if file_hash is None:
+        file_hash, df = load_dataframe_hashed(csv_path)
+        frames = [df]
+    else:
+        frames = iter_dataframes(csv_path, chunk_size)
+        # Parse (and validate) the first chunk before a run is recorded for the file.
+        first = next(frames, None)
+        frames = [] if first is None else chain([first], frames)
+    return ingest_frames(db, csv_path, file_hash, frames, started, file_size)
+
+
+def ingest_csv(db: Session, csv_path: str, chunk_size: Optional[int] = None, force: bool = False):
     """Ingest a reviews CSV into the database.
 
     Behaviour:
-      - Renames source columns to normalized schema.
+      - Skips the file if identical content (by SHA-256) was already ingested.
+      - Renames source columns to normalized schema and validates them.
       - Upserts users and businesses (idempotent).
       - Appends new reviews only if review_id is unseen.
       - Writes an ingest metadata row.
 
+    With `chunk_size`, the file is read, validated, deduplicated and loaded
+    `chunk_size` rows at a time with a commit per chunk, so peak memory is
+    bounded by the chunk rather than the file. Each commit also advances the
+    run's checkpoint in `ingest_metadata`; re-running after a crash resumes
+    after the last committed chunk. Resuming needs the file's identity
+    before loading starts, so chunked loads hash the file up front; whole-file
+    loads hash it in the same pass as parsing.
+
     Args:
         db: SQLAlchemy Session to use for ingestion.
         csv_path: Path to the CSV file to ingest.
+        chunk_size: Optional rows per chunk; None loads the file in one transaction.
+        force: Reload even if the same content was ingested before.
+
+    Returns:
+        IngestMetadata: the lineage row written for this load, or the earlier
+        completed run when the file is skipped.
     """
-    file_hash = compute_file_hash(csv_path)
-    df = load_dataframe(csv_path)
-    total_rows = len(df)
+    started = time.perf_counter()
+    file_size, file_hash, done = identify_file(db, csv_path, need_hash=chunk_size is not None, force=force)
+    if done is not None:
+        _report_skip(csv_path, done)
+        return done
+    return _ingest_identified(db, csv_path, file_size, file_hash, chunk_size, started)
 
-    # --- Upsert users & businesses ---
-    user_cols = [c for c in [F_USER_ID, F_USER_NAME, F_EMAIL, F_COUNTRY] if c in df.columns]
-    biz_cols = [c for c in [F_BUSINESS_ID, F_BUSINESS_NAME] if c in df.columns]
 
-    if F_USER_ID in df.columns:
-        upsert_dimension(db, User, F_USER_ID, df[user_cols], [c for c in user_cols if c != F_USER_ID])
-    if F_BUSINESS_ID in df.columns:
-        upsert_dimension(db, Business, F_BUSINESS_ID, df[biz_cols], [c for c in biz_cols if c != F_BUSINESS_ID])
+def expand_sources(patterns: Iterable[str]) -> list[str]:
+    """Resolve CLI `--csv` arguments (files, globs or directories) to CSV paths.
 
-    # --- Insert reviews (append-only) ---
-    existing_review_ids = set(k for (k,) in db.execute(text("SELECT review_id FROM reviews")).all())
-    review_cols = [c for c in [F_REVIEW_ID, F_USER_ID, F_BUSINESS_ID, F_RATING, F_TITLE, F_TEXT, F_IP, F_CREATED_AT] if c in df.columns]
-    review_df = df[review_cols].drop_duplicates(subset=[F_REVIEW_ID])
-    review_df = review_df[~review_df[F_REVIEW_ID].isin(existing_review_ids)]
-
-    review_objs = []
-    for rec in review_df.to_dict("records"):
-        if F_CREATED_AT in rec and pd.notna(rec[F_CREATED_AT]):
-            if isinstance(rec[F_CREATED_AT], pd.Timestamp):
-                rec[F_CREATED_AT] = rec[F_CREATED_AT].to_pydatetime()
-        review_objs.append(Review(**{k: (None if pd.isna(v) else v) for k, v in rec.items()}))
-
-    if review_objs:
-        db.add_all(review_objs)
-
-    db.add(IngestMetadata(
-        **{
-            F_SOURCE_PATH: csv_path,
-            F_TOTAL_ROWS: total_rows,
-            F_LOADED_ROWS: len(review_objs),
-            F_FILE_HASH: file_hash,
-        }
-    ))
-    db.commit()
-    print(f"Ingest complete. Rows in: {total_rows}, reviews loaded: {len(review_objs)}")
+    Args:
+        patterns: File paths, glob patterns, or directories (all `*.csv` inside).
 
+    Returns:
+        list[str]: de-duplicated paths, sorted within each pattern.
 
-def run(csv_path: str):
+    Raises:
+        FileNotFoundError: if a pattern matches nothing.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "*.csv")))
+        else:
+            matches = sorted(glob.glob(pattern)) or ([pattern] if os.path.exists(pattern) else [])
+        if not matches:
+            raise FileNotFoundError(f"No CSV files match {pattern!r}")
+        paths += [p for p in matches if p not in paths]
+    return paths
+
+
+def _worker_init():
+    """Drop pooled DB connections inherited from the parent on fork; workers never use them."""
+    engine.dispose(close=False)
+
+
+def prepare_file(csv_path: str, file_hash: Optional[str] = None) -> tuple[str, str, pd.DataFrame]:
+    """Process-pool task: parse, rename and validate one file (no DB access).
+
+    Args:
+        csv_path: Path to CSV file.
+        file_hash: SHA-256 if already known; otherwise computed while parsing.
+
+    Returns:
+        tuple: (csv_path, file_hash, normalised DataFrame).
+    """
+    if file_hash is None:
+        file_hash, df = load_dataframe_hashed(csv_path)
+    else:
+        df = load_dataframe(csv_path)
+    return csv_path, file_hash, df
+
+
+def ingest_files(
+    db: Session,
+    csv_paths: list[str],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    force: bool = False,
+) -> list:
+    """Ingest many files: parallel parsing, single-writer loading.
+
+    Files already ingested (see `identify_file`) are skipped before any
+    parsing. Parsing, hashing and validation of the rest run in a
+    `ProcessPoolExecutor`; this process is the only DB writer, loading files
+    in order as they become ready (SQLite allows one writer at a time
+    anyway). At most `workers` parsed files are held in memory. With
+    `chunk_size`, files are instead streamed one at a time in chunked mode to
+    keep memory bounded.
+
+    Args:
+        db: SQLAlchemy Session used by the writer.
+        csv_paths: Files to ingest.
+        workers: Parser processes (default: CPU count).
+        chunk_size: Optional rows per chunk; disables the process pool.
+        force: Reload files even if the same content was ingested before.
+
+    Returns:
+        list[IngestMetadata]: one lineage row per file (the earlier run for skipped files).
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    metas, loaded, skipped = {}, [], 0
+    pending = deque()
+    for path in csv_paths:
+        file_size, file_hash, done = identify_file(db, path, need_hash=chunk_size is not None, force=force)
+        if done is not None:
+            _report_skip(path, done)
+            metas[path] = done
+            skipped += 1
+        else:
+            pending.append((path, file_size, file_hash))
+
+    if chunk_size is not None or workers == 1 or len(pending) <= 1:
+        for path, file_size, file_hash in pending:
+            metas[path] = _ingest_identified(db, path, file_size, file_hash, chunk_size, time.perf_counter())
+            loaded.append(metas[path])
+    else:
+        sizes = {path: file_size for path, file_size, _ in pending}
+
+        def submit(pool):
+            path, _, file_hash = pending.popleft()
+            return pool.submit(prepare_file, path, file_hash)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+            in_flight = deque(submit(pool) for _ in range(min(workers, len(pending))))
+            while in_flight:
+                path, file_hash, df = in_flight.popleft().result()
+                if pending:
+                    in_flight.append(submit(pool))
+                metas[path] = ingest_frames(db, path, file_hash, [df], file_size=sizes[path])
+                loaded.append(metas[path])
+                del df
+
+    elapsed = time.perf_counter() - started
+    rows_in = sum(m.total_rows for m in loaded)
+    print(
+        f"Ingested {len(loaded)} file(s), skipped {skipped}. Rows in: {rows_in}, "
+        f"reviews loaded: {sum(m.loaded_rows for m in loaded)} "
+        f"in {elapsed:.2f}s ({rows_in / elapsed if elapsed else 0:,.0f} rows/s)"
+    )
+    return [metas[path] for path in csv_paths]
+
+
+def run(csv_path: str, chunk_size: Optional[int] = None, force: bool = False):
     """Convenience entrypoint used by CLI/tests to create tables and ingest a CSV.
 
     Args:
         csv_path: Path to CSV file to ingest.
+        chunk_size: Optional rows per chunk (see `ingest_csv`).
+        force: Reload even if the same content was ingested before.
+
+    Returns:
+        IngestMetadata: the lineage row written for this load.
+    """
+    upgrade(engine)
+    with SessionLocal() as session:
+        return ingest_csv(session, csv_path=csv_path, chunk_size=chunk_size, force=force)
+
+
+def run_many(patterns: list[str], workers: Optional[int] = None, chunk_size: Optional[int] = None, force: bool = False):
+    """CLI entrypoint: create tables and ingest every file matching `patterns`.
+
+    Args:
+        patterns: File paths, globs or directories.
+        workers: Parser processes (see `ingest_files`).
+        chunk_size: Optional rows per chunk (see `ingest_csv`).
+        force: Reload files even if the same content was ingested before.
+
+    Returns:
+        list[IngestMetadata]: one lineage row per file.
     """
-    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
     with SessionLocal() as session:
-        ingest_csv(session, csv_path=csv_path)
+        return ingest_files(session, expand_sources(patterns), workers=workers, chunk_size=chunk_size, force=force)
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Ingest reviews CSV file")
-    parser.add_argument("--csv", required=True, help="Path to reviews CSV file")
+    parser = argparse.ArgumentParser(description="Ingest reviews CSV files")
+    parser.add_argument(
+        "--csv", required=True, nargs="+",
+        help="Reviews CSV file(s): paths, glob patterns or directories (all *.csv inside)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=None,
+        help="Load the file in chunks of N rows with a commit (and resumable checkpoint) per chunk",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes for multi-file loads (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Reload files whose content was already ingested")
     args = parser.parse_args()
-    run(args.csv)
+    try:
+        run_many(args.csv, workers=args.workers, chunk_size=args.chunk_size, force=args.force)
+    except (FileNotFoundError, ValueError) as e:
+        raise SystemExit(f"Ingest failed: {e}")
@@ -0,0 +1,233 @@
+# Background export jobs for extracts too large to stream within one HTTP request.
+# A submitted job is recorded in `export_jobs` (next to `ingest_metadata`, with
+# the ingest run and generation it read, for lineage) and runs on a small
+# thread pool. The query is pinned to that generation (`as_of`), so rows an
+# ingest commits while the job runs are excluded, and `since` turns a job into
+# an incremental export of what later generations added. The worker streams the query with a server-side cursor through
+# the same encoders as the synchronous routes into a file in EXPORT_DIR and
+# commits the rows written so far every EXPORT_PROGRESS_ROWS rows. CSV files are
+# gzip-compressed; Parquet and Arrow are written as is, since their encoders
+# already compress the column data. The row total is only known once the
+# cursor is exhausted (counting up front would scan the extract twice). The file
+# is written under a temporary name and renamed on completion, so a
+# downloadable file is always whole.
+#
+# The pool lives in the API process: jobs do not survive a restart, and any
+# job still queued or running at startup is marked failed (`fail_interrupted`).
+
+import gzip
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Engine
+
+from app.config import EXPORT_DIR, EXPORT_GZIP_LEVEL, EXPORT_PROGRESS_ROWS, EXPORT_WORKERS, STREAM_BATCH_SIZE
+from app.constants import (
+    EXPORT_COMPLETE, EXPORT_FAILED, EXPORT_QUEUED, EXPORT_RUNNING, F_BUSINESS_ID, F_USER_ID, FMT_CSV, INGEST_COMPLETE,
+)
+from app.schemas import HEADERS
+from .database import SessionLocal, engine
+from .export import FILE_EXTENSIONS, ENCODERS, MEDIA_TYPES, iter_encoded
+from .metadata import ExportJob, IngestGeneration, IngestMetadata
+from .query import ReviewQuery
+from .search import parse_query
+
+logger = logging.getLogger(__name__)
+
+# Export kind -> (review field the entity id matches, download filename stem).
+EXPORT_KINDS = {
+    "reviews_business_expanded": (F_BUSINESS_ID, "reviews_business_{}_expanded"),
+    "reviews_user_expanded": (F_USER_ID, "reviews_user_{}_expanded"),
+}
+
+# Formats whose files are gzip-compressed; the columnar encoders compress internally.
+GZIP_FORMATS = {FMT_CSV}
+
+executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def export_suffix(fmt: str) -> str:
+    """File suffix of an export in `fmt`: `csv.gz`, `parquet` or `arrows`."""
+    return FILE_EXTENSIONS[fmt] + (".gz" if fmt in GZIP_FORMATS else "")
+
+
+def export_filename(job: ExportJob) -> str:
+    """Download filename of a job's file, e.g. `reviews_business_b1_expanded.csv.gz`."""
+    return f"{EXPORT_KINDS[job.kind][1].format(job.entity_id)}.{export_suffix(job.format)}"
+
+
+def export_media_type(job: ExportJob) -> str:
+    """Media type of a job's file: `application/gzip` for gzipped CSV, else the format's own."""
+    return "application/gzip" if job.format in GZIP_FORMATS else MEDIA_TYPES[job.format]
+
+
+def job_status(job: ExportJob) -> dict:
+    """JSON-ready view of an export job.
+
+    Args:
+        job: ExportJob row.
+
+    Returns:
+        dict: parameters, status, rows written so far, progress (1.0 once
+        complete; None before, as the total is only known at the end),
+        lineage and, once complete, the download path.
+    """
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "entity_id": job.entity_id,
+        "format": job.format,
+        "mask_pii": job.mask_pii,
+        "q": job.query,
+        "since_generation": job.since_generation,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "rows_written": job.rows_written or 0,
+        "bytes_written": job.bytes_written or 0,
+        "progress": 1.0 if job.status == EXPORT_COMPLETE else None,
+        "ingest_id": job.ingest_id,
+        "ingest_generation": job.ingest_generation,
+        "error": job.error,
+        "created_at": _isoformat(job.created_at),
+        "started_at": _isoformat(job.started_at),
+        "finished_at": _isoformat(job.finished_at),
+        "download": f"/exports/{job.id}/download" if job.status == EXPORT_COMPLETE else None,
+    }
+
+
+def submit_export(
+    kind: str, entity_id: str, fmt: str, mask_pii: bool = True, q: Optional[str] = None, since: Optional[int] = None,
+) -> dict:
+    """Record a queued export job and hand it to the worker pool.
+
+    Args:
+        kind: Key of `EXPORT_KINDS`.
+        entity_id: Business or user id the extract is for.
+        fmt: Extract format (key of `ENCODERS`).
+        mask_pii: Mask PII columns in the file.
+        q: Optional full-text query (raw text; parsed again by the worker).
+        since: Optional ingest generation; only reviews committed after it are exported.
+
+    Returns:
+        dict: `job_status` of the new job.
+    """
+    with SessionLocal() as db:
+        job = ExportJob(
+            id=uuid.uuid4().hex, kind=kind, entity_id=entity_id, format=fmt, mask_pii=mask_pii, query=q,
+            since_generation=since, status=EXPORT_QUEUED, rows_written=0, bytes_written=0,
+        )
+        db.add(job)
+        db.commit()
+        status = job_status(job)
+    executor.submit(run_export, job.id)
+    return status
+
+
+def get_job(job_id: str) -> Optional[ExportJob]:
+    """Load an export job (detached from its session), or None if unknown."""
+    with SessionLocal() as db:
+        return db.get(ExportJob, job_id)
+
+
+def _lineage(db) -> tuple:
+    ingest_id = db.scalar(select(func.max(IngestMetadata.id)).where(IngestMetadata.status == INGEST_COMPLETE))
+    generation = db.scalar(select(IngestGeneration.generation).where(IngestGeneration.id == 1)) or 0
+    return ingest_id, generation
+
+
+def _write_export(db, job: ExportJob, stmt, params: dict, path: str) -> None:
+    """Stream `stmt` into the file at `path`, committing progress on `job` as it goes."""
+    written = 0
+
+    def rows(result):
+        nonlocal written
+        for row in result:
+            written += 1
+            yield row
+
+    encoder = ENCODERS[job.format](HEADERS["reviews_expanded"], mask_pii=job.mask_pii)
+    reported = 0
+    # The cursor is read on its own session so progress commits don't end its transaction.
+    with SessionLocal() as reader, open(path, "wb") as raw:
+        result = reader.execute(stmt, params, execution_options={"yield_per": STREAM_BATCH_SIZE})
+        if job.format in GZIP_FORMATS:
+            sink = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=EXPORT_GZIP_LEVEL, mtime=0)
+        else:
+            sink = nullcontext(raw)
+        with sink as out:
+            for chunk in iter_encoded(encoder, rows(result)):
+                out.write(chunk)
+                if written - reported >= EXPORT_PROGRESS_ROWS:
+                    reported = written
+                    job.rows_written, job.bytes_written = written, raw.tell()
+                    db.commit()
+    job.rows_written = job.total_rows = written
+
+
+def run_export(job_id: str) -> None:
+    """Worker entry point: run one queued export job to completion or failure.
+
+    Args:
+        job_id: `export_jobs.id`; jobs no longer queued are ignored.
+    """
+    with SessionLocal() as db:
+        job = db.get(ExportJob, job_id)
+        if job is None or job.status != EXPORT_QUEUED:
+            return
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = os.path.join(EXPORT_DIR, f"{job.id}.{export_suffix(job.format)}")
+        partial = path + ".part"
+        try:
+            job.status, job.started_at = EXPORT_RUNNING, _now()
+            job.ingest_id, job.ingest_generation = _lineage(db)
+            terms = parse_query(job.query) if job.query else None
+            query = ReviewQuery(
+                "reviews_expanded", EXPORT_KINDS[job.kind][0], job.entity_id, terms=tuple(terms) if terms else None,
+                as_of=job.ingest_generation, since=job.since_generation,
+            )
+            dialect_name = db.get_bind().dialect.name
+            stmt, params = query.select(dialect_name), query.params(dialect_name)
+            db.commit()
+            _write_export(db, job, stmt, params, partial)
+            os.replace(partial, path)
+            job.status, job.file_path, job.bytes_written = EXPORT_COMPLETE, path, os.path.getsize(path)
+        except Exception as e:
+            logger.exception("Export job %s failed", job_id)
+            db.rollback()
+            job.status, job.error = EXPORT_FAILED, f"{type(e).__name__}: {e}"
+            if os.path.exists(partial):
+                os.remove(partial)
+        job.finished_at = _now()
+        db.commit()
+
+
+def fail_interrupted(bind: Engine = engine) -> int:
+    """Mark jobs left queued or running by a previous process as failed.
+
+    Args:
+        bind: Engine holding `export_jobs`.
+
+    Returns:
+        int: number of jobs marked failed.
+    """
+    with bind.begin() as conn:
+        result = conn.execute(
+            update(ExportJob)
+            .where(ExportJob.status.in_([EXPORT_QUEUED, EXPORT_RUNNING]))
+            .values(status=EXPORT_FAILED, error="Interrupted by a restart", finished_at=_now())
+        )
+    return result.rowcount
@@ -0,0 +1,236 @@
+# Bulk write path for ingestion.
+# Rows go straight to the table through Core executemany (SQLite and others) or
+# COPY FROM STDIN (Postgres), bypassing ORM object construction, the unit of
+# work and the identity map. Type conversion is done once per column.
+# Deduplication against existing rows happens in the database with
+# ON CONFLICT DO NOTHING, so cost follows the batch, not the table size; only
+# dialects with that clause (SQLite, Postgres) support `ignore_conflicts`.
+# With `returning`, the insert itself reports the keys of the rows it added
+# (INSERT ... RETURNING), so callers never re-read the table to find them;
+# only dialects without RETURNING fall back to probing the batch's keys.
+
+import io
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import DateTime, Integer, String, Table, bindparam, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import INGEST_BATCH_SIZE
+
+# Dialect name -> insert construct that supports `.on_conflict_do_nothing()`.
+CONFLICT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+# Keys per `IN (...)` probe when the dialect has no RETURNING (under SQLite's 999-variable limit before 3.32).
+_KEY_PROBE_BATCH = 500
+
+
+def _sqlite_datetime_strings(col: pd.Series) -> pd.Series:
+    """Format a UTC datetime column in SQLAlchemy's SQLite storage format.
+
+    Produces `YYYY-MM-DD HH:MM:SS.ffffff` for the whole column in one
+    vectorised call, so rows skip the per-value DateTime bind processor.
+    """
+    naive = col.dt.tz_convert(None).to_numpy().astype("datetime64[us]")
+    text = np.char.replace(np.datetime_as_string(naive, unit="us"), "T", " ")
+    return pd.Series(text.astype(object), index=col.index)
+
+
+def to_db_columns(df: pd.DataFrame, table: Table, dialect_name: str) -> dict:
+    """Convert DataFrame columns to DB-ready Python values, column by column.
+
+    Nulls (NaN/NaT/NA) become None, integer columns become Python ints and
+    timestamps become UTC Timestamps (a datetime subclass), or pre-formatted
+    UTC strings on SQLite. Missing `DateTime` values are filled with the load
+    time, matching the server default the column would otherwise receive.
+
+    Args:
+        df: DataFrame whose columns are a subset of `table`'s columns.
+        table: Target SQLAlchemy Table.
+        dialect_name: SQLAlchemy dialect name of the target database.
+
+    Returns:
+        dict: column name -> object ndarray, in DataFrame column order.
+    """
+    out = {}
+    for name in df.columns:
+        col = df[name]
+        col_type = table.c[name].type
+        if isinstance(col_type, DateTime):
+            col = pd.to_datetime(col, errors="coerce", utc=True)
+            col = col.fillna(pd.Timestamp.now(tz="UTC"))
+            if dialect_name == "sqlite":
+                col = _sqlite_datetime_strings(col)
+        elif isinstance(col_type, Integer):
+            num = pd.to_numeric(col, errors="coerce")
+            col = num.where(num == num.round()).astype("Int64")
+        values = col.astype(object)
+        out[name] = values.where(col.notna(), None).to_numpy()
+    return out
+
+
+def conflict_ignoring_insert(table: Table, dialect_name: str):
+    """Build `INSERT ... ON CONFLICT DO NOTHING` for `table` in the given dialect.
+
+    Args:
+        table: Target SQLAlchemy Table.
+        dialect_name: SQLAlchemy dialect name of the target database.
+
+    Returns:
+        Insert statement that skips rows whose primary/unique key already exists.
+
+    Raises:
+        ValueError: if the dialect has no ON CONFLICT DO NOTHING construct.
+    """
+    make = CONFLICT_INSERTS.get(dialect_name)
+    if make is None:
+        raise ValueError(
+            f"Conflict-ignoring inserts are not supported on {dialect_name!r}; "
+            f"supported dialects: {', '.join(sorted(CONFLICT_INSERTS))}"
+        )
+    return make(table).on_conflict_do_nothing()
+
+
+def _executemany_insert(session: Session, table: Table, columns: dict, batch_size: int, ignore_conflicts: bool) -> int:
+    """Insert rows with Core `insert()` executemany batches.
+
+    The statement is compiled once and rows are passed as positional tuples of
+    already-converted values, so no per-row parameter processing happens in
+    SQLAlchemy. With `ignore_conflicts` the statement is
+    `INSERT ... ON CONFLICT DO NOTHING` and only new rows are counted.
+    """
+    conn = session.connection()
+    stmt = conflict_ignoring_insert(table, conn.dialect.name) if ignore_conflicts else insert(table)
+    compiled = stmt.compile(dialect=conn.dialect, column_keys=list(columns))
+    if compiled.positiontup is not None:
+        rows = list(zip(*(columns[name] for name in compiled.positiontup)))
+    else:  # named paramstyle
+        rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    sql = compiled.string
+    inserted = 0
+    for start in range(0, len(rows), batch_size):
+        inserted += conn.exec_driver_sql(sql, rows[start:start + batch_size]).rowcount
+    return inserted
+
+
+def _returning_insert(
+    session: Session, table: Table, columns: dict, batch_size: int, ignore_conflicts: bool, returning: str
+) -> list:
+    """Insert rows and return the `returning` values of the rows actually added.
+
+    Uses `INSERT ... RETURNING` through SQLAlchemy's "insertmanyvalues"
+    batching, which packs each executemany page into multi-row VALUES
+    statements within the dialect's bind-parameter limit (DBAPI executemany
+    itself discards RETURNING rows). Rows skipped by `ignore_conflicts`
+    return nothing. Dialects without RETURNING (e.g. SQLite before 3.35)
+    probe the batch's keys before and after the insert instead.
+    """
+    conn = session.connection()
+    stmt = conflict_ignoring_insert(table, conn.dialect.name) if ignore_conflicts else insert(table)
+    if conn.dialect.name == "sqlite":
+        # `to_db_columns` already produced SQLite's DateTime storage strings; bind them as text.
+        stmt = stmt.values({
+            name: bindparam(name, type_=String() if isinstance(table.c[name].type, DateTime) else table.c[name].type)
+            for name in columns
+        })
+    names = list(columns)
+    key = table.c[returning]
+    keys = []
+    for start in range(0, len(columns[returning]), batch_size):
+        rows = [dict(zip(names, values)) for values in zip(*(columns[n][start:start + batch_size] for n in names))]
+        if conn.dialect.insert_returning:
+            keys += conn.execute(stmt.returning(key), rows).scalars().all()
+            continue
+        batch = columns[returning][start:start + batch_size].tolist()
+        before = _present_keys(conn, key, batch)
+        conn.execute(stmt, rows)
+        keys += list(_present_keys(conn, key, batch) - before)
+    return keys
+
+
+def _present_keys(conn, column, values: list) -> set:
+    """Which of `values` are stored in `column`, probed `_KEY_PROBE_BATCH` at a time."""
+    probe = select(column).where(column.in_(bindparam("keys", expanding=True)))
+    present = set()
+    for start in range(0, len(values), _KEY_PROBE_BATCH):
+        present.update(conn.execute(probe, {"keys": values[start:start + _KEY_PROBE_BATCH]}).scalars())
+    return present
+
+
+def _copy_insert(
+    session: Session, table: Table, columns: dict, ignore_conflicts: bool, returning: Optional[str] = None
+) -> Union[int, list]:
+    """Stream rows into Postgres with `COPY ... FROM STDIN` (CSV format).
+
+    Runs on the session's own DBAPI connection so the load shares the
+    ingest transaction. COPY cannot skip conflicting rows, so with
+    `ignore_conflicts` the rows are copied into a temporary staging table
+    and moved across with `INSERT ... SELECT ... ON CONFLICT DO NOTHING`,
+    whose RETURNING clause yields only the rows that were added.
+    """
+    frame = pd.DataFrame(columns)
+    buf = io.StringIO()
+    frame.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    cols = ", ".join(f'"{c}"' for c in frame.columns)
+    target = f"_stage_{table.name}" if ignore_conflicts else table.name
+    dbapi_conn = session.connection().connection.driver_connection
+    with dbapi_conn.cursor() as cur:
+        if ignore_conflicts:
+            cur.execute(f'DROP TABLE IF EXISTS "{target}"')
+            cur.execute(f'CREATE TEMP TABLE "{target}" (LIKE "{table.name}" INCLUDING DEFAULTS) ON COMMIT DROP')
+        sql = f'COPY "{target}" ({cols}) FROM STDIN WITH (FORMAT csv)'
+        if hasattr(cur, "copy_expert"):  # psycopg2
+            cur.copy_expert(sql, buf)
+        else:  # psycopg 3
+            with cur.copy(sql) as copy:
+                copy.write(buf.getvalue())
+        if not ignore_conflicts:
+            return len(frame) if returning is None else frame[returning].tolist()
+        sql = f'INSERT INTO "{table.name}" ({cols}) SELECT {cols} FROM "{target}" ON CONFLICT DO NOTHING'
+        if returning is None:
+            cur.execute(sql)
+            return cur.rowcount
+        cur.execute(f'{sql} RETURNING "{returning}"')
+        return [row[0] for row in cur.fetchall()]
+
+
+def bulk_insert(
+    session: Session,
+    table: Table,
+    df: pd.DataFrame,
+    batch_size: int = INGEST_BATCH_SIZE,
+    ignore_conflicts: bool = False,
+    returning: Optional[str] = None,
+) -> Union[int, list]:
+    """Append DataFrame rows to `table` using the fastest path for the dialect.
+
+    Args:
+        session: SQLAlchemy Session (the caller owns the transaction).
+        table: Target SQLAlchemy Table (e.g. `Review.__table__`).
+        df: Rows to insert; column names must match table columns.
+        batch_size: Rows per executemany batch (non-Postgres dialects).
+        ignore_conflicts: Skip rows whose primary/unique key already exists
+            (`ON CONFLICT DO NOTHING`) instead of failing.
+        returning: Column whose values to return for the rows actually
+            inserted (e.g. the primary key), taken from the insert itself.
+
+    Returns:
+        int: number of rows actually inserted; with `returning`, the list of
+        that column's stored values for those rows instead.
+
+    Raises:
+        ValueError: if `ignore_conflicts` is set on a dialect without ON CONFLICT support.
+    """
+    dialect_name = session.get_bind().dialect.name
+    if ignore_conflicts:
+        conflict_ignoring_insert(table, dialect_name)  # fail fast on unsupported dialects
+    if df.empty:
+        return 0 if returning is None else []
+    columns = to_db_columns(df, table, dialect_name)
+    if dialect_name == "postgresql":
+        return _copy_insert(session, table, columns, ignore_conflicts, returning)
+    if returning is not None:
+        return _returning_insert(session, table, columns, batch_size, ignore_conflicts, returning)
+    return _executemany_insert(session, table, columns, batch_size, ignore_conflicts)
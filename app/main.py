@@ -1,11 +1,34 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from .config import DB_POOL_TIMEOUT, METRICS_ENABLED
 from .database import engine
-from .models import Base as ModelsBase
-from .metadata import IngestMetadata
+from .metrics import RequestMetricsMiddleware
+from .migrate import upgrade
+from .jobs import fail_interrupted
 from .api import router as api_router
 
-# Ensure tables exist at startup (safe for SQLite/PoC)
-ModelsBase.metadata.create_all(bind=engine)
+# Ensure tables and indexes exist at startup (idempotent; see app/migrate.py)
+upgrade(engine)
+# Export jobs run in this process's worker pool; any left over from a previous one will never finish.
+fail_interrupted(engine)
 
 app = FastAPI(title="Trustpilot DGC PoC API", version="0.1.0")
 app.include_router(api_router)
+if METRICS_ENABLED:
+    # Per-route timings, bytes and SQL stats for GET /metrics (see app/metrics.py)
+    app.add_middleware(RequestMetricsMiddleware)
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """Answer 503 when no database connection frees up within DB_POOL_TIMEOUT.
+
+    Returns:
+        JSONResponse: 503 with a `Retry-After` hint instead of a 500.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database connection pool exhausted, retry later."},
+        headers={"Retry-After": str(max(1, round(DB_POOL_TIMEOUT)))},
+    )
@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, func
+from sqlalchemy import BigInteger, Boolean, ForeignKey, String, Integer, DateTime, Text, func
 from .database import Base
-from app.constants import TBL_INGEST_METADATA
+from app.constants import (
+    EXPORT_QUEUED, INGEST_COMPLETE, TBL_EXPORT_JOBS, TBL_INGEST_GENERATION, TBL_INGEST_METADATA,
+)
 
 class IngestMetadata(Base):
     __tablename__ = TBL_INGEST_METADATA
@@ -9,5 +11,48 @@ class IngestMetadata(Base):
     source_path: Mapped[str] = mapped_column(String, nullable=False)
     total_rows: Mapped[int] = mapped_column(Integer, nullable=False)
     loaded_rows: Mapped[int] = mapped_column(Integer, nullable=False)
-    file_hash: Mapped[str] = mapped_column(String, nullable=False)  # SHA256 or similar
+    file_hash: Mapped[str] = mapped_column(String, nullable=False, index=True)  # SHA256 or similar
+    # Size in bytes: a cheap pre-check so files of a never-seen size skip the
+    # separate hashing pass (NULL for runs recorded before it existed).
+    file_size: Mapped["int | None"] = mapped_column(BigInteger, nullable=True, index=True)
     created_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Resumable checkpoint: a run is inserted as "running" and `rows_processed`
+    # advances with each committed chunk. Rows from before checkpointing existed
+    # default to "complete".
+    status: Mapped[str] = mapped_column(String, nullable=False, server_default=INGEST_COMPLETE)
+    rows_processed: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    updated_at: Mapped["DateTime | None"] = mapped_column(DateTime(timezone=True), nullable=True, onupdate=func.now())
+    # Ingest generation of the run's latest committed chunk: reviews with
+    # `ingest_generation <= generation` include everything this run loaded.
+    generation: Mapped["int | None"] = mapped_column(BigInteger, nullable=True)
+
+class IngestGeneration(Base):
+    """Single-row counter advanced by every ingest commit; cached API responses are keyed on it."""
+    __tablename__ = TBL_INGEST_GENERATION
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    generation: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+class ExportJob(Base):
+    """One background extract (see app/jobs.py), with the data version it was read from."""
+    __tablename__ = TBL_EXPORT_JOBS
+    id: Mapped[str] = mapped_column(String, primary_key=True)  # uuid4 hex
+    kind: Mapped[str] = mapped_column(String, nullable=False)  # e.g. "reviews_business_expanded"
+    entity_id: Mapped[str] = mapped_column(String, nullable=False)
+    format: Mapped[str] = mapped_column(String, nullable=False)
+    mask_pii: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    query: Mapped["str | None"] = mapped_column(Text, nullable=True)  # full-text `q`, if any
+    status: Mapped[str] = mapped_column(String, nullable=False, server_default=EXPORT_QUEUED, index=True)
+    # Lineage: the latest completed ingest run and ingest generation when the query started.
+    ingest_id: Mapped["int | None"] = mapped_column(Integer, ForeignKey(f"{TBL_INGEST_METADATA}.id"), nullable=True)
+    ingest_generation: Mapped["int | None"] = mapped_column(BigInteger, nullable=True)
+    # Incremental export: only reviews committed after this generation.
+    since_generation: Mapped["int | None"] = mapped_column(BigInteger, nullable=True)
+    # Rows in the finished file; recorded on completion (no up-front count).
+    total_rows: Mapped["int | None"] = mapped_column(BigInteger, nullable=True)
+    rows_written: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    bytes_written: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    file_path: Mapped["str | None"] = mapped_column(String, nullable=True)
+    error: Mapped["str | None"] = mapped_column(Text, nullable=True)
+    created_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped["DateTime | None"] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped["DateTime | None"] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,366 @@
+# Request-level performance metrics in Prometheus text format.
+# `RequestMetricsMiddleware` times every HTTP request per route template:
+# duration, time to first byte and bytes sent. While a request runs, a
+# `RequestStats` object lives in a context variable. SQLAlchemy cursor hooks
+# (`instrument_engine`) add statement time to it, and the extract encoders
+# (`app/export.py`) add rows, cursor-fetch time and serialisation time to it,
+# including from threadpool workers, which inherit the context. Statements
+# slower than SLOW_QUERY_SECONDS are logged with their route and kept in a
+# small in-memory log. Everything is rendered on `GET /metrics` without a
+# client library; pool and response-cache counters are added at scrape time.
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.config import SLOW_QUERY_LOG_SIZE, SLOW_QUERY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Route label for requests that matched no route (keeps label cardinality bounded).
+UNMATCHED_ROUTE = "<unmatched>"
+# Route label for statements run outside a request (ingest, migrations).
+NO_ROUTE = "-"
+# Histogram buckets in seconds, from a cached lookup to a multi-million-row extract.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Longest statement text kept per slow query.
+_STATEMENT_CHARS = 2000
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with fixed label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] += amount
+
+    def value(self, labels: tuple = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in values]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with fixed label names."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((k, list(counts), total) for k, (counts, total) in self._series.items())
+        lines = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, "+Inf"), counts):
+                cumulative += n
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(round(total, 9))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Ordered set of metrics rendered together."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> list[str]:
+        lines = []
+        for metric in self.metrics:
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}", *metric.render()]
+        return lines
+
+
+registry = Registry()
+_ROUTE = ("method", "route")
+http_requests = registry.counter("http_requests_total", "HTTP requests by route and status.", (*_ROUTE, "status"))
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.", _ROUTE
+)
+http_ttfb = registry.histogram(
+    "http_time_to_first_byte_seconds", "Time from request start to the first response body message.", _ROUTE
+)
+http_bytes = registry.counter("http_response_bytes_total", "Response body bytes sent.", _ROUTE)
+db_queries = registry.counter("db_queries_total", "SQL statements executed.", _ROUTE)
+db_query_time = registry.histogram(
+    "db_query_seconds", "Per-request time spent executing SQL statements (cursor.execute).", _ROUTE
+)
+db_fetch_time = registry.histogram(
+    "db_fetch_seconds", "Per-request time spent pulling extract rows from the cursor.", _ROUTE
+)
+extract_rows = registry.counter("extract_rows_total", "Rows encoded into extract responses.", _ROUTE)
+extract_serialize_time = registry.histogram(
+    "extract_serialize_seconds", "Per-request time spent encoding extract rows (CSV / Parquet / Arrow).", _ROUTE
+)
+db_slow_queries = registry.counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_SECONDS.", ("route",)
+)
+
+
+class RequestStats:
+    """Timings accumulated for one in-flight request."""
+
+    __slots__ = ("scope", "queries", "query_seconds", "rows", "fetch_seconds", "serialize_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.rows = 0
+        self.fetch_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        """Route template once routing has run (e.g. `/users/{user_id}`)."""
+        return getattr(self.scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def record_extract(rows: int, fetch_seconds: float, serialize_seconds: float):
+    """Add one encoded batch to the current request's stats (no-op outside a request)."""
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += rows
+        stats.fetch_seconds += fetch_seconds
+        stats.serialize_seconds += serialize_seconds
+
+
+class SlowQueryLog:
+    """Bounded, thread-safe log of the most recent slow statements (without parameters)."""
+
+    def __init__(self, size: int = SLOW_QUERY_LOG_SIZE):
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, route: str, executemany: bool):
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "seconds": round(seconds, 6),
+            "route": route,
+            "executemany": executemany,
+            "statement": " ".join(statement.split())[:_STATEMENT_CHARS],
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def recent(self) -> list[dict]:
+        """Return logged statements, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_queries = SlowQueryLog()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+    if SLOW_QUERY_SECONDS and elapsed >= SLOW_QUERY_SECONDS:
+        route = stats.route if stats is not None else NO_ROUTE
+        db_slow_queries.inc((route,))
+        slow_queries.record(statement, elapsed, route, executemany)
+        logger.warning("Slow query (%.3fs, route %s): %s", elapsed, route, " ".join(statement.split())[:200])
+
+
+def instrument_engine(engine):
+    """Time every statement on `engine` (a sync Engine, or an AsyncEngine's `sync_engine`)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording per-route request metrics.
+
+    Pure ASGI (not `BaseHTTPMiddleware`), so streamed extracts are still sent
+    chunk by chunk; duration runs until the last body message is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        first_byte = None
+        sent = 0
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal first_byte, sent, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                if first_byte is None:
+                    first_byte = time.perf_counter()
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current.reset(token)
+            end = time.perf_counter()
+            labels = (scope["method"], stats.route)
+            http_requests.inc((*labels, str(status)))
+            http_duration.observe(labels, end - start)
+            http_ttfb.observe(labels, (first_byte or end) - start)
+            http_bytes.inc(labels, sent)
+            if stats.queries:
+                db_queries.inc(labels, stats.queries)
+                db_query_time.observe(labels, stats.query_seconds)
+            if stats.rows or stats.serialize_seconds:
+                extract_rows.inc(labels, stats.rows)
+                db_fetch_time.observe(labels, stats.fetch_seconds)
+                extract_serialize_time.observe(labels, stats.serialize_seconds)
+
+
+# Scrape-time families: snapshot key -> (metric name, type, help).
+POOL_FAMILIES = {
+    "size": ("db_pool_size", "gauge", "Configured persistent connections."),
+    "checked_out": ("db_pool_checked_out", "gauge", "Connections currently in use."),
+    "overflow": ("db_pool_overflow", "gauge", "Overflow connections currently open (negative: unused capacity)."),
+    "checked_in": ("db_pool_checked_in", "gauge", "Idle connections in the pool."),
+    "checkouts": ("db_pool_checkouts_total", "counter", "Successful connection checkouts."),
+    "timeouts": ("db_pool_timeouts_total", "counter", "Checkouts that timed out (503 responses)."),
+    "slow_waits": ("db_pool_slow_waits_total", "counter", "Checkouts that waited at least DB_POOL_SLOW_WAIT."),
+    "wait_seconds_total": ("db_pool_wait_seconds_total", "counter", "Total time spent waiting for a connection."),
+    "wait_seconds_max": ("db_pool_wait_seconds_max", "gauge", "Longest single checkout wait."),
+}
+CACHE_FAMILIES = {
+    "entries": ("response_cache_entries", "gauge", "Cached response bodies."),
+    "bytes": ("response_cache_bytes", "gauge", "Bytes held by cached bodies."),
+    "max_bytes": ("response_cache_max_bytes", "gauge", "Response cache memory budget."),
+    "hits": ("response_cache_hits_total", "counter", "Responses served from the cache."),
+    "misses": ("response_cache_misses_total", "counter", "Cache lookups that missed."),
+    "evictions": ("response_cache_evictions_total", "counter", "Entries evicted to stay within budget."),
+}
+STATEMENT_CACHE_FAMILIES = {
+    "entries": ("statement_cache_entries", "gauge", "Built review statements kept by query shape."),
+    "hits": ("statement_cache_hits_total", "counter", "Review statements reused from the statement cache."),
+    "misses": ("statement_cache_misses_total", "counter", "Review statements built on a statement cache miss."),
+}
+
+
+def _snapshot_families(families: dict, snapshots: dict, label: str = None) -> list[str]:
+    lines = []
+    for key, (name, kind, help) in families.items():
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for label_value, snapshot in snapshots.items():
+            if key not in snapshot:  # e.g. occupancy of a pool that is not a queue pool
+                continue
+            labels = _labels((label,), (label_value,)) if label else ""
+            lines.append(f"{name}{labels} {_number(snapshot[key])}")
+    return lines
+
+
+def render_metrics(pools: dict = None, cache: dict = None, statements: dict = None) -> str:
+    """Render all metrics in the Prometheus text exposition format (0.0.4).
+
+    Args:
+        pools: `pool_status()` output, rendered as `db_pool_*{pool=...}` families.
+        cache: `response_cache.stats()` output, rendered as `response_cache_*` families.
+        statements: `statement_cache.stats()` output, rendered as `statement_cache_*` families.
+
+    Returns:
+        str: exposition text ending in a newline.
+    """
+    lines = registry.render()
+    if pools:
+        lines += _snapshot_families(POOL_FAMILIES, pools, "pool")
+    if cache:
+        lines += _snapshot_families(CACHE_FAMILIES, {"": cache})
+    if statements:
+        lines += _snapshot_families(STATEMENT_CACHE_FAMILIES, {"": statements})
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,145 @@
+# Lightweight, idempotent schema migrations.
+# `create_all` only creates missing tables; it never touches tables that already
+# exist. Each step below inspects the live schema and applies only what is missing,
+# so `upgrade` is safe to run on every startup and on databases of any age.
+
+import argparse
+
+from sqlalchemy import inspect, select
+from sqlalchemy.engine import Engine
+
+from .aggregates import rebuild as rebuild_rating_aggregates
+from .database import Base, engine
+from .search import create_search_index
+from . import models  # noqa: F401  (register tables on Base.metadata)
+from . import metadata  # noqa: F401
+from app.constants import TBL_BUSINESS_DAILY_RATINGS, TBL_REVIEWS
+
+# Single-column indexes superseded by the composite (entity, created_at, review_id) ones.
+OBSOLETE_INDEXES = {
+    TBL_REVIEWS: ["ix_reviews_user_id", "ix_reviews_business_id"],
+}
+
+
+def add_missing_columns(conn) -> list[str]:
+    """Add columns declared on the models but absent from existing tables.
+
+    New columns must be nullable or carry a server default so existing rows
+    can be back-filled by the `ALTER TABLE`.
+
+    Args:
+        conn: SQLAlchemy Connection inside a transaction.
+
+    Returns:
+        list[str]: `table.column` names added.
+    """
+    insp = inspect(conn)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {conn.dialect.ddl_compiler(conn.dialect, None).get_column_default_string(column)}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            conn.exec_driver_sql(ddl)
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def create_missing_indexes(conn) -> list[str]:
+    """Create indexes declared on the models but absent from existing tables.
+
+    Args:
+        conn: SQLAlchemy Connection inside a transaction.
+
+    Returns:
+        list[str]: names of indexes created.
+    """
+    insp = inspect(conn)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        existing = {ix["name"] for ix in insp.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+    return created
+
+
+def drop_obsolete_indexes(conn) -> list[str]:
+    """Drop indexes made redundant by newer composite indexes.
+
+    Args:
+        conn: SQLAlchemy Connection inside a transaction.
+
+    Returns:
+        list[str]: names of indexes dropped.
+    """
+    insp = inspect(conn)
+    dropped = []
+    for table_name, names in OBSOLETE_INDEXES.items():
+        existing = {ix["name"] for ix in insp.get_indexes(table_name)}
+        for name in names:
+            if name in existing:
+                conn.exec_driver_sql(f"DROP INDEX {name}")
+                dropped.append(name)
+    return dropped
+
+
+def backfill_rating_aggregates(conn) -> list[str]:
+    """Populate `business_daily_ratings` when it is empty but reviews exist.
+
+    Ingest keeps the table current from then on (see app/aggregates.py).
+
+    Args:
+        conn: SQLAlchemy Connection inside a transaction.
+
+    Returns:
+        list[str]: a description of the backfill, if one ran.
+    """
+    if conn.scalar(select(models.BusinessDailyRating.business_id).limit(1)) is not None:
+        return []
+    if conn.scalar(select(models.Review.review_id).limit(1)) is None:
+        return []
+    return [f"{TBL_BUSINESS_DAILY_RATINGS} ({rebuild_rating_aggregates(conn)} buckets)"]
+
+
+MIGRATIONS = [
+    add_missing_columns,
+    create_missing_indexes,
+    drop_obsolete_indexes,
+    backfill_rating_aggregates,
+    create_search_index,
+]
+
+
+def upgrade(bind: Engine = engine) -> list[str]:
+    """Bring a database up to the current model schema.
+
+    Creates missing tables, then runs every step in `MIGRATIONS`. Building
+    indexes on a large existing `reviews` table takes a while, so run
+    `python -m app.migrate` ahead of deploying rather than relying on startup.
+
+    Args:
+        bind: Engine to migrate (defaults to the application engine).
+
+    Returns:
+        list[str]: human-readable descriptions of the changes applied.
+    """
+    Base.metadata.create_all(bind=bind)
+    applied = []
+    with bind.begin() as conn:
+        for step in MIGRATIONS:
+            applied += [f"{step.__name__}: {name}" for name in step(conn)]
+    return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply schema migrations to DATABASE_URL")
+    parser.parse_args()
+    changes = upgrade()
+    print("\n".join(changes) if changes else "Schema is up to date.")
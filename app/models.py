@@ -1,10 +1,12 @@
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, func
+from datetime import date
+from sqlalchemy import BigInteger, Date, String, Integer, DateTime, ForeignKey, Index, Text, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from .database import Base
 from app.constants import (
     TBL_USERS,
     TBL_BUSINESSES,
     TBL_REVIEWS,
+    TBL_BUSINESS_DAILY_RATINGS,
 )
 
 class User(Base):
@@ -26,14 +28,42 @@ class Business(Base):
 class Review(Base):
     __tablename__ = TBL_REVIEWS
     review_id: Mapped[str] = mapped_column(String, primary_key=True)
-    user_id: Mapped[str] = mapped_column(String, ForeignKey(f"{TBL_USERS}.user_id"), index=True)
-    business_id: Mapped[str] = mapped_column(String, ForeignKey(f"{TBL_BUSINESSES}.business_id"), index=True)
+    user_id: Mapped[str] = mapped_column(String, ForeignKey(f"{TBL_USERS}.user_id"))
+    business_id: Mapped[str] = mapped_column(String, ForeignKey(f"{TBL_BUSINESSES}.business_id"))
 
     rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     title: Mapped[str | None] = mapped_column(String, nullable=True)
     text: Mapped[str | None] = mapped_column(Text, nullable=True)
     ip_address: Mapped[str | None] = mapped_column(String, nullable=True)
     created_at: Mapped["DateTime | None"] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Ingest generation whose commit added the row (0 for rows loaded before it was tracked).
+    # Reviews are append-only, so `ingest_generation <= G` is exactly the data visible at generation G.
+    ingest_generation: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
 
     user = relationship("User", back_populates="reviews")
     business = relationship("Business", back_populates="reviews")
+
+class BusinessDailyRating(Base):
+    """Review count per (business, UTC day, rating); maintained by ingest (see app/aggregates.py)."""
+    __tablename__ = TBL_BUSINESS_DAILY_RATINGS
+    business_id: Mapped[str] = mapped_column(String, ForeignKey(f"{TBL_BUSINESSES}.business_id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    # 0 counts reviews without a (valid integer) rating.
+    rating: Mapped[int] = mapped_column(Integer, primary_key=True)
+    review_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+# Composite indexes matching the extract query shape: equality on the entity,
+# then the (created_at DESC, review_id DESC) keyset order, so a page is an
+# index range scan that stops after `limit` rows instead of a full sort.
+# On Postgres `rating` is carried as an included column so rating filters are
+# evaluated from the index. These also serve plain user_id/business_id lookups.
+Index(
+    "ix_reviews_business_created",
+    Review.business_id, Review.created_at.desc(), Review.review_id.desc(),
+    postgresql_include=["rating"],
+)
+Index(
+    "ix_reviews_user_created",
+    Review.user_id, Review.created_at.desc(), Review.review_id.desc(),
+    postgresql_include=["rating"],
+)
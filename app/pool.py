@@ -0,0 +1,108 @@
+# Connection pool instrumentation.
+# Pools are subclassed so every checkout is timed where it actually blocks
+# (`_do_get`), giving wait-time and timeout counts per engine. Slow waits and
+# timeouts are logged, so pool exhaustion under a burst of exports is visible
+# instead of queueing silently.
+
+import logging
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from app.config import DB_POOL_SLOW_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Thread-safe counters for one engine's connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        """Record one checkout attempt that blocked for `seconds`."""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if seconds >= DB_POOL_SLOW_WAIT:
+                self.slow_waits += 1
+
+    def snapshot(self, pool) -> dict:
+        """Return counters plus, for queue pools, the pool's live occupancy.
+
+        Other pools (e.g. the `SingletonThreadPool` of in-memory SQLite) have
+        no size or overflow to report, so only the counters are returned.
+
+        Args:
+            pool: The engine's SQLAlchemy pool.
+
+        Returns:
+            dict: JSON-serialisable metrics.
+        """
+        with self._lock:
+            counters = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "slow_waits": self.slow_waits,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+        if not isinstance(pool, QueuePool):
+            return counters
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checked_in": pool.checkedin(),
+            **counters,
+        }
+
+
+def instrumented_pool(pool_cls, metrics: PoolMetrics):
+    """Return a subclass of `pool_cls` that reports checkout waits to `metrics`.
+
+    Args:
+        pool_cls: A queue-based SQLAlchemy pool class (`QueuePool`, `AsyncAdaptedQueuePool`).
+        metrics: Counters to update.
+
+    Returns:
+        type: pool class to pass as `poolclass=`.
+    """
+
+    class InstrumentedPool(pool_cls):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                waited = time.perf_counter() - start
+                metrics.record_wait(waited, timed_out=True)
+                logger.warning(
+                    "%s pool exhausted after %.2fs wait (size=%d, checked out=%d, overflow=%d)",
+                    metrics.name, waited, self.size(), self.checkedout(), self.overflow(),
+                )
+                raise
+            waited = time.perf_counter() - start
+            metrics.record_wait(waited)
+            if waited >= DB_POOL_SLOW_WAIT:
+                logger.warning(
+                    "%s pool checkout waited %.2fs (size=%d, checked out=%d, overflow=%d)",
+                    metrics.name, waited, self.size(), self.checkedout(), self.overflow(),
+                )
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_cls.__name__}"
+    return InstrumentedPool
@@ -0,0 +1,243 @@
+# Review query builder shared by every review extract.
+# Normalized, expanded, search, batch and background-export queries all select
+# from `reviews` with the same optional filters (date range, rating range,
+# full-text match) and the same (created_at DESC, review_id DESC) order, and
+# page by keyset cursor or offset. Reviews are append-only and stamped with the
+# ingest generation that committed them, so `as_of` pins a snapshot that stays
+# consistent across pages while ingest keeps committing, and `since` selects
+# only what later generations added. A `ReviewQuery` describes one request. Its
+# statements carry named bind parameters only, never values, so a statement
+# depends on the query's *shape* alone: projection, which filters are set,
+# cursor kind and dialect. Each shape is built once and kept in
+# `statement_cache`. Executing the same statement object lets SQLAlchemy reuse
+# its memoized cache key and compiled SQL, instead of rebuilding and
+# re-traversing the statement on every request.
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Optional
+
+from sqlalchemy import BigInteger, Integer, String, and_, bindparam, or_, select, type_coerce
+
+from app.config import STATEMENT_CACHE_SIZE
+from .models import Business, Review, User
+from .schemas import HEADERS
+from .search import apply_search, search_params
+from .utils import header_columns
+
+REVIEW_COLUMNS = header_columns(Review, HEADERS["reviews"])
+# Joined columns; `user_id` / `business_id` come from `reviews`, the rest from whichever table has them.
+EXPANDED_COLUMNS = header_columns((Review, User, Business), HEADERS["reviews_expanded"])
+
+# Projection name (a `HEADERS` key) -> select over `reviews` with any joins it needs.
+# Both select plain columns, so rows are Core tuples in output order and no ORM
+# entity is hydrated or tracked in an identity map.
+PROJECTIONS = {
+    "reviews": lambda: select(*REVIEW_COLUMNS),
+    "reviews_expanded": lambda: (
+        select(*EXPANDED_COLUMNS)
+        .select_from(Review)
+        .join(User, Review.user_id == User.user_id)
+        .join(Business, Review.business_id == Business.business_id)
+    ),
+}
+
+# Bind parameter names shared by the statements and `ReviewQuery.params`.
+P_ENTITY_ID = "entity_id"
+P_IDS = "ids"
+P_LIMIT = "limit"
+P_OFFSET = "offset"
+P_PEEK_OFFSET = "peek_offset"
+P_CURSOR_CREATED_AT = "cursor_created_at"
+P_CURSOR_REVIEW_ID = "cursor_review_id"
+
+
+class StatementCache:
+    """Thread-safe LRU of built statements keyed by query shape (size 0 disables it)."""
+
+    def __init__(self, max_entries: int = STATEMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, build: Callable):
+        """Return the statement cached under `key`, building and caching it on a miss."""
+        with self._lock:
+            stmt = self._entries.get(key)
+            if stmt is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return stmt
+            self.misses += 1
+        stmt = build()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = stmt
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return stmt
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+statement_cache = StatementCache()
+
+
+def created_at_key(dialect_name: str):
+    """Return the `created_at` expression used as the keyset sort key.
+
+    SQLite stores timestamps as text and orders them lexically; rows filled by
+    the server default (`CURRENT_TIMESTAMP`) lack the microsecond suffix used
+    for bound datetimes, so the cursor must carry and compare the raw stored
+    string. Other backends compare native timestamps.
+
+    Args:
+        dialect_name: SQLAlchemy dialect name of the bound engine.
+
+    Returns:
+        Column expression (same SQL as `Review.created_at`).
+    """
+    if dialect_name == "sqlite":
+        return type_coerce(Review.created_at, String)
+    return Review.created_at
+
+
+def keyset_predicate(null_cursor: bool, dialect_name: str, include_nulls: bool):
+    """Build the seek predicate selecting rows strictly after the cursor bind parameters.
+
+    Rows are ordered by (created_at DESC, review_id DESC). The non-NULL case is
+    written as `created_at <= c AND (created_at < c OR review_id < id)` so the
+    planner turns it into a range bound on the composite index. NULL
+    `created_at` values sort last in that order on SQLite and first on
+    Postgres, so the predicate needs to know which side of the cursor they
+    fall on; the extra NULL branch is only added when such rows exist because
+    it prevents the range scan.
+
+    Args:
+        null_cursor: Whether the cursor row's created_at is NULL.
+        dialect_name: SQLAlchemy dialect name of the bound engine.
+        include_nulls: Whether NULL created_at rows may still follow the cursor.
+
+    Returns:
+        SQLAlchemy boolean clause over `P_CURSOR_CREATED_AT` / `P_CURSOR_REVIEW_ID`.
+    """
+    key = created_at_key(dialect_name)
+    review_id = bindparam(P_CURSOR_REVIEW_ID, type_=String)
+    nulls_last = dialect_name != "postgresql"
+    if null_cursor:
+        after_nulls = and_(key.is_(None), Review.review_id < review_id)
+        return after_nulls if nulls_last else or_(key.is_not(None), after_nulls)
+    created_at = bindparam(P_CURSOR_CREATED_AT, type_=key.type)
+    after = and_(key <= created_at, or_(key < created_at, Review.review_id < review_id))
+    return or_(after, key.is_(None)) if nulls_last and include_nulls else after
+
+
+@dataclass(frozen=True)
+class ReviewQuery:
+    """Projection and filters of one review extract.
+
+    Attributes:
+        projection: Key of `PROJECTIONS` ("reviews" or "reviews_expanded").
+        entity: Review column the rows are restricted to (`business_id` / `user_id`), or None for all reviews.
+        entity_id: Value `entity` must equal; None with `many` set.
+        many: Match `entity` against the expanding `ids` parameter (batch lookups), ordered by entity first.
+        start_date: Inclusive lower bound on created_at.
+        end_date: Exclusive upper bound on created_at.
+        min_rating: Minimum rating (inclusive).
+        max_rating: Maximum rating (inclusive).
+        terms: Parsed full-text query; rows are the matches, ranked best first.
+        as_of: Snapshot: only reviews committed at or before this ingest generation.
+        since: Incremental: only reviews committed after this ingest generation.
+    """
+
+    projection: str = "reviews"
+    entity: Optional[str] = None
+    entity_id: Optional[str] = None
+    many: bool = False
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    min_rating: Optional[int] = None
+    max_rating: Optional[int] = None
+    terms: Optional[tuple] = None
+    as_of: Optional[int] = None
+    since: Optional[int] = None
+
+    def shape(self, dialect_name: str) -> tuple:
+        """Everything that changes the SQL text (but not the bound values)."""
+        return (
+            self.projection, self.entity, self.many,
+            self.start_date is not None, self.end_date is not None,
+            self.min_rating is not None, self.max_rating is not None,
+            bool(self.terms), self.as_of is not None, self.since is not None, dialect_name,
+        )
+
+    def params(self, dialect_name: str) -> dict:
+        """Bound values for `select` (the page, cursor and `ids` values are added by the caller)."""
+        values = {
+            P_ENTITY_ID: self.entity_id,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "min_rating": self.min_rating,
+            "max_rating": self.max_rating,
+            "as_of": self.as_of,
+            "since": self.since,
+        }
+        values = {k: v for k, v in values.items() if v is not None}
+        if self.terms:
+            values.update(search_params(list(self.terms), dialect_name))
+        return values
+
+    def select(self, dialect_name: str):
+        """Filtered select in extract order (relevance order with `terms`), without paging; cached per shape."""
+        return statement_cache.get(("select",) + self.shape(dialect_name), lambda: self._build(dialect_name))
+
+    def cached(self, kind: tuple, dialect_name: str, build: Callable):
+        """Cache a statement derived from `select` (a page, peek, probe ...) under this query's shape."""
+        return statement_cache.get(kind + self.shape(dialect_name), build)
+
+    def _build(self, dialect_name: str):
+        stmt = PROJECTIONS[self.projection]()
+        if self.entity is not None:
+            column = getattr(Review, self.entity)
+            if self.many:
+                stmt = stmt.where(column.in_(bindparam(P_IDS, expanding=True)))
+            else:
+                stmt = stmt.where(column == bindparam(P_ENTITY_ID))
+        if self.start_date is not None:
+            stmt = stmt.where(Review.created_at >= bindparam("start_date", type_=Review.created_at.type))
+        if self.end_date is not None:
+            stmt = stmt.where(Review.created_at < bindparam("end_date", type_=Review.created_at.type))
+        if self.min_rating is not None:
+            stmt = stmt.where(Review.rating >= bindparam("min_rating", type_=Integer))
+        if self.max_rating is not None:
+            stmt = stmt.where(Review.rating <= bindparam("max_rating", type_=Integer))
+        if self.as_of is not None:
+            stmt = stmt.where(Review.ingest_generation <= bindparam("as_of", type_=BigInteger))
+        if self.since is not None:
+            stmt = stmt.where(Review.ingest_generation > bindparam("since", type_=BigInteger))
+        if self.terms:
+            return apply_search(stmt, dialect_name)
+        order = (Review.created_at.desc(), Review.review_id.desc())
+        if self.many:
+            return stmt.order_by(getattr(Review, self.entity), *order)
+        return stmt.order_by(*order)
+
+
+def limit_offset(stmt):
+    """`stmt` paged by the `limit` / `offset` bind parameters."""
+    return stmt.limit(bindparam(P_LIMIT, type_=Integer)).offset(bindparam(P_OFFSET, type_=Integer))
@@ -0,0 +1,168 @@
+# Full-text search over review titles and texts.
+# SQLite: an external-content FTS5 table (`reviews_fts`) keyed by the reviews
+# rowid, so only the inverted index is stored and review text is not copied.
+# Reviews are append-only, so ingest indexes each chunk with one
+# `INSERT ... SELECT` over the rowids it has just added (`index_new_reviews`).
+# Postgres: a stored generated `tsvector` column with a GIN index, which the
+# server maintains on every insert.
+#
+# Queries are reduced to word terms that are ANDed together, and a trailing
+# `*` makes a term a prefix match. This is the same on both backends, and
+# arbitrary user input can never produce a syntax error. Matches are ranked
+# best first: bm25 on SQLite, ts_rank_cd on Postgres.
+
+import logging
+import re
+from typing import Optional
+
+from sqlalchemy import String, bindparam, column, func, inspect, literal_column, select, table
+from sqlalchemy.exc import OperationalError
+
+from app.config import SEARCH_LANGUAGE, SEARCH_MAX_TERMS
+from app.constants import F_SEARCH_VECTOR, TBL_REVIEWS, TBL_REVIEWS_FTS
+from .models import Review
+
+logger = logging.getLogger(__name__)
+
+_TERM = re.compile(r"(\w+)(\*?)")
+_FTS = table(TBL_REVIEWS_FTS, column("rowid"))
+_FTS_MATCH = literal_column(TBL_REVIEWS_FTS)
+_REVIEW_ROWID = literal_column(f"{TBL_REVIEWS}.rowid")
+_SEARCH_VECTOR = literal_column(f"{TBL_REVIEWS}.{F_SEARCH_VECTOR}")
+_GIN_INDEX = f"ix_{TBL_REVIEWS}_{F_SEARCH_VECTOR}"
+# Bind parameter carrying the MATCH / to_tsquery input (see `search_params`).
+P_SEARCH = "search"
+
+
+def parse_query(q: str) -> list[tuple[str, bool]]:
+    """Split a free-text query into (term, is_prefix) pairs.
+
+    Args:
+        q: User input; punctuation and operators are ignored.
+
+    Returns:
+        list[tuple[str, bool]]: up to SEARCH_MAX_TERMS lower-cased, de-duplicated terms.
+    """
+    terms = []
+    for word, star in _TERM.findall(q.lower()):
+        if (word, bool(star)) not in terms:
+            terms.append((word, bool(star)))
+    return terms[:SEARCH_MAX_TERMS]
+
+
+def fts5_query(terms: list[tuple[str, bool]]) -> str:
+    """FTS5 MATCH expression: quoted terms (implicit AND), `*` for prefixes."""
+    return " ".join(f'"{word}"' + ("*" if prefix else "") for word, prefix in terms)
+
+
+def tsquery(terms: list[tuple[str, bool]]) -> str:
+    """Postgres `to_tsquery` input: terms joined with `&`, `:*` for prefixes."""
+    return " & ".join(word + (":*" if prefix else "") for word, prefix in terms)
+
+
+def search_params(terms: list[tuple[str, bool]], dialect_name: str) -> dict:
+    """Bound values for a statement built by `apply_search`.
+
+    Args:
+        terms: Output of `parse_query` (non-empty).
+        dialect_name: SQLAlchemy dialect name of the bound engine.
+
+    Returns:
+        dict: `{P_SEARCH: <FTS5 MATCH expression or tsquery>}`.
+    """
+    return {P_SEARCH: fts5_query(terms) if dialect_name == "sqlite" else tsquery(terms)}
+
+
+def apply_search(stmt, dialect_name: str):
+    """Restrict a select over `reviews` to full-text matches, best match first.
+
+    The query itself is the `P_SEARCH` bind parameter (see `search_params`),
+    so one statement serves every search of the same shape.
+
+    Args:
+        stmt: Select whose FROM clause includes `reviews`.
+        dialect_name: SQLAlchemy dialect name of the bound engine.
+
+    Returns:
+        Select ordered by relevance, then review_id.
+    """
+    search = bindparam(P_SEARCH, type_=String)
+    if dialect_name == "sqlite":
+        return (
+            stmt.join_from(Review, _FTS, _FTS.c.rowid == _REVIEW_ROWID)
+            .where(_FTS_MATCH.op("MATCH")(search))
+            .order_by(func.bm25(_FTS_MATCH), Review.review_id)
+        )
+    query = func.to_tsquery(SEARCH_LANGUAGE, search)
+    return stmt.where(_SEARCH_VECTOR.op("@@")(query)).order_by(
+        func.ts_rank_cd(_SEARCH_VECTOR, query).desc(), Review.review_id
+    )
+
+
+def _fts_exists(conn) -> bool:
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TBL_REVIEWS_FTS,)
+    ).first() is not None
+
+
+def create_search_index(conn) -> list[str]:
+    """Create the full-text index if missing, indexing any existing reviews.
+
+    Args:
+        conn: SQLAlchemy Connection inside a transaction.
+
+    Returns:
+        list[str]: description of what was created.
+    """
+    if conn.dialect.name == "sqlite":
+        if _fts_exists(conn):
+            return []
+        try:
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE {TBL_REVIEWS_FTS} USING fts5("
+                f"title, text, content='{TBL_REVIEWS}', content_rowid='rowid', "
+                "tokenize='porter unicode61 remove_diacritics 2')"
+            )
+        except OperationalError as e:  # SQLite built without FTS5
+            logger.warning("Full-text search unavailable: %s", e)
+            return []
+        conn.exec_driver_sql(f"INSERT INTO {TBL_REVIEWS_FTS}({TBL_REVIEWS_FTS}) VALUES ('rebuild')")
+        return [TBL_REVIEWS_FTS]
+    if conn.dialect.name != "postgresql":
+        return []
+    created = []
+    if F_SEARCH_VECTOR not in {c["name"] for c in inspect(conn).get_columns(TBL_REVIEWS)}:
+        language = SEARCH_LANGUAGE.replace("'", "''")
+        conn.exec_driver_sql(
+            f"ALTER TABLE {TBL_REVIEWS} ADD COLUMN {F_SEARCH_VECTOR} tsvector GENERATED ALWAYS AS "
+            f"(to_tsvector('{language}'::regconfig, coalesce(title, '') || ' ' || coalesce(text, ''))) STORED"
+        )
+        created.append(f"{TBL_REVIEWS}.{F_SEARCH_VECTOR}")
+    if _GIN_INDEX not in {ix["name"] for ix in inspect(conn).get_indexes(TBL_REVIEWS)}:
+        conn.exec_driver_sql(f"CREATE INDEX {_GIN_INDEX} ON {TBL_REVIEWS} USING GIN ({F_SEARCH_VECTOR})")
+        created.append(_GIN_INDEX)
+    return created
+
+
+def reviews_watermark(session) -> Optional[int]:
+    """Highest reviews rowid before an insert (SQLite with FTS only; None elsewhere)."""
+    conn = session.connection()
+    if conn.dialect.name != "sqlite" or not _fts_exists(conn):
+        return None
+    return conn.scalar(select(func.max(_REVIEW_ROWID)).select_from(Review)) or 0
+
+
+def index_new_reviews(session, watermark: Optional[int]) -> None:
+    """Add reviews inserted after `watermark` to the FTS5 index. Does not commit.
+
+    Args:
+        session: SQLAlchemy Session (same transaction as the insert).
+        watermark: `reviews_watermark` taken before the insert; None is a no-op.
+    """
+    if watermark is None:
+        return
+    session.connection().exec_driver_sql(
+        f"INSERT INTO {TBL_REVIEWS_FTS}(rowid, title, text) "
+        f"SELECT rowid, title, text FROM {TBL_REVIEWS} WHERE rowid > ?",
+        (watermark,),
+    )
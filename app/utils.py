@@ -1,3 +1,7 @@
+import base64
+import json
+from datetime import datetime
+
 from sqlalchemy.inspection import inspect
 
 def sa_to_dict(obj, exclude=None, prefix=None):
@@ -17,4 +21,58 @@ def sa_to_dict(obj, exclude=None, prefix=None):
         prefix + c.key: getattr(obj, c.key)
         for c in inspect(obj).mapper.column_attrs
         if c.key not in exclude
-    }
\ No newline at end of file
+    }
+
+def header_columns(model, headers: list[str]) -> list:
+    """Resolve output headers to mapped columns, in header order.
+
+    Selecting these instead of the entity returns plain Core rows that are
+    already in output order, so no ORM instances are built per row.
+
+    Args:
+        model: SQLAlchemy ORM model class, or a tuple of them for a joined
+            projection (each header resolves to the first model mapping it).
+        headers: Column names (e.g. `HEADERS["reviews"]`).
+
+    Returns:
+        list: instrumented attributes, one per header.
+    """
+    models = model if isinstance(model, tuple) else (model,)
+    return [getattr(next(m for m in models if name in m.__table__.c), name) for name in headers]
+
+def encode_cursor(created_at, review_id: str) -> str:
+    """Encode a review sort key into an opaque, URL-safe pagination cursor.
+
+    Args:
+        created_at: `created_at` of the last row on the page (datetime, raw
+            stored string, or None).
+        review_id: `review_id` of the last row on the page (tie-breaker).
+
+    Returns:
+        str: base64url token without padding.
+    """
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps([created_at, review_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> tuple:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        token: opaque cursor string.
+
+    Returns:
+        tuple: (created_at string or None, review_id).
+
+    Raises:
+        ValueError: if the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, review_id = json.loads(raw)
+        if not isinstance(review_id, str) or not isinstance(created_at, (str, type(None))):
+            raise ValueError("cursor fields must be strings")
+        return created_at, review_id
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid cursor: {token!r}") from exc
@@ -0,0 +1,66 @@
+"""Batch lookup benchmark: one `GET /users/{id}` per user vs one `POST /users/batch`.
+
+Loads synthetic users into a scratch SQLite database, then resolves the same
+ids through the API in-process (Starlette TestClient) both ways and reports
+users per second.
+
+    python benchmarks/bench_batch_lookup.py --users 100000 --lookups 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--users", type=int, default=100_000)
+parser.add_argument("--lookups", type=int, default=50_000)
+parser.add_argument("--single", type=int, default=2_000, help="Ids fetched one request at a time")
+parser.add_argument("--db", default="/tmp/bench_batch_lookup.db")
+args = parser.parse_args()
+
+if os.path.exists(args.db):
+    os.remove(args.db)
+os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+os.environ["RESPONSE_CACHE_MAX_BYTES"] = "0"  # measure lookups, not the response cache
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import constants as C  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.loader import bulk_insert  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import User  # noqa: E402
+
+
+def main():
+    with Session(engine) as db:
+        bulk_insert(db, User.__table__, pd.DataFrame({
+            C.F_USER_ID: [f"u{i}" for i in range(args.users)],
+            C.F_USER_NAME: "Some Name",
+            C.F_EMAIL: "someone@example.com",
+        }))
+        db.commit()
+    client = TestClient(app)
+    ids = [f"u{(i * 7919) % args.users}" for i in range(args.lookups)]
+
+    t0 = time.perf_counter()
+    for user_id in ids[:args.single]:
+        assert client.get(f"/users/{user_id}").status_code == 200
+    single = args.single / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    r = client.post("/users/batch", content="\n".join(ids).encode(), headers={"content-type": "text/plain"})
+    elapsed = time.perf_counter() - t0
+    assert r.status_code == 200 and r.text.count("\n") - 1 == len(set(ids))
+
+    print(f"{args.users:,} users in DB")
+    print(f"  GET /users/{{id}}   {single:10,.0f} users/s ({args.single:,} requests)")
+    print(f"  POST /users/batch {len(ids) / elapsed:10,.0f} users/s ({len(ids):,} ids, one request, {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
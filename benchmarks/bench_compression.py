@@ -0,0 +1,68 @@
+"""Response compression benchmark: CPU cost vs bytes saved for CSV extracts.
+
+Encodes synthetic review rows as CSV with the same encoder and chunking as the
+API (`CsvEncoder`, `STREAM_CHUNK_BYTES`), then compresses the chunk stream with
+each Content-Encoding and level as `app.compression` does per response. For
+each link speed it estimates delivery time as the slower of the CPU time
+(encode + compress) and the transfer time, since streaming overlaps the two.
+
+    python benchmarks/bench_compression.py --rows 200000 --link-mbps 10 100 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import constants as C  # noqa: E402
+from app.compression import COMPRESSORS  # noqa: E402
+from app.export import CsvEncoder, iter_encoded  # noqa: E402
+from app.schemas import HEADERS  # noqa: E402
+from synthetic import _texts, business_cdf, make_frame  # noqa: E402
+
+LEVELS = {"gzip": (1, 3, 6, 9), "zstd": (1, 3, 6, 9, 19)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--link-mbps", type=float, nargs="+", default=[10, 100, 1000], help="Link speeds (Mbit/s)")
+    args = parser.parse_args()
+
+    frame = make_frame(np.arange(args.rows), max(args.rows // 5, 1), business_cdf(1000, 1.1), _texts(2000, 7))
+    source = {
+        C.F_REVIEW_ID: frame[C.COL_REVIEW_ID], C.F_USER_ID: frame[C.COL_REVIEWER_ID],
+        C.F_BUSINESS_ID: frame[C.COL_BUSINESS_ID], C.F_RATING: frame[C.COL_REVIEW_RATING].astype(int),
+        C.F_TITLE: frame[C.COL_REVIEW_TITLE], C.F_TEXT: frame[C.COL_REVIEW_CONTENT], C.F_IP: frame[C.COL_REVIEW_IP],
+        C.F_CREATED_AT: pd.to_datetime(frame[C.COL_REVIEW_DATE]).dt.tz_localize(None),
+    }
+    rows = list(zip(*(source[h].tolist() for h in HEADERS["reviews"])))
+    t0 = time.perf_counter()
+    chunks = list(iter_encoded(CsvEncoder(HEADERS["reviews"]), rows))
+    encode_s = time.perf_counter() - t0
+    raw = sum(map(len, chunks))
+
+    cases = [("identity", None, raw, 0.0)]
+    for encoding, levels in LEVELS.items():
+        for level in levels:
+            compressor = COMPRESSORS[encoding](level)
+            t0 = time.perf_counter()
+            size = sum(len(compressor.compress(chunk)) for chunk in chunks) + len(compressor.finish())
+            cases.append((encoding, level, size, time.perf_counter() - t0))
+
+    print(f"{args.rows:,} review rows, {raw / 1e6:.1f} MB CSV in {len(chunks)} chunks, encoded in {encode_s:.2f}s")
+    links = "".join(f"{f'@{m:g} Mbit/s':>14}" for m in args.link_mbps)
+    print(f"  {'encoding':<10}{'level':>6}{'ratio':>8}{'MB/s':>9}{'CPU s':>8}{links}   (estimated delivery, s)")
+    for encoding, level, size, secs in cases:
+        cpu = encode_s + secs
+        speed = f"{raw / secs / 1e6:9.0f}" if secs else f"{'-':>9}"
+        times = "".join(f"{max(cpu, size * 8 / (m * 1e6)):14.2f}" for m in args.link_mbps)
+        print(f"  {encoding:<10}{level or '-':>6}{raw / size:8.1f}{speed}{cpu:8.2f}{times}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""CSV encoder microbenchmark: per-row DictWriter vs batched DictWriter vs `encode_csv`.
+
+Encodes the same synthetic review rows with:
+  - per-row:  the original `stream_csv` (DictWriter, one StringIO round-trip and one chunk per row),
+  - batched:  DictWriter flushed every STREAM_BATCH_SIZE rows (str chunks),
+  - encode_csv: tuple rows, one `writerows` per batch, bytes chunks capped by rows or bytes,
+and reports rows/s, chunks and average chunk size. str chunks are encoded to
+UTF-8 inside the timing, as Starlette does before sending them.
+
+    python benchmarks/bench_csv_encoder.py --rows 500000
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import STREAM_BATCH_SIZE  # noqa: E402
+from app.export import encode_csv  # noqa: E402
+from app.schemas import HEADERS  # noqa: E402
+
+
+def per_row(dict_rows, headers):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=headers)
+    writer.writeheader()
+    yield buf.getvalue()
+    buf.seek(0); buf.truncate(0)
+    for row in dict_rows:
+        writer.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0); buf.truncate(0)
+
+
+def batched(dict_rows, headers, batch_size=STREAM_BATCH_SIZE):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=headers)
+    writer.writeheader()
+    yield buf.getvalue()
+    buf.seek(0); buf.truncate(0)
+    pending = 0
+    for row in dict_rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buf.getvalue()
+            buf.seek(0); buf.truncate(0)
+            pending = 0
+    if pending:
+        yield buf.getvalue()
+
+
+def make_rows(n: int) -> list[tuple]:
+    base = datetime(2024, 1, 1)
+    text = "Delivery was quick, the staff were friendly and the \"price\" was right. Would order again."
+    return [
+        (f"r{i}", f"u{i % 5000}", f"b{i % 300}", 1 + i % 5, "Great", text, "10.0.0.1", base + timedelta(seconds=i))
+        for i in range(n)
+    ]
+
+
+def run(label, chunks_iter):
+    t0 = time.perf_counter()
+    count = size = 0
+    for chunk in chunks_iter:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        count += 1
+        size += len(chunk)
+    return label, time.perf_counter() - t0, count, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    headers = HEADERS["reviews"]
+    tuples = make_rows(args.rows)
+    # The dict paths received rows with created_at already isoformatted (as the removed per-ORM-row dict builders did).
+    dicts = [dict(zip(headers, t[:-1] + (t[-1].isoformat(),))) for t in tuples]
+
+    cases = [
+        ("per-row DictWriter", lambda: per_row(iter(dicts), headers)),
+        ("batched DictWriter", lambda: batched(iter(dicts), headers)),
+        ("encode_csv", lambda: encode_csv(iter(tuples), headers)),
+    ]
+    results = []
+    for label, factory in cases:
+        best = min((run(label, factory()) for _ in range(args.repeats)), key=lambda r: r[1])
+        results.append(best)
+
+    base = results[0][1]
+    print(f"{args.rows:,} rows, best of {args.repeats}")
+    for label, secs, count, size in results:
+        print(
+            f"  {label:20s} {args.rows / secs:12,.0f} rows/s ({base / secs:4.1f}x)  "
+            f"{count:9,d} chunks  avg {size / count / 1024:8.1f} KiB  total {size / 1e6:7.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
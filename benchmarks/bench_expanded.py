@@ -0,0 +1,111 @@
+"""Expanded extract benchmark: ORM entity join vs the projected column join.
+
+Loads synthetic reviews for one business into a scratch SQLite database, then
+streams its whole expanded extract (masked CSV, as `GET .../expanded` does)
+two ways: the previous path, which selects `(Review, User, Business)` entities
+and flattens each row with `to_expanded_row` (kept here as the baseline), and
+the current path, which selects the `HEADERS["reviews_expanded"]` columns as
+plain tuples.
+Reports rows per second (best of `--repeats`) and the peak Python heap
+allocated while streaming (tracemalloc, a separate run).
+
+    python benchmarks/bench_expanded.py --rows 1000000 --db /tmp/bench_expanded.db
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api import stream_extract  # noqa: E402
+from app.config import STREAM_BATCH_SIZE  # noqa: E402
+from app.crud import query_reviews_by_business  # noqa: E402
+from app.database import stream  # noqa: E402
+from app.models import Business, Review, User  # noqa: E402
+from app.schemas import HEADERS  # noqa: E402
+from bench_export import drain, generate  # noqa: E402
+
+# Which of (Review, User, Business) supplies each expanded header; user_id / business_id come from the review.
+SOURCES = [
+    0 if k in Review.__table__.c else 1 if k in User.__table__.c else 2
+    for k in HEADERS["reviews_expanded"]
+]
+
+
+def to_expanded_row(r, u, b) -> tuple:
+    """The previous flattening: read each header off the hydrated ORM entities."""
+    entities = (r, u, b)
+    return tuple(getattr(entities[src], k) for src, k in zip(SOURCES, HEADERS["reviews_expanded"]))
+
+
+async def orm_entities(db, rows: int):
+    stmt = (
+        select(Review, User, Business)
+        .join(User, Review.user_id == User.user_id)
+        .join(Business, Review.business_id == Business.business_id)
+        .where(Review.business_id == "b0")
+        .order_by(Review.created_at.desc(), Review.review_id.desc())
+        .limit(rows)
+    )
+    return await stream(db, stmt, STREAM_BATCH_SIZE), lambda x: to_expanded_row(*x)
+
+
+async def projected(db, rows: int):
+    items, _ = await query_reviews_by_business(db, "b0", limit=rows, projection="reviews_expanded")
+    return items, None
+
+
+PATHS = {"orm_entities": orm_entities, "projected": projected}
+
+
+def run(engine, path, rows: int) -> int:
+    with Session(engine) as db:
+        items, to_row = asyncio.run(path(db, rows))
+        response = stream_extract("csv", items, HEADERS["reviews_expanded"], "bench", to_row, mask_pii=True)
+        return asyncio.run(drain(response))
+
+
+def measure(engine, path, rows: int, repeats: int):
+    """Return (bytes, best seconds, peak traced MB) for one path."""
+    best = float("inf")
+    size = 0
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        size = run(engine, path, rows)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    run(engine, path, rows)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, best, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--db", default="/tmp/bench_expanded.db")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    engine = generate(args.db, args.rows)
+
+    results = {name: measure(engine, path, args.rows, args.repeats) for name, path in PATHS.items()}
+    _, base, _ = results["orm_entities"]
+    print(f"{args.rows:,} expanded reviews of one business, masked CSV, best of {args.repeats}")
+    for name, (size, secs, peak) in results.items():
+        print(
+            f"  {name:13s} {secs:7.2f}s = {args.rows / secs:9,.0f} rows/s ({base / secs:4.1f}x)  "
+            f"peak heap {peak:7.1f} MB  {size / 1e6:8.1f} MB CSV"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Extract encoding benchmark: CSV vs Parquet vs Arrow IPC stream.
+
+Loads synthetic reviews for one business into a scratch SQLite database, then
+streams the same query result through each encoder exactly as the API does
+(projected Core rows -> batched CSV or Arrow record batches) and reports bytes
+on the wire and encode throughput.
+
+    python benchmarks/bench_export.py --rows 200000 --db /tmp/bench_export.db
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import constants as C  # noqa: E402
+from app.api import stream_extract  # noqa: E402
+from app.crud import query_reviews_by_business  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.loader import bulk_insert  # noqa: E402
+from app.models import Business, Review, User  # noqa: E402
+from app.schemas import HEADERS  # noqa: E402
+
+WORDS = np.array("great service slow delivery friendly staff price quality would recommend again never".split())
+
+
+def generate(db_path: str, rows: int, seed: int = 7):
+    """Create a scratch database with `rows` reviews of a single business."""
+    rng = np.random.default_rng(seed)
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    users = rows // 10 + 1
+    text = [" ".join(rng.choice(WORDS, 25)) for _ in range(1000)]
+    with Session(engine) as db:
+        bulk_insert(db, Business.__table__, pd.DataFrame({C.F_BUSINESS_ID: ["b0"], C.F_BUSINESS_NAME: ["Biz"]}))
+        bulk_insert(db, User.__table__, pd.DataFrame({
+            C.F_USER_ID: [f"u{i}" for i in range(users)],
+            C.F_USER_NAME: "Name",
+            C.F_EMAIL: "someone@example.com",
+        }))
+        bulk_insert(db, Review.__table__, pd.DataFrame({
+            C.F_REVIEW_ID: [f"r{i}" for i in range(rows)],
+            C.F_USER_ID: [f"u{i}" for i in rng.integers(0, users, rows)],
+            C.F_BUSINESS_ID: "b0",
+            C.F_RATING: rng.integers(1, 6, rows),
+            C.F_TITLE: rng.choice(WORDS, rows),
+            C.F_TEXT: [text[i] for i in rng.integers(0, len(text), rows)],
+            C.F_IP: "10.0.0.1",
+            C.F_CREATED_AT: pd.Timestamp("2020-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 10**8, rows), unit="s"),
+        }))
+        db.commit()
+    return engine
+
+
+async def drain(response) -> int:
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk.encode() if isinstance(chunk, str) else chunk)
+    return size
+
+
+def measure(engine, fmt: str, rows: int, repeats: int):
+    """Return (bytes, best end-to-end seconds, best encode-only seconds) for `fmt`.
+
+    End-to-end streams straight off the DB cursor; encode-only fetches the
+    rows first and times just the encoding.
+    """
+    best_total = best_encode = float("inf")
+    size = 0
+    for _ in range(repeats):
+        with Session(engine) as db:
+            t0 = time.perf_counter()
+            items, _ = asyncio.run(query_reviews_by_business(db, "b0", limit=rows))
+            response = stream_extract(fmt, items, HEADERS["reviews"], "bench")
+            size = asyncio.run(drain(response))
+            best_total = min(best_total, time.perf_counter() - t0)
+        with Session(engine) as db:
+            items = list(asyncio.run(query_reviews_by_business(db, "b0", limit=rows))[0])
+            t0 = time.perf_counter()
+            asyncio.run(drain(stream_extract(fmt, items, HEADERS["reviews"], "bench")))
+            best_encode = min(best_encode, time.perf_counter() - t0)
+    return size, best_total, best_encode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--db", default="/tmp/bench_export.db")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    engine = generate(args.db, args.rows)
+
+    results = {fmt: measure(engine, fmt, args.rows, args.repeats) for fmt in C.EXPORT_FORMATS}
+    csv_bytes, csv_total, csv_encode = results[C.FMT_CSV]
+    print(f"{args.rows:,} reviews, best of {args.repeats}")
+    for fmt, (size, total, encode) in results.items():
+        print(
+            f"  {fmt:8s} {size / 1e6:8.2f} MB ({size / csv_bytes:6.1%} of CSV)  "
+            f"query+encode {total:6.2f}s ({csv_total / total:4.1f}x CSV)  "
+            f"encode {encode:6.2f}s = {args.rows / encode:10,.0f} rows/s ({csv_encode / encode:4.1f}x CSV)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Query-plan and latency benchmark: legacy single-column vs composite review indexes.
+
+Builds a synthetic SQLite `reviews` table (default 10M rows, Zipf-skewed so a few
+businesses own a large share of reviews), times the extract query shapes from
+app/crud.py against the legacy `ix_reviews_{user,business}_id` indexes, then runs
+`app.migrate.upgrade` and times them again.
+
+    python benchmarks/bench_indexes.py --rows 10000000 --db /tmp/bench_reviews.db
+
+Generation of 10M rows takes a few minutes; `--rows 1000000` is a quicker smoke run.
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.migrate import upgrade  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE users (user_id VARCHAR PRIMARY KEY, user_name VARCHAR, email VARCHAR, country VARCHAR);
+CREATE TABLE businesses (business_id VARCHAR PRIMARY KEY, business_name VARCHAR);
+CREATE TABLE reviews (
+    review_id VARCHAR PRIMARY KEY, user_id VARCHAR, business_id VARCHAR, rating INTEGER,
+    title VARCHAR, text TEXT, ip_address VARCHAR, created_at DATETIME
+);
+"""
+LEGACY_INDEXES = """
+CREATE INDEX ix_reviews_user_id ON reviews (user_id);
+CREATE INDEX ix_reviews_business_id ON reviews (business_id);
+"""
+
+
+def generate(db_path: str, rows: int, businesses: int, users: int, seed: int = 7, batch: int = 200_000):
+    """Create the legacy schema and fill `reviews` with skewed synthetic rows."""
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + SCHEMA)
+    start = np.datetime64("2018-01-01T00:00:00")
+    span = int((np.datetime64("2025-01-01T00:00:00") - start) / np.timedelta64(1, "s"))
+    for lo in range(0, rows, batch):
+        n = min(batch, rows - lo)
+        biz = np.minimum(rng.zipf(1.3, n), businesses) - 1
+        usr = rng.integers(0, users, n)
+        rating = rng.integers(1, 6, n)
+        ts = (start + rng.integers(0, span, n).astype("timedelta64[s]")).astype(str)
+        conn.executemany(
+            "INSERT INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (f"r{lo + i}", f"u{usr[i]}", f"b{biz[i]}", int(rating[i]), "title", "text", "1.1.1.1",
+                 ts[i].replace("T", " ") + ".000000")
+                for i in range(n)
+            ),
+        )
+        conn.commit()
+    conn.executescript(LEGACY_INDEXES)
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def query_shapes(conn):
+    """Return (label, sql, params) tuples mirroring the API's extract queries."""
+    top_biz, count = conn.execute(
+        "SELECT business_id, COUNT(*) FROM reviews GROUP BY business_id ORDER BY 2 DESC LIMIT 1"
+    ).fetchone()
+    user = conn.execute("SELECT user_id FROM reviews LIMIT 1").fetchone()[0]
+    order = " ORDER BY created_at DESC, review_id DESC LIMIT 100"
+    deep = conn.execute(
+        "SELECT created_at, review_id FROM reviews WHERE business_id = ?"
+        " ORDER BY created_at DESC, review_id DESC LIMIT 1 OFFSET ?",
+        (top_biz, count // 2),
+    ).fetchone()
+    return [
+        (f"business page ({count} reviews)", "SELECT * FROM reviews WHERE business_id = ?" + order, (top_biz,)),
+        ("business + rating filter", "SELECT * FROM reviews WHERE business_id = ? AND rating >= 4" + order, (top_biz,)),
+        ("business + date range",
+         "SELECT * FROM reviews WHERE business_id = ? AND created_at >= ? AND created_at < ?" + order,
+         (top_biz, "2022-01-01", "2023-01-01")),
+        ("business keyset mid-history",
+         "SELECT * FROM reviews WHERE business_id = ? AND created_at <= ? AND (created_at < ? OR review_id < ?)" + order,
+         (top_biz, deep[0], deep[0], deep[1])),
+        ("user page", "SELECT * FROM reviews WHERE user_id = ?" + order, (user,)),
+    ]
+
+
+def measure(conn, shapes, repeats: int):
+    """Return {label: (plan, median_ms, p95_ms)} for each query shape."""
+    out = {}
+    for label, sql, params in shapes:
+        plan = "; ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        timings = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        out[label] = (plan, statistics.median(timings), timings[int(0.95 * (len(timings) - 1))])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--businesses", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=2_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--db", default="/tmp/bench_reviews.db")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    t0 = time.perf_counter()
+    generate(args.db, args.rows, args.businesses, args.users)
+    print(f"generated {args.rows:,} reviews in {time.perf_counter() - t0:.1f}s")
+
+    conn = sqlite3.connect(args.db)
+    shapes = query_shapes(conn)
+    before = measure(conn, shapes, args.repeats)
+    conn.close()
+
+    t0 = time.perf_counter()
+    upgrade(create_engine(f"sqlite:///{args.db}"))
+    print(f"migration (build composite indexes) took {time.perf_counter() - t0:.1f}s")
+
+    conn = sqlite3.connect(args.db)
+    conn.execute("ANALYZE")
+    after = measure(conn, shapes, args.repeats)
+    conn.close()
+
+    for label, _, _ in shapes:
+        b_plan, b_med, b_p95 = before[label]
+        a_plan, a_med, a_p95 = after[label]
+        print(f"\n== {label}")
+        print(f"  legacy    median {b_med:9.2f} ms  p95 {b_p95:9.2f} ms  plan: {b_plan}")
+        print(f"  composite median {a_med:9.2f} ms  p95 {a_p95:9.2f} ms  plan: {a_plan}")
+
+
+if __name__ == "__main__":
+    main()
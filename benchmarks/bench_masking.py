@@ -0,0 +1,77 @@
+"""PII masking benchmark: row-wise functions vs the columnar engine.
+
+Masks synthetic email, name and IP columns value by value (`PII_COLUMNS`)
+and whole-column (`mask_array` on Arrow arrays), then encodes expanded-review
+rows in every extract format, masked by `compile_row_masker` ahead of the
+encoder vs inside it (`mask_pii=True`). Reports values (or rows) per second.
+
+    python benchmarks/bench_masking.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import constants as C  # noqa: E402
+from app.export import ENCODERS, iter_encoded  # noqa: E402
+from app.pii import PII_COLUMNS, compile_row_masker, mask_array  # noqa: E402
+from app.schemas import HEADERS  # noqa: E402
+from synthetic import business_cdf, make_frame, _texts  # noqa: E402
+
+
+def rate(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--encode-rows", type=int, default=200_000, help="Rows for the encode cases")
+    args = parser.parse_args()
+
+    frame = make_frame(np.arange(args.rows), max(args.rows // 5, 1), business_cdf(1000, 1.1), _texts(200, 7))
+    columns = {
+        C.F_EMAIL: frame[C.COL_EMAIL].tolist(),
+        C.F_USER_NAME: frame[C.COL_REVIEWER_NAME].tolist(),
+        C.F_IP: frame[C.COL_REVIEW_IP].tolist(),
+    }
+    print(f"{args.rows:,} values per column")
+    print(f"  {'column':<10} {'row-wise':>14} {'mask_array':>14}   (values/s)")
+    for name, values in columns.items():
+        fn = PII_COLUMNS[name]
+        arr = pa.array(values, pa.string())
+        row_wise = rate(lambda: [fn(v) for v in values], len(values))
+        arrow = rate(lambda: mask_array(name, arr), len(values))
+        print(f"  {name:<10} {row_wise:14,.0f} {arrow:14,.0f}")
+
+    headers = HEADERS["reviews_expanded"]
+    n = min(args.encode_rows, args.rows)
+    head = frame.head(n)
+    source = {
+        C.F_REVIEW_ID: head[C.COL_REVIEW_ID], C.F_RATING: head[C.COL_REVIEW_RATING].astype(int),
+        C.F_TITLE: head[C.COL_REVIEW_TITLE], C.F_TEXT: head[C.COL_REVIEW_CONTENT], C.F_IP: head[C.COL_REVIEW_IP],
+        C.F_CREATED_AT: pd.to_datetime(head[C.COL_REVIEW_DATE]).dt.tz_localize(None),
+        C.F_USER_ID: head[C.COL_REVIEWER_ID], C.F_USER_NAME: head[C.COL_REVIEWER_NAME],
+        C.F_EMAIL: head[C.COL_EMAIL], C.F_BUSINESS_ID: head[C.COL_BUSINESS_ID],
+        C.F_BUSINESS_NAME: head[C.COL_BUSINESS_NAME],
+    }
+    rows = list(zip(*(source[h].tolist() for h in headers)))
+    masker = compile_row_masker(headers)
+    print(f"\nEncode {n:,} masked expanded-review rows ({len(headers)} columns)")
+    print(f"  {'format':<8} {'row-wise':>14} {'encoder':>14}   (rows/s)")
+    for fmt, encoder_cls in ENCODERS.items():
+        row_wise = rate(lambda: sum(map(len, iter_encoded(encoder_cls(headers), map(masker, rows)))), n)
+        in_encoder = rate(lambda: sum(map(len, iter_encoded(encoder_cls(headers, mask_pii=True), rows))), n)
+        print(f"  {fmt:<8} {row_wise:14,.0f} {in_encoder:14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
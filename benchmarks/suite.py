@@ -0,0 +1,329 @@
+"""Benchmark suite: ingest, API endpoints and mask/encode throughput, written as JSON.
+
+Generates a synthetic reviews CSV (see benchmarks/synthetic.py), then measures:
+  - ingest:  `python -m app.ingest`-equivalent loads in a child process (fresh load,
+             then a forced reload of the same file), with rows/s and the child's peak RSS;
+  - api:     every extract endpoint through the ASGI app in-process, with latency
+             percentiles, rows/s and bytes on the wire per response (uncompressed
+             unless the case says gzip/zstd; response cache disabled unless --with-cache);
+  - mask / encode: PII masking (row-wise and columnar) and CSV/Parquet/Arrow encoding throughput on rows
+             read back from the database.
+
+Results go to a JSON file (default `benchmarks/results/<timestamp>-<commit>.json`)
+with the commit, environment and parameters, so runs on different commits can be
+compared:
+
+    python benchmarks/suite.py --rows 200000
+    python benchmarks/suite.py --rows 200000 --compare benchmarks/results/<baseline>.json --fail-on-regression
+
+`peak_rss_mb` of api/mask/encode entries is the suite process's high-water mark
+after the case ran (cumulative); ingest entries report the child's own peak.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Child-process ingest: prints a JSON summary including its own peak RSS.
+INGEST_CHILD = """
+import json, resource, sys, time
+from app.ingest import run
+t0 = time.perf_counter()
+meta = run(sys.argv[1], chunk_size=int(sys.argv[2]) or None, force=sys.argv[3] == "1")
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "total_rows": meta.total_rows, "loaded_rows": meta.loaded_rows,
+                  "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def peak_rss_mb(kb: int = None) -> float:
+    """Peak RSS in MiB (`ru_maxrss` is KiB on Linux, bytes on macOS)."""
+    value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if kb is None else kb
+    return round(value / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_info() -> dict:
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=REPO, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def bench_ingest(csv_path: str, rows: int, chunk_size: int, force: bool, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", INGEST_CHILD, csv_path, str(chunk_size or 0), "1" if force else "0"],
+        cwd=REPO, env=env, capture_output=True, text=True, check=True,
+    )
+    child = json.loads(out.stdout.strip().splitlines()[-1])
+    return {
+        "seconds": round(child["seconds"], 4),
+        "rows_per_s": round(rows / child["seconds"], 1),
+        "loaded_rows": child["loaded_rows"],
+        "peak_rss_mb": peak_rss_mb(child["peak_rss_kb"]),
+    }
+
+
+def count_rows(response) -> int:
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith("text/csv"):
+        text = response.text
+        if response.headers.get("content-encoding") == "zstd":  # not decoded by httpx
+            import pyarrow as pa
+            text = pa.input_stream(pa.py_buffer(response.content), compression="zstd").read().decode()
+        return sum(1 for _ in csv.reader(io.StringIO(text))) - 1
+    if "parquet" in content_type:
+        import pyarrow.parquet as pq
+        return pq.read_metadata(io.BytesIO(response.content)).num_rows
+    if "arrow" in content_type:
+        import pyarrow as pa
+        return pa.ipc.open_stream(response.content).read_all().num_rows
+    return None
+
+
+def bench_request(client, method: str, url: str, requests: int, warmup: int = 2, **kwargs) -> dict:
+    for _ in range(warmup):
+        response = client.request(method, url, **kwargs)
+        assert response.status_code == 200, (url, response.status_code, response.text[:200])
+    latencies = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        latencies.append(time.perf_counter() - t0)
+    rows = count_rows(response)
+    q = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    result = {
+        "requests": requests,
+        "p50_ms": round(q[49] * 1000, 3),
+        "p95_ms": round(q[94] * 1000, 3),
+        "p99_ms": round(q[98] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "bytes": response.num_bytes_downloaded,  # on the wire (compressed if Content-Encoding is set)
+        "rows": rows,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if rows:
+        result["rows_per_s"] = round(rows * requests / sum(latencies), 1)
+    return result
+
+
+def pick_entities(db_path: str) -> dict:
+    """Choose the giant business, a median business and the most active user."""
+    conn = sqlite3.connect(db_path)
+    businesses = conn.execute(
+        "SELECT business_id, COUNT(*) FROM reviews GROUP BY business_id ORDER BY 2 DESC"
+    ).fetchall()
+    user = conn.execute("SELECT user_id FROM reviews GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+    users = [u for (u,) in conn.execute("SELECT user_id FROM users LIMIT 1000")]
+    conn.close()
+    return {
+        "top_business": businesses[0][0],
+        "median_business": businesses[len(businesses) // 2][0],
+        "business_batch": [b for b, _ in businesses[:: max(len(businesses) // 20, 1)]][:20],
+        "user": user,
+        "user_batch": users,
+    }
+
+
+def bench_api(db_path: str, requests: int, limit: int) -> dict:
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    e = pick_entities(db_path)
+    client = TestClient(app, headers={"Accept-Encoding": "identity"})
+    top, median, user = e["top_business"], e["median_business"], e["user"]
+    gzip, zstd = {"headers": {"Accept-Encoding": "gzip"}}, {"headers": {"Accept-Encoding": "zstd"}}
+    cases = {
+        "business_page_top": ("GET", f"/reviews/business/{top}?limit={limit}", {}),
+        "business_page_top_parquet": ("GET", f"/reviews/business/{top}?limit={limit}&format=parquet", {}),
+        "business_page_top_arrow": ("GET", f"/reviews/business/{top}?limit={limit}&format=arrow", {}),
+        "business_page_median": ("GET", f"/reviews/business/{median}?limit={limit}", {}),
+        "business_page_top_filtered": ("GET", f"/reviews/business/{top}?limit={limit}&min_rating=4&start_date=2022-01-01", {}),
+        "search_global": ("GET", "/reviews/search?q=damaged+refund&limit=100", {}),
+        "search_business_top": ("GET", f"/reviews/business/{top}?q=late+deliv*&limit={limit}", {}),
+        "user_page": ("GET", f"/reviews/user/{user}?limit={limit}", {}),
+        "business_expanded_top": ("GET", f"/reviews/business/{top}/expanded?limit={limit}", {}),
+        "business_expanded_top_gzip": ("GET", f"/reviews/business/{top}/expanded?limit={limit}", gzip),
+        "business_expanded_top_zstd": ("GET", f"/reviews/business/{top}/expanded?limit={limit}", zstd),
+        "user_expanded": ("GET", f"/reviews/user/{user}/expanded?limit={limit}", {}),
+        "user_info": ("GET", f"/users/{user}", {}),
+        "business_aggregates_top": ("GET", f"/reviews/business/{top}/aggregates", {}),
+        "users_batch": ("POST", "/users/batch", {"json": e["user_batch"]}),
+        "business_batch": ("POST", "/reviews/business/batch?start_date=2024-01-01", {"json": e["business_batch"]}),
+    }
+    return {f"api.{name}": bench_request(client, method, url, requests, **kw) for name, (method, url, kw) in cases.items()}
+
+
+def bench_mask_encode(rows: int) -> dict:
+    import pyarrow as pa
+    from sqlalchemy import select
+
+    from app.database import SessionLocal
+    from app.export import ENCODERS, iter_encoded
+    from app.pii import PII_COLUMNS, compile_row_masker, mask_array
+    from app.query import PROJECTIONS, REVIEW_COLUMNS
+    from app.schemas import HEADERS
+
+    with SessionLocal() as db:
+        review_rows = [tuple(r) for r in db.execute(select(*REVIEW_COLUMNS).limit(rows))]
+        expanded = [tuple(r) for r in db.execute(PROJECTIONS["reviews_expanded"]().limit(rows))]
+    n = len(review_rows)
+    results = {}
+
+    mask_expanded_row = compile_row_masker(HEADERS["reviews_expanded"])
+    t0 = time.perf_counter()
+    for row in expanded:
+        mask_expanded_row(row)
+    secs = time.perf_counter() - t0
+    results["mask.expanded_rows"] = {"rows": len(expanded), "seconds": round(secs, 4),
+                                     "rows_per_s": round(len(expanded) / secs, 1), "peak_rss_mb": peak_rss_mb()}
+    headers = HEADERS["reviews_expanded"]
+    t0 = time.perf_counter()
+    columns = list(zip(*expanded))
+    for i, name in enumerate(headers):
+        if name in PII_COLUMNS:
+            columns[i] = mask_array(name, pa.array(columns[i], pa.string())).to_pylist()
+    list(zip(*columns))
+    secs = time.perf_counter() - t0
+    results["mask.expanded_columnar"] = {"rows": len(expanded), "seconds": round(secs, 4),
+                                         "rows_per_s": round(len(expanded) / secs, 1), "peak_rss_mb": peak_rss_mb()}
+    for fmt, encoder_cls in ENCODERS.items():
+        t0 = time.perf_counter()
+        size = sum(len(chunk) for chunk in iter_encoded(encoder_cls(HEADERS["reviews"]), review_rows))
+        secs = time.perf_counter() - t0
+        results[f"encode.{fmt}"] = {"rows": n, "seconds": round(secs, 4), "rows_per_s": round(n / secs, 1),
+                                    "bytes": size, "peak_rss_mb": peak_rss_mb()}
+    return results
+
+
+# Metric name suffix -> True if higher is better.
+DIRECTIONS = {"_per_s": True, "_ms": False, "seconds": False, "_mb": False}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Print per-metric changes against `baseline`; return the regressions beyond `threshold`."""
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit', '?')[:12]} (regression threshold {threshold:.0%}):")
+    if baseline["meta"].get("dataset") != current["meta"]["dataset"]:
+        print("  WARNING: the baseline was generated with a different dataset; numbers are not comparable.")
+    for name, metrics in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for metric, value in metrics.items():
+            higher_better = next((d for suffix, d in DIRECTIONS.items() if metric.endswith(suffix)), None)
+            old = base.get(metric)
+            if higher_better is None or not old or value is None:
+                continue
+            change = (value - old) / old
+            worse = -change if higher_better else change
+            flag = "REGRESSION" if worse > threshold else ("improved" if worse < -threshold else "")
+            print(f"  {name:36s} {metric:12s} {old:>14,.2f} -> {value:>14,.2f} {change:+8.1%} {flag}")
+            if flag == "REGRESSION":
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Synthetic CSV rows (duplicates included)")
+    parser.add_argument("--businesses", type=int, default=1000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of reviews per business")
+    parser.add_argument("--dup-rate", type=float, default=0.02, help="Share of rows repeating an earlier review")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--chunk-size", type=int, default=None, help="Ingest chunk size (default: whole file)")
+    parser.add_argument("--requests", type=int, default=50, help="Timed requests per API case")
+    parser.add_argument("--limit", type=int, default=1000, help="`limit` for paged extract requests")
+    parser.add_argument("--encode-rows", type=int, default=100_000, help="Rows for the mask/encode cases")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the in-process response cache enabled")
+    parser.add_argument("--workdir", default=None, help="Directory for the CSV and database (default: a temp dir)")
+    parser.add_argument("--out", default=None, help="Results JSON path (default: benchmarks/results/<ts>-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if --compare finds regressions")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_suite_")
+    os.makedirs(workdir, exist_ok=True)
+    csv_path = os.path.join(workdir, "reviews.csv")
+    db_path = os.path.join(workdir, "reviews.db")
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    # Configure the app before it is imported (here and in the ingest child).
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    if not args.with_cache:
+        os.environ["RESPONSE_CACHE_MAX_BYTES"] = "0"
+    env = {**os.environ, "PYTHONPATH": REPO}
+
+    from synthetic import generate_csv
+
+    t0 = time.perf_counter()
+    dataset = generate_csv(csv_path, args.rows, args.businesses, None, args.skew, args.dup_rate, args.seed)
+    print(f"Generated {args.rows:,} rows in {time.perf_counter() - t0:.1f}s: {dataset}")
+
+    results = {
+        "ingest.fresh": bench_ingest(csv_path, args.rows, args.chunk_size, False, env),
+        "ingest.reload": bench_ingest(csv_path, args.rows, args.chunk_size, True, env),
+    }
+    print(f"Ingest: {results['ingest.fresh']}")
+    results.update(bench_api(db_path, args.requests, args.limit))
+    results.update(bench_mask_encode(args.encode_rows))
+
+    import sqlalchemy
+    report = {
+        "meta": {
+            **git_info(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "sqlite": sqlite3.sqlite_version,
+            "sqlalchemy": sqlalchemy.__version__,
+            "params": vars(args),
+            "dataset": dataset,
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join(
+        REPO, "benchmarks", "results",
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{(report['meta']['commit'] or 'nogit')[:10]}.json",
+    )
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'case':36s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'rows/s':>14s} {'peak MB':>9s}")
+    for name, r in results.items():
+        print(
+            f"{name:36s} {r.get('p50_ms', ''):>9} {r.get('p95_ms', ''):>9} {r.get('p99_ms', ''):>9} "
+            f"{r.get('rows_per_s', ''):>14} {r.get('peak_rss_mb', ''):>9}"
+        )
+    print(f"\nWrote {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
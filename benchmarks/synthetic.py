@@ -0,0 +1,164 @@
+"""Synthetic reviews CSV generator matching `SOURCE_COLUMNS`.
+
+Every field of a row is a deterministic function of its source index, so a
+duplicated row (a re-delivered review) repeats the original exactly, and the
+same arguments always produce the same file. Businesses follow a Zipf-like
+distribution (`--skew`; 0 = uniform) so a few giant businesses own a large
+share of reviews; `--dup-rate` re-emits earlier reviews.
+
+    python benchmarks/synthetic.py --rows 1000000 --out /tmp/reviews_1m.csv --skew 1.1 --dup-rate 0.02
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import constants as C  # noqa: E402
+
+FIRST_NAMES = "Alice Bob Carla Dmitri Emma Farid Grace Hiro Ines Jonas Keiko Liam Maya Nils Olga Pedro Quinn Rosa Sven Tara".split()
+LAST_NAMES = "Smith Jensen Garcia Rossi Novak Tanaka Okafor Silva Muller Kowalski Dubois Larsen Khan Popescu Moreau".split()
+COUNTRIES = "DK GB US DE FR ES IT NL SE PL".split()
+WORDS = (
+    "great service slow delivery friendly staff price quality would recommend again never helpful support "
+    "order arrived late refund easy website checkout fast package damaged excellent terrible value"
+).split()
+# Share of ratings 1..5 (review sites skew to 5 stars, with a second bump at 1).
+RATING_WEIGHTS = [0.12, 0.05, 0.08, 0.20, 0.55]
+START = np.datetime64("2018-01-01T00:00:00", "s")
+SPAN_SECONDS = int((np.datetime64("2025-01-01T00:00:00", "s") - START) / np.timedelta64(1, "s"))
+
+
+def _uniform(src: np.ndarray, salt: int) -> np.ndarray:
+    """Deterministic uniform [0, 1) floats from integer indexes (splitmix64 finaliser)."""
+    with np.errstate(over="ignore"):
+        z = src.astype(np.uint64) + np.uint64(salt) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def _texts(count: int, seed: int) -> list[str]:
+    """Review bodies of 5-60 words; some contain commas, quotes and newlines."""
+    rng = np.random.default_rng(seed)
+    texts = []
+    for i in range(count):
+        words = rng.choice(WORDS, rng.integers(5, 61))
+        text = " ".join(words).capitalize() + "."
+        if i % 7 == 0:
+            text = text.replace(" ", ", ", 1)
+        if i % 11 == 0:
+            text += ' They said "no problem".'
+        if i % 13 == 0:
+            text += "\nSecond paragraph."
+        texts.append(text)
+    return texts
+
+
+def business_cdf(businesses: int, skew: float) -> np.ndarray:
+    """Cumulative share of reviews per business rank (`1 / rank**skew` weights)."""
+    weights = 1.0 / np.arange(1, businesses + 1, dtype=np.float64) ** skew
+    return np.cumsum(weights) / weights.sum()
+
+
+def make_frame(src: np.ndarray, users: int, cdf: np.ndarray, texts: list[str]) -> pd.DataFrame:
+    """Build source rows (raw CSV headers) for the given source indexes."""
+    business = np.minimum(np.searchsorted(cdf, _uniform(src, 1), side="right"), len(cdf) - 1)
+    user = (_uniform(src, 2) * users).astype(np.int64)
+    rating = np.searchsorted(np.cumsum(RATING_WEIGHTS), _uniform(src, 3), side="right") + 1
+    seconds = (_uniform(src, 4) * SPAN_SECONDS).astype(np.int64)
+    created = (START + seconds.astype("timedelta64[s]")).astype(str)
+    text_idx = (_uniform(src, 5) * len(texts)).astype(np.int64)
+    ip = (_uniform(src, 6) * (1 << 32)).astype(np.int64)
+    first = [FIRST_NAMES[u % len(FIRST_NAMES)] for u in user]
+    last = [LAST_NAMES[(u // len(FIRST_NAMES)) % len(LAST_NAMES)] for u in user]
+    return pd.DataFrame({
+        C.COL_REVIEW_ID: [f"r{i}" for i in src],
+        C.COL_REVIEWER_ID: [f"u{u}" for u in user],
+        C.COL_REVIEWER_NAME: [f"{f} {s}" for f, s in zip(first, last)],
+        C.COL_EMAIL: [f"{f.lower()}.{s.lower()}{u}@example.com" for f, s, u in zip(first, last, user)],
+        C.COL_COUNTRY: [COUNTRIES[u % len(COUNTRIES)] for u in user],
+        C.COL_BUSINESS_ID: [f"b{b}" for b in business],
+        C.COL_BUSINESS_NAME: [f"Business {b}" for b in business],
+        C.COL_REVIEW_RATING: rating,
+        C.COL_REVIEW_TITLE: [WORDS[t % len(WORDS)].capitalize() for t in text_idx],
+        C.COL_REVIEW_CONTENT: [texts[t] for t in text_idx],
+        C.COL_REVIEW_IP: [f"{i >> 24}.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}" for i in ip],
+        C.COL_REVIEW_DATE: [f"{c}Z" for c in created],
+    }, columns=C.SOURCE_COLUMNS)
+
+
+def generate_csv(
+    path: str,
+    rows: int,
+    businesses: int = 1000,
+    users: int = None,
+    skew: float = 1.1,
+    dup_rate: float = 0.0,
+    seed: int = 7,
+    chunk_size: int = 100_000,
+) -> dict:
+    """Write a synthetic reviews CSV.
+
+    Args:
+        path: Output CSV path.
+        rows: Total rows written, duplicates included.
+        businesses: Distinct businesses.
+        users: Distinct users (default `rows // 5`).
+        skew: Zipf exponent of reviews per business (0 = uniform, ~1.1 = a few giants).
+        dup_rate: Share of rows that repeat an earlier review exactly.
+        seed: Seed for the text pool and the choice of duplicated rows.
+        chunk_size: Rows generated and appended per step.
+
+    Returns:
+        dict: generation parameters plus `distinct_reviews` and `top_business_share`.
+    """
+    users = users or max(rows // 5, 1)
+    rng = np.random.default_rng(seed)
+    cdf = business_cdf(businesses, skew)
+    texts = _texts(2000, seed)
+    distinct = 0
+    for lo in range(0, rows, chunk_size):
+        n = min(chunk_size, rows - lo)
+        dup = rng.random(n) < dup_rate
+        if lo == 0:
+            dup[0] = False
+        fresh = int((~dup).sum())
+        src = np.empty(n, dtype=np.int64)
+        src[~dup] = distinct + np.arange(fresh)
+        distinct += fresh
+        # A duplicate repeats any review emitted so far (earlier chunks or this one).
+        src[dup] = rng.integers(0, distinct, int(dup.sum()))
+        make_frame(src, users, cdf, texts).to_csv(path, mode="w" if lo == 0 else "a", header=lo == 0, index=False)
+    return {
+        "rows": rows,
+        "distinct_reviews": distinct,
+        "businesses": businesses,
+        "users": users,
+        "skew": skew,
+        "dup_rate": dup_rate,
+        "seed": seed,
+        "top_business_share": round(float(cdf[0]), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--businesses", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=None)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--dup-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    info = generate_csv(args.out, args.rows, args.businesses, args.users, args.skew, args.dup_rate, args.seed)
+    print(f"Wrote {args.out}: {info}")
+
+
+if __name__ == "__main__":
+    main()
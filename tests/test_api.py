@@ -77,6 +77,28 @@ def test_health():
     assert r.status_code == 200
     assert r.json()["status"] == "ok"
 
+def test_health_pool_reports_checkouts():
+    client.get("/reviews/business/b1")
+    stats = client.get("/health/pool").json()["sync"]
+    assert stats["checkouts"] >= 1 and stats["timeouts"] == 0
+    assert {"size", "checked_out", "overflow", "wait_seconds_max"} <= stats.keys()
+
+def test_pool_timeout_returns_503():
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    from app.database import get_db
+
+    async def exhausted():
+        raise PoolTimeoutError("QueuePool limit reached")
+        yield
+
+    app.dependency_overrides[get_db] = exhausted
+    try:
+        r = client.get("/reviews/business/b1")
+    finally:
+        app.dependency_overrides.clear()
+    assert r.status_code == 503
+    assert int(r.headers["retry-after"]) >= 1
+
 def test_reviews_business():
     r = client.get("/reviews/business/b1")
     assert r.status_code == 200
@@ -293,6 +315,40 @@ def test_csv_escaping_with_commas_quotes(tmp_path):
     r = client.get("/reviews/business/b1/expanded?mask_pii=false")
     assert 'r_escape' in r.text
 
+def test_business_rating_aggregates():
+    r = client.get("/reviews/business/b2/aggregates")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["total"] == {
+        "review_count": 1, "rated_count": 1, "average_rating": 3.0,
+        "histogram": {"1": 0, "2": 0, "3": 1, "4": 0, "5": 0},
+    }
+    assert [b["period"] for b in body["buckets"]] == ["2024-02"]
+    daily = client.get("/reviews/business/b2/aggregates?granularity=day&start_date=2024-02-02").json()
+    assert daily["buckets"] == [] and daily["total"]["average_rating"] is None
+    assert client.get("/reviews/business/b2/aggregates?granularity=week").status_code == 422
+
+def test_response_cache_etag_and_ingest_invalidation(tmp_path):
+    url = "/reviews/user/u2?min_rating=1"
+    first = client.get(url)
+    second = client.get(url)
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("miss", "hit")
+    assert second.content == first.content and second.headers["etag"] == first.headers["etag"]
+    assert second.headers["content-type"].startswith("text/csv")
+
+    not_modified = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+
+    # A new ingest commit advances the generation: new ETag, body re-encoded
+    pd.DataFrame([{
+        C.F_REVIEW_ID: "r_cache", C.F_USER_ID: "u2", C.F_BUSINESS_ID: "b2", C.F_RATING: 2,
+        C.F_CREATED_AT: "2024-05-01T10:00:00Z",
+    }]).to_csv(tmp_path / "cache.csv", index=False)
+    ingest_csv(str(tmp_path / "cache.csv"))
+    fresh = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert fresh.status_code == 200 and fresh.headers["x-cache"] == "miss"
+    assert fresh.headers["etag"] != first.headers["etag"] and "r_cache" in fresh.text
+
 def test_content_type_all_endpoints():
     endpoints = [
         "/reviews/business/b1",
@@ -312,4 +368,441 @@ def test_reviews_expanded_masked():
     csv_text = resp.text
     assert "***@" in csv_text  # masked email
     assert "***" in csv_text   # masked name
-    assert "***.***" in csv_text  # masked IP
\ No newline at end of file
+    assert "***.***" in csv_text  # masked IP
+
+def test_stream_csv_encodes_in_batches():
+    import asyncio
+    from app.api import stream_csv
+
+    pulled = []
+
+    def rows():
+        for i in range(5):
+            pulled.append(i)
+            yield (f"s{i}",)
+
+    async def collect(resp):
+        return [chunk async for chunk in resp.body_iterator]
+
+    resp = stream_csv(rows(), ["review_id"], "s.csv", batch_size=2)
+    assert pulled == []  # nothing is read until the body is iterated
+    chunks = asyncio.run(collect(resp))
+    assert chunks == [b"review_id\r\n", b"s0\r\ns1\r\n", b"s2\r\ns3\r\n", b"s4\r\n"]
+
+def test_encode_csv_caps_chunk_bytes_and_formats_timestamps():
+    from datetime import datetime
+    from app.export import encode_csv
+
+    rows = [(f"w{i}", "x" * 100, datetime(2024, 1, 1, 10)) for i in range(50)]
+    chunks = list(encode_csv(iter(rows), ["review_id", "text", C.F_CREATED_AT], batch_size=1000, chunk_bytes=1000))
+    assert chunks[0] == b"review_id,text,created_at\r\n"
+    assert len(chunks) > 5 and all(len(c) <= 1000 + 130 for c in chunks[2:])
+    body = b"".join(chunks).decode()
+    assert parse_csv(body)[49] == {"review_id": "w49", "text": "x" * 100, C.F_CREATED_AT: "2024-01-01T10:00:00"}
+
+def test_keyset_pagination_walks_ties_without_gaps(tmp_path):
+    # Rows sharing created_at must be neither skipped nor duplicated across pages
+    tie_csv = tmp_path / "ties.csv"
+    pd.DataFrame([
+        {
+            C.F_REVIEW_ID: f"tie{i}",
+            C.F_USER_ID: "u_tie",
+            C.F_USER_NAME: "Tia",
+            C.F_EMAIL: "tia@example.com",
+            C.F_BUSINESS_ID: "b_tie",
+            C.F_BUSINESS_NAME: "TieCo",
+            C.F_RATING: 4,
+            C.F_TITLE: "Same",
+            C.F_TEXT: "Same time",
+            C.F_IP: "1.1.1.4",
+            C.F_CREATED_AT: "2024-05-01T10:00:00Z" if i < 3 else "2024-04-01T10:00:00Z",
+        }
+        for i in range(4)
+    ]).to_csv(tie_csv, index=False)
+    ingest_csv(str(tie_csv))
+
+    seen, cursor = [], None
+    for _ in range(10):
+        url = "/reviews/business/b_tie?limit=1" + (f"&cursor={cursor}" if cursor else "")
+        r = client.get(url)
+        assert r.status_code == 200
+        seen += [row["review_id"] for row in parse_csv(r.text)]
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == ["tie2", "tie1", "tie0", "tie3"]
+
+def test_keyset_cursor_matches_offset_page():
+    first = client.get("/reviews/business/b1?limit=1")
+    cursor = first.headers["x-next-cursor"]
+    by_cursor = parse_csv(client.get(f"/reviews/business/b1?limit=1&cursor={cursor}").text)
+    by_offset = parse_csv(client.get("/reviews/business/b1?limit=1&offset=1").text)
+    assert by_cursor == by_offset
+
+def test_last_page_has_no_next_cursor():
+    r = client.get("/reviews/user/u2?limit=10")
+    assert "x-next-cursor" not in r.headers
+
+def test_invalid_cursor_rejected():
+    assert client.get("/reviews/user/u1?cursor=not-a-cursor").status_code == 422
+    first = client.get("/reviews/business/b1?limit=1")
+    cursor = first.headers["x-next-cursor"]
+    assert client.get(f"/reviews/business/b1?cursor={cursor}&offset=1").status_code == 422
+
+def test_keyset_pagination_reaches_null_created_at():
+    from app.database import engine
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO reviews (review_id, user_id, business_id, rating, created_at) VALUES "
+            "('n1', 'u_null', 'b_null', 3, '2024-01-01 00:00:00.000000'), "
+            "('n2', 'u_null', 'b_null', 3, NULL), ('n3', 'u_null', 'b_null', 3, NULL)"
+        )
+    expected = [row["review_id"] for row in parse_csv(client.get("/reviews/business/b_null").text)]
+    seen, cursor = [], None
+    for _ in range(10):
+        r = client.get("/reviews/business/b_null?limit=1" + (f"&cursor={cursor}" if cursor else ""))
+        seen += [row["review_id"] for row in parse_csv(r.text)]
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert sorted(seen) == ["n1", "n2", "n3"]
+    assert seen == expected
+
+def test_parquet_extract_via_format_param():
+    import io
+    import pyarrow.parquet as pq
+
+    r = client.get("/reviews/business/b1", params={"format": "parquet"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.parquet"
+    assert r.headers["content-disposition"].endswith('reviews_business_b1.parquet"')
+    table = pq.read_table(io.BytesIO(r.content))
+    assert table.column_names == HEADERS["reviews"]
+    csv_ids = [row[C.F_REVIEW_ID] for row in parse_csv(client.get("/reviews/business/b1").text)]
+    assert table.column(C.F_REVIEW_ID).to_pylist() == csv_ids and "r1" in csv_ids
+    assert str(table.schema.field(C.F_CREATED_AT).type) == "timestamp[us, tz=UTC]"
+
+def test_arrow_extract_via_accept_header_masks_expanded():
+    import pyarrow as pa
+
+    r = client.get("/reviews/user/u1/expanded", headers={"Accept": "text/csv;q=0.5, application/vnd.apache.arrow.stream"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.column_names == HEADERS["reviews_expanded"]
+    assert all("***@" in e for e in table.column(C.F_EMAIL).to_pylist())
+    csv_rows = parse_csv(client.get("/reviews/user/u1/expanded").text)
+    assert {row[C.F_REVIEW_ID]: row[C.F_EMAIL] for row in csv_rows} == dict(
+        zip(table.column(C.F_REVIEW_ID).to_pylist(), table.column(C.F_EMAIL).to_pylist())
+    )
+
+def test_columnar_empty_result_and_unknown_format():
+    import io
+    import pyarrow.parquet as pq
+
+    r = client.get("/reviews/business/does-not-exist", params={"format": "parquet"})
+    assert r.status_code == 200
+    assert pq.read_table(io.BytesIO(r.content)).num_rows == 0
+    assert client.get("/reviews/business/b1", params={"format": "xml"}).status_code == 422
+    # Unsupported Accept types fall back to CSV
+    assert client.get("/reviews/business/b1", headers={"Accept": "application/json"}).headers["content-type"].startswith("text/csv")
+
+def test_users_batch_json_upload_and_text():
+    r = client.post("/users/batch", json={"ids": ["u1", "u2", "u1", "missing"]})
+    assert r.status_code == 200 and r.headers["x-requested-count"] == "3"
+    rows = parse_csv(r.text)
+    assert sorted(row[C.F_USER_ID] for row in rows) == ["u1", "u2"]
+    assert all(row[C.F_EMAIL] != "alice@example.com" for row in rows)  # masked
+
+    upload = client.post("/users/batch", files={"file": ("ids.csv", b"user_id,note\nu2,x\n\nu1,y\n", "text/csv")})
+    assert sorted(row[C.F_USER_ID] for row in parse_csv(upload.text)) == ["u1", "u2"]
+    text = client.post("/users/batch", content=b"u2\n", headers={"content-type": "text/plain"})
+    assert [row[C.F_USER_ID] for row in parse_csv(text.text)] == ["u2"]
+
+    assert client.post("/users/batch", json=[]).status_code == 422
+    assert client.post("/users/batch", json={"ids": "u1"}).status_code == 422
+
+def test_reviews_business_batch_matches_single_extracts():
+    r = client.post("/reviews/business/batch?min_rating=2", json=["b2", "b1"])
+    assert r.status_code == 200
+    batch_ids = sorted(row[C.F_REVIEW_ID] for row in parse_csv(r.text))
+    single_ids = sorted(
+        row[C.F_REVIEW_ID]
+        for b in ("b1", "b2")
+        for row in parse_csv(client.get(f"/reviews/business/{b}?min_rating=2").text)
+    )
+    assert batch_ids == single_ids
+    parquet = client.post("/reviews/business/batch?format=parquet", json=["b1"])
+    assert parquet.headers["content-type"] == "application/vnd.apache.parquet"
+
+def test_metrics_endpoint_reports_route_timings_and_rows():
+    from app.metrics import extract_rows, http_requests
+
+    route = ("GET", "/reviews/business/{business_id}")
+    rows_before = extract_rows.value(route)
+    requests_before = http_requests.value((*route, "200"))
+    r = client.get("/reviews/business/b1?format=parquet&start_date=2000-01-02")  # filters not cached by other tests
+    assert r.status_code == 200 and r.headers["X-Cache"] == "miss"
+    assert http_requests.value((*route, "200")) == requests_before + 1
+    assert extract_rows.value(route) > rows_before
+
+    m = client.get("/metrics")
+    assert m.status_code == 200 and m.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = m.text
+    for family in ("http_request_duration_seconds", "http_time_to_first_byte_seconds", "db_query_seconds",
+                   "extract_serialize_seconds", "db_pool_checkouts_total", "response_cache_hits_total"):
+        assert f"# TYPE {family} " in body
+    assert 'http_response_bytes_total{method="GET",route="/reviews/business/{business_id}"}' in body
+    assert 'db_queries_total{method="GET",route="/reviews/business/{business_id}"}' in body
+
+    s = client.get("/health/slow-queries")
+    assert s.status_code == 200 and "threshold_seconds" in s.json()
+
+
+def test_search_ranks_matches_and_validates_query():
+    r = client.get("/reviews/business/b1?q=LIKE")
+    assert r.status_code == 200 and "x-next-cursor" not in r.headers
+    assert [row["review_id"] for row in parse_csv(r.text)] == ["r3"]
+    r = client.get("/reviews/search?q=loved+it")
+    assert [row["review_id"] for row in parse_csv(r.text)] == ["r1"]
+    r = client.get("/reviews/search?q=it&min_rating=3")  # stemmed terms, filters still apply
+    assert sorted(row["review_id"] for row in parse_csv(r.text)) == ["r1", "r2"]
+    r = client.get("/reviews/user/u1/expanded?q=fin*")
+    rows = parse_csv(r.text)
+    assert [row["review_id"] for row in rows] == ["r2"] and rows[0]["email"] != "alice@example.com"
+    assert client.get("/reviews/search?q=nomatchword").text.strip() == ",".join(HEADERS["reviews"])
+    assert client.get("/reviews/search").status_code == 422
+    assert client.get("/reviews/search?q=%22%2A-").status_code == 422
+    assert client.get("/reviews/business/b1?q=like&cursor=abc").status_code == 422
+
+
+def test_export_job_writes_gzip_file_with_progress_and_range_download(tmp_path, monkeypatch):
+    import gzip
+    import io
+    import time
+    import pyarrow.parquet as pq
+    from app import jobs
+    monkeypatch.setattr(jobs, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "EXPORT_PROGRESS_ROWS", 1)  # commit progress while the cursor is open
+    r = client.post("/exports/reviews/business/b1/expanded")
+    assert r.status_code == 202 and r.headers["location"] == f"/exports/{r.json()['id']}"
+    status = r.json()
+    for _ in range(200):
+        status = client.get(r.headers["location"]).json()
+        if status["status"] in (C.EXPORT_COMPLETE, C.EXPORT_FAILED):
+            break
+        time.sleep(0.05)
+    assert status["status"] == C.EXPORT_COMPLETE, status
+    sync = client.get("/reviews/business/b1/expanded?limit=1000")
+    assert status["rows_written"] == status["total_rows"] == len(parse_csv(sync.text))
+    assert status["progress"] == 1.0
+    assert status["ingest_id"] is not None and status["ingest_generation"] >= 1
+
+    d = client.get(status["download"])
+    assert d.status_code == 200 and d.headers["content-type"] == "application/gzip"
+    assert "reviews_business_b1_expanded.csv.gz" in d.headers["content-disposition"]
+    assert gzip.decompress(d.content).decode() == sync.text
+    part = client.get(status["download"], headers={"Range": "bytes=10-"})
+    assert part.status_code == 206 and part.content == d.content[10:]
+
+    # Columnar files are written as encoded (already compressed), not gzipped again
+    r = client.post("/exports/reviews/business/b1/expanded?format=parquet")
+    for _ in range(200):
+        status = client.get(r.headers["location"]).json()
+        if status["status"] in (C.EXPORT_COMPLETE, C.EXPORT_FAILED):
+            break
+        time.sleep(0.05)
+    assert status["status"] == C.EXPORT_COMPLETE, status
+    d = client.get(status["download"])
+    assert d.headers["content-type"] == "application/vnd.apache.parquet" and d.content[:4] == b"PAR1"
+    assert "reviews_business_b1_expanded.parquet" in d.headers["content-disposition"]
+    assert pq.read_table(io.BytesIO(d.content)).num_rows == status["rows_written"] == status["total_rows"]
+
+    # No up-front count: a running job reports rows written and an unknown total
+    running = jobs.ExportJob(kind="reviews_user_expanded", entity_id="u1", format="csv", status=C.EXPORT_RUNNING, rows_written=7)
+    assert (jobs.job_status(running)["rows_written"], jobs.job_status(running)["progress"]) == (7, None)
+
+    assert client.get("/exports/nope").status_code == 404
+    assert client.post("/exports/reviews/user/u1/expanded?q=%2A").status_code == 422
+
+
+def test_jobs_left_running_are_failed_on_restart():
+    from app import jobs
+    from app.metadata import ExportJob
+    with jobs.SessionLocal() as db:
+        db.add(ExportJob(id="stale", kind="reviews_user_expanded", entity_id="u1", format=C.FMT_CSV,
+                         mask_pii=True, status=C.EXPORT_RUNNING, rows_written=5, bytes_written=0))
+        db.commit()
+    assert jobs.fail_interrupted() >= 1
+    status = client.get("/exports/stale").json()
+    assert status["status"] == C.EXPORT_FAILED and status["error"] and status["download"] is None
+    assert client.get("/exports/stale/download").status_code == 409
+
+
+def test_csv_extracts_negotiate_streaming_gzip_and_zstd():
+    import pyarrow as pa
+    from app.compression import negotiate_encoding
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=1.0, zstd;q=0.5") == "gzip"
+    assert negotiate_encoding("gzip, zstd") == "zstd"  # tie: server preference
+    assert negotiate_encoding("*;q=0.8, zstd;q=0") == "gzip"
+    assert negotiate_encoding("identity") is None and negotiate_encoding(None) is None
+
+    url = "/reviews/business/b1/expanded?limit=1000"
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and "Accept-Encoding" in plain.headers["vary"]
+    gz = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip" and gz.text == plain.text
+    zs = client.get(url, headers={"Accept-Encoding": "zstd"})  # httpx leaves zstd bodies encoded
+    assert zs.headers["content-encoding"] == "zstd" and zs.headers["x-cache"] == "miss"
+    assert pa.input_stream(pa.py_buffer(zs.content), compression="zstd").read().decode() == plain.text
+    cached = client.get(url, headers={"Accept-Encoding": "zstd"})
+    assert cached.headers["x-cache"] == "hit" and cached.headers["content-encoding"] == "zstd"
+    assert cached.content == zs.content
+
+    pq = client.get(url + "&format=parquet", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pq.headers
+
+
+def test_expanded_extracts_share_narrow_filters_and_paging():
+    narrow = parse_csv(client.get("/reviews/business/b1?min_rating=2&limit=1000").text)
+    expanded = parse_csv(client.get("/reviews/business/b1/expanded?min_rating=2&limit=1000").text)
+    assert [r["review_id"] for r in expanded] == [r["review_id"] for r in narrow]
+
+    seen, cursor = [], None
+    for _ in range(20):
+        r = client.get("/reviews/business/b1/expanded?limit=1" + (f"&cursor={cursor}" if cursor else ""))
+        seen += [row["review_id"] for row in parse_csv(r.text)]
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == [r["review_id"] for r in parse_csv(client.get("/reviews/business/b1?limit=1000").text)]
+    assert client.get("/reviews/user/u1/expanded?limit=1001").status_code == 422
+    assert client.get("/reviews/user/u1/expanded?min_rating=5&max_rating=1").status_code == 422
+
+
+def test_review_statements_are_reused_across_values():
+    from app.query import statement_cache
+    client.get("/reviews/user/u1?min_rating=1&format=arrow")
+    before = statement_cache.stats()
+    for user_id, rating in (("u1", 2), ("u2", 3), ("u1", 4)):
+        assert client.get(f"/reviews/user/{user_id}?min_rating={rating}&format=arrow").status_code == 200
+    after = statement_cache.stats()
+    assert after["entries"] == before["entries"]
+    assert after["hits"] > before["hits"] and after["misses"] == before["misses"]
+    assert "statement_cache_hits_total" in client.get("/metrics").text
+
+
+def test_snapshot_and_incremental_reads_by_ingest_generation(tmp_path, monkeypatch):
+    import time
+    from app import jobs
+    monkeypatch.setattr(jobs, "EXPORT_DIR", str(tmp_path))
+    first = client.get("/reviews/business/b_snap")
+    pinned = int(first.headers["x-ingest-generation"])
+
+    def load(review_id, day):
+        path = tmp_path / f"{review_id}.csv"
+        pd.DataFrame([{
+            C.COL_REVIEW_ID: review_id, C.COL_REVIEWER_ID: "u_snap", C.COL_REVIEWER_NAME: "Sam",
+            C.COL_EMAIL: "sam@example.com", C.COL_BUSINESS_ID: "b_snap", C.COL_BUSINESS_NAME: "SnapCo",
+            C.COL_REVIEW_RATING: 4, C.COL_REVIEW_TITLE: "Snap", C.COL_REVIEW_CONTENT: "Snapshot",
+            C.COL_REVIEW_IP: "1.1.1.9", C.COL_REVIEW_DATE: day,
+        }]).to_csv(path, index=False)
+        ingest_csv(str(path))
+    load("snap1", "2024-03-01T10:00:00Z")
+    r = client.get("/reviews/business/b_snap")
+    mid = int(r.headers["x-ingest-generation"])
+    assert mid > pinned and [row["review_id"] for row in parse_csv(r.text)] == ["snap1"]
+    load("snap2", "2024-01-01T10:00:00Z")  # sorts after snap1: would land on the next page
+
+    def ids(url):
+        return [row["review_id"] for row in parse_csv(client.get(url).text)]
+    assert ids(f"/reviews/business/b_snap?as_of={pinned}") == []
+    assert ids(f"/reviews/business/b_snap?as_of={mid}") == ["snap1"]
+    assert ids(f"/reviews/business/b_snap/expanded?since={mid}") == ["snap2"]
+    assert ids(f"/reviews/business/b_snap?since={pinned}&as_of={mid}") == ["snap1"]
+    assert client.get("/reviews/business/b_snap?as_of=999999").status_code == 422
+    assert client.get("/reviews/business/b_snap?since=5&as_of=5").status_code == 422
+
+    location = client.post(f"/exports/reviews/business/b_snap/expanded?since={mid}").headers["location"]
+    for _ in range(200):
+        status = client.get(location).json()
+        if status["status"] in (C.EXPORT_COMPLETE, C.EXPORT_FAILED):
+            break
+        time.sleep(0.05)
+    assert status["since_generation"] == mid and status["ingest_generation"] > mid
+    assert status["status"] == C.EXPORT_COMPLETE and status["rows_written"] == 1
+
+
+def _expected_expanded_row(review_id, mask_pii):
+    # The per-entity construction the projected join replaced: read each field off Review, User and Business.
+    from app.database import SessionLocal
+    from app.models import Business, Review, User
+    from app.pii import mask_email, mask_ip, mask_name
+
+    with SessionLocal() as db:
+        review = db.get(Review, review_id)
+        user, business = db.get(User, review.user_id), db.get(Business, review.business_id)
+        values = {
+            **{k: getattr(review, k) for k in HEADERS["reviews"]},
+            C.F_USER_NAME: user.user_name, C.F_EMAIL: user.email, C.F_BUSINESS_NAME: business.business_name,
+        }
+    values[C.F_CREATED_AT] = values[C.F_CREATED_AT].isoformat()
+    if mask_pii:
+        values[C.F_EMAIL] = mask_email(values[C.F_EMAIL])
+        values[C.F_USER_NAME] = mask_name(values[C.F_USER_NAME])
+        values[C.F_IP] = mask_ip(values[C.F_IP])
+    return {k: "" if values[k] is None else str(values[k]) for k in HEADERS["reviews_expanded"]}
+
+
+def test_expanded_projection_matches_joined_entities():
+    for mask_pii in ("true", "false"):
+        full = client.get(f"/reviews/business/b1/expanded?mask_pii={mask_pii}&limit=1000")
+        assert full.text.splitlines()[0] == ",".join(HEADERS["reviews_expanded"])
+        rows = parse_csv(full.text)
+        assert {"r1", "r3"} <= {row["review_id"] for row in rows}
+        assert rows == [_expected_expanded_row(row["review_id"], mask_pii == "true") for row in rows]
+
+        paged, cursor = [], None
+        for _ in range(len(rows) + 1):
+            r = client.get(f"/reviews/business/b1/expanded?mask_pii={mask_pii}&limit=1" + (f"&cursor={cursor}" if cursor else ""))
+            paged += parse_csv(r.text)
+            cursor = r.headers.get("x-next-cursor")
+            if not cursor:
+                break
+        assert paged == rows
+
+    from app.pii import mask_email, mask_ip, mask_name
+
+    r1 = next(row for row in parse_csv(client.get("/reviews/user/u1/expanded").text) if row["review_id"] == "r1")
+    assert (r1[C.F_USER_NAME], r1[C.F_EMAIL], r1[C.F_IP]) == (mask_name("Alice"), mask_email("alice@example.com"), mask_ip("1.1.1.3"))
+    assert (r1[C.F_USER_ID], r1[C.F_BUSINESS_ID], r1[C.F_BUSINESS_NAME], r1[C.F_RATING]) == ("u1", "b1", "CoffeeCo", "5")
+
+
+def _csv_values(row: dict, headers: list) -> dict:
+    return {k: "" if row[k] is None else str(row[k]) for k in headers}
+
+
+def test_core_rows_match_orm_dict_output():
+    # /users/{id} and the narrow review extract select Core rows and mask them with a
+    # precompiled row masker; the output must equal the old ORM-instance -> dict -> mask_row path.
+    from app.database import SessionLocal
+    from app.models import Review, User
+    from app.pii import mask_row
+    from app.utils import sa_to_dict
+
+    body = client.get("/users/u1").text.splitlines()
+    with SessionLocal() as db:
+        expected_user = _csv_values(mask_row(sa_to_dict(db.get(User, "u1"))), HEADERS["users"])
+        assert body[0] == ",".join(HEADERS["users"])
+        assert parse_csv("\n".join(body)) == [expected_user]
+        assert expected_user[C.F_EMAIL] == "a***@example.com" and expected_user[C.F_USER_NAME] == "A***"
+
+        text = client.get("/reviews/business/b1?limit=1000").text
+        assert text.splitlines()[0] == ",".join(HEADERS["reviews"])
+        rows = parse_csv(text)
+        assert {"r1", "r3"} <= {row["review_id"] for row in rows}
+        for row in rows:
+            review = sa_to_dict(db.get(Review, row["review_id"]))
+            review[C.F_CREATED_AT] = review[C.F_CREATED_AT].isoformat()
+            assert row == _csv_values(review, HEADERS["reviews"])
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import constants as C
+from app.api import stream_extract
+from app.crud import query_reviews_by_business
+from app.database import Base, is_async_url, sync_database_url
+from app.loader import bulk_insert
+from app.models import Review
+from app.schemas import HEADERS
+from app.utils import decode_cursor
+
+
+def test_sync_database_url_maps_async_drivers():
+    assert sync_database_url("sqlite+aiosqlite:////tmp/x.db") == "sqlite:////tmp/x.db"
+    assert sync_database_url("postgresql+asyncpg://u:pw@db:5432/reviews") == "postgresql+psycopg2://u:pw@db:5432/reviews"
+    assert sync_database_url("sqlite:///./reviews.db") == "sqlite:///./reviews.db"
+    assert is_async_url("sqlite+aiosqlite:///x.db") and not is_async_url("postgresql://u@h/db")
+
+
+def _seed(path, n=25):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        bulk_insert(db, Review.__table__, pd.DataFrame({
+            C.F_REVIEW_ID: [f"a{i:02d}" for i in range(n)],
+            C.F_USER_ID: "u",
+            C.F_BUSINESS_ID: "b",
+            C.F_RATING: [1 + i % 5 for i in range(n)],
+            C.F_CREATED_AT: pd.to_datetime([f"2024-01-{1 + i % 10:02d}" for i in range(n)], utc=True),
+        }))
+        db.commit()
+    return engine
+
+
+async def _drain(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def test_async_session_matches_sync_session(tmp_path):
+    path = tmp_path / "async.db"
+    sync_engine = _seed(path)
+
+    async def extract(db, **kwargs):
+        rows, next_cursor = await query_reviews_by_business(db, "b", limit=10, batch_size=4, **kwargs)
+        return await _drain(stream_extract(C.FMT_CSV, rows, HEADERS["reviews"], "x")), next_cursor
+
+    async def run_async():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(engine) as db:
+            first = await extract(db)
+            second = await extract(db, cursor=decode_cursor(first[1]))
+        await engine.dispose()
+        return first, second
+
+    def run_sync():
+        with Session(sync_engine) as db:
+            first = asyncio.run(extract(db))
+            return first, asyncio.run(extract(db, cursor=decode_cursor(first[1])))
+
+    (a_body, a_cursor), (a_body2, _) = asyncio.run(run_async())
+    (s_body, s_cursor), (s_body2, _) = run_sync()
+    assert a_body == s_body and a_body2 == s_body2 and a_body != a_body2
+    assert a_cursor == s_cursor is not None
+    assert a_body.count(b"\r\n") == 11  # header + 10 rows
+
+
+def test_app_serves_from_async_engine(tmp_path):
+    # The app binds its engines at import time, so run it in a fresh interpreter.
+    db_path = tmp_path / "app_async.db"
+    _seed(db_path, n=5)
+    script = textwrap.dedent("""
+        from fastapi.testclient import TestClient
+        from app.database import ASYNC_DB, async_engine
+        from app.main import app
+        assert ASYNC_DB and async_engine.dialect.driver == "aiosqlite"
+        with TestClient(app) as client:
+            r = client.get("/reviews/business/b", params={"limit": 3})
+            assert r.status_code == 200, r.text
+            assert r.headers["x-next-cursor"]
+            assert r.text.count("\\r\\n") == 4
+            r = client.get("/reviews/business/b", params={"format": "parquet"})
+            assert r.status_code == 200 and r.content[:4] == b"PAR1"
+            assert client.get("/users/missing").status_code == 404
+        print("ok")
+    """)
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}"}
+    out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "ok"
@@ -0,0 +1,44 @@
+import asyncio
+
+from fastapi.responses import StreamingResponse
+
+from app.cache import ResponseCache, etag_matches, make_etag, make_key
+
+
+def test_lru_respects_memory_budget_and_generation():
+    cache = ResponseCache(max_bytes=10, max_entry_bytes=6, ttl=60)
+    assert cache.put("a", 1, b"aaaa", {}) and cache.put("b", 1, b"bbbb", {})
+    assert cache.get("a", 1).body == b"aaaa"  # "a" is now most recently used
+    cache.put("c", 1, b"cccc", {})
+    assert cache.get("b", 1) is None and cache.get("a", 1) is not None
+    assert cache.stats()["bytes"] <= 10 and cache.stats()["evictions"] == 1
+    assert not cache.put("big", 1, b"x" * 7, {})
+    assert cache.get("a", 2) is None  # stale generation is dropped
+    assert cache.get("a", 1) is None
+
+
+def test_ttl_expiry():
+    cache = ResponseCache(max_bytes=100, max_entry_bytes=100, ttl=0)
+    cache.put("k", 1, b"body", {})
+    assert cache.get("k", 1) is None
+
+
+def test_capture_stores_only_complete_small_bodies():
+    cache = ResponseCache(max_bytes=100, max_entry_bytes=5, ttl=60)
+
+    async def drain(response):
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    small = cache.capture("s", 1, StreamingResponse(iter([b"ab", b"c"]), media_type="text/csv"))
+    large = cache.capture("l", 1, StreamingResponse(iter([b"abc", b"def"]), media_type="text/csv"))
+    assert asyncio.run(drain(small)) == b"abc" and asyncio.run(drain(large)) == b"abcdef"
+    assert cache.get("s", 1).body == b"abc" and cache.get("s", 1).headers["content-type"].startswith("text/csv")
+    assert cache.get("l", 1) is None
+
+
+def test_keys_and_etags():
+    assert make_key("e", "b1", {"a": 1, "b": None}) == make_key("e", "b1", {"b": None, "a": 1})
+    assert make_key("e", "b1", {"a": 1}) != make_key("e", "b2", {"a": 1})
+    etag = make_etag("k", 3)
+    assert etag_matches(f'"x", {etag}', etag) and etag_matches('"k-3"', etag) and etag_matches("*", etag)
+    assert not etag_matches(make_etag("k", 4), etag) and not etag_matches(None, etag)
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import exc, text
+
+from app import database
+from app.database import engine_options, make_engine
+from app.pool import PoolMetrics
+
+
+def test_engine_options_per_backend(monkeypatch):
+    memory = engine_options("sqlite://")
+    assert memory == {"connect_args": {"check_same_thread": False}}
+
+    on_disk = engine_options("sqlite:////tmp/x.db")
+    assert on_disk["pool_size"] == database.DB_POOL_SIZE and on_disk["pool_pre_ping"] is database.DB_POOL_PRE_PING
+
+    # The statement timeout is per API transaction, not per connection: ingest and jobs share the engine.
+    monkeypatch.setattr(database, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    assert engine_options("postgresql+psycopg2://u@h/db")["connect_args"] == {}
+    assert engine_options("postgresql+asyncpg://u@h/db")["connect_args"] == {}
+
+
+class _Connection:
+    def __init__(self, dialect_name):
+        self.dialect = type("Dialect", (), {"name": dialect_name})
+        self.statements = []
+
+    def exec_driver_sql(self, sql):
+        self.statements.append(sql)
+
+
+def test_statement_timeout_set_per_api_transaction(monkeypatch):
+    monkeypatch.setattr(database, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    postgres, sqlite = _Connection("postgresql"), _Connection("sqlite")
+    database._set_statement_timeout(None, None, postgres)
+    database._set_statement_timeout(None, None, sqlite)
+    assert postgres.statements == ["SET LOCAL statement_timeout = 1500"] and sqlite.statements == []
+
+    monkeypatch.setattr(database, "DB_STATEMENT_TIMEOUT_MS", 0)
+    database._set_statement_timeout(None, None, postgres)
+    assert len(postgres.statements) == 1
+
+    # Only API sessions carry the listener; ingest, migrations and export jobs use plain sessions.
+    assert isinstance(database.ApiSessionLocal(), database.ApiSession)
+    assert not isinstance(database.SessionLocal(), database.ApiSession)
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'p.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == database.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == database.SQLITE_CACHE_SIZE
+    engine.dispose()
+
+
+def test_pool_metrics_count_checkouts_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT", 0.05)
+    metrics = PoolMetrics("test")
+    engine = make_engine(f"sqlite:///{tmp_path / 'p.db'}", metrics)
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        stats = metrics.snapshot(engine.pool)
+        assert stats["checked_out"] == 1 and stats["size"] == 1
+    stats = metrics.snapshot(engine.pool)
+    assert stats["checkouts"] == 1 and stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.05 and stats["checked_out"] == 0
+    engine.dispose()
+
+
+def test_pool_metrics_on_in_memory_sqlite():
+    from app.metrics import render_metrics
+
+    metrics = PoolMetrics("memory")
+    engine = make_engine("sqlite://", metrics)  # SingletonThreadPool: no size/overflow to report
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    stats = metrics.snapshot(engine.pool)
+    assert "size" not in stats and stats["checkouts"] == 0 and stats["timeouts"] == 0
+    rendered = render_metrics({"memory": stats})
+    assert 'db_pool_checkouts_total{pool="memory"} 0' in rendered
+    assert 'db_pool_size{pool="memory"}' not in rendered
+    engine.dispose()
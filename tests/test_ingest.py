@@ -0,0 +1,251 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import constants as C
+from app.database import Base
+from app.loader import bulk_insert
+from app.models import Review
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    Base.metadata.create_all(engine)
+    return Session(engine)
+
+
+def test_bulk_insert_converts_columns(tmp_path):
+    df = pd.DataFrame({
+        C.F_REVIEW_ID: ["a", "b"],
+        C.F_USER_ID: ["u", "u"],
+        C.F_BUSINESS_ID: ["x", "x"],
+        C.F_RATING: [5.0, float("nan")],
+        C.F_TITLE: ["t", None],
+        C.F_CREATED_AT: pd.to_datetime(["2024-01-01T10:00:00Z", None], utc=True),
+    })
+    with _session(tmp_path) as db:
+        assert bulk_insert(db, Review.__table__, df, batch_size=1) == 2
+        db.commit()
+        rows = {r.review_id: r for r in db.scalars(select(Review))}
+    assert rows["a"].rating == 5 and isinstance(rows["a"].rating, int)
+    assert rows["b"].rating is None and rows["b"].title is None
+    assert rows["a"].created_at.isoformat() == "2024-01-01T10:00:00"
+    assert rows["b"].created_at is not None  # missing timestamp gets load time
+
+
+def test_bulk_insert_empty_frame_is_noop(tmp_path):
+    with _session(tmp_path) as db:
+        assert bulk_insert(db, Review.__table__, pd.DataFrame(columns=[C.F_REVIEW_ID])) == 0
+
+
+
+
+def test_bulk_insert_returns_keys_of_new_rows(tmp_path):
+    def frame(ids):
+        return pd.DataFrame({
+            C.F_REVIEW_ID: ids, C.F_USER_ID: "u", C.F_BUSINESS_ID: "x",
+            C.F_CREATED_AT: pd.Timestamp("2024-01-01T10:00:00Z"),
+        })
+
+    ids = [f"r{i}" for i in range(5)]
+    with _session(tmp_path) as db:
+        assert bulk_insert(db, Review.__table__, frame(["a", "b"]), returning=C.F_REVIEW_ID) == ["a", "b"]
+        new = bulk_insert(
+            db, Review.__table__, frame(["a"] + ids + ["b"]), batch_size=3, ignore_conflicts=True, returning=C.F_REVIEW_ID,
+        )
+        assert sorted(new) == ids
+        assert bulk_insert(db, Review.__table__, frame(["a"]), ignore_conflicts=True, returning=C.F_REVIEW_ID) == []
+        assert len(db.scalars(select(Review)).all()) == 7
+        assert db.get(Review, "r0").created_at.isoformat() == "2024-01-01T10:00:00"
+
+    # Without RETURNING (SQLite < 3.35) the batch's keys are compared before and after the insert
+    (tmp_path / "no_returning").mkdir()
+    with _session(tmp_path / "no_returning") as db:
+        db.get_bind().dialect.insert_returning = False
+        assert bulk_insert(db, Review.__table__, frame(["a"]), returning=C.F_REVIEW_ID) == ["a"]
+        new = bulk_insert(db, Review.__table__, frame(["a"] + ids), batch_size=4, ignore_conflicts=True, returning=C.F_REVIEW_ID)
+        assert sorted(new) == ids
+
+
+def test_conflict_ignoring_insert_per_dialect():
+    from sqlalchemy.dialects import mysql, postgresql, sqlite
+    from app.loader import conflict_ignoring_insert
+
+    for name, dialect in (("sqlite", sqlite.dialect()), ("postgresql", postgresql.dialect())):
+        assert "ON CONFLICT DO NOTHING" in str(conflict_ignoring_insert(Review.__table__, name).compile(dialect=dialect))
+    with pytest.raises(ValueError, match="not supported on 'mysql'"):
+        conflict_ignoring_insert(Review.__table__, mysql.dialect().name)
+
+def _write_source_csv(path, n, prefix="c"):
+    pd.DataFrame([
+        {
+            C.COL_REVIEW_ID: f"{prefix}{i}",
+            C.COL_REVIEWER_ID: f"{prefix}u{i % 3}",
+            C.COL_REVIEWER_NAME: "Name",
+            C.COL_EMAIL: "n@example.com",
+            C.COL_BUSINESS_ID: f"{prefix}b{i % 2}",
+            C.COL_BUSINESS_NAME: "Biz",
+            C.COL_REVIEW_RATING: 1 + i % 5,
+            C.COL_REVIEW_TITLE: "t",
+            C.COL_REVIEW_CONTENT: 'multi\nline, "quoted"',
+            C.COL_REVIEW_IP: "1.1.1.1",
+            C.COL_REVIEW_DATE: f"2024-01-{1 + i:02d}T00:00:00Z",
+        }
+        for i in range(n)
+    ]).to_csv(path, index=False)
+    return str(path)
+
+
+def test_chunked_ingest_matches_single_pass(tmp_path):
+    from app.ingest import ingest_csv
+    from app.models import Business, User
+
+    csv_path = _write_source_csv(tmp_path / "src.csv", 7)
+    with _session(tmp_path) as db:
+        meta = ingest_csv(db, csv_path, chunk_size=3)
+        assert (meta.status, meta.total_rows, meta.rows_processed, meta.loaded_rows) == ("complete", 7, 7, 7)
+        assert len(db.scalars(select(Review)).all()) == 7
+        assert len(db.scalars(select(User)).all()) == 3  # dimensions deduped across chunks
+        assert len(db.scalars(select(Business)).all()) == 2
+        assert db.get(Review, "c6").text == 'multi\nline, "quoted"'
+        # One generation per committed chunk, stamped on the chunk's reviews
+        assert meta.generation == 3
+        assert [db.get(Review, f"c{i}").ingest_generation for i in (0, 2, 3, 6)] == [1, 1, 2, 3]
+
+
+def test_chunked_ingest_resumes_from_checkpoint(tmp_path):
+    from app.ingest import compute_file_hash, ingest_csv
+    from app.metadata import IngestMetadata
+
+    csv_path = _write_source_csv(tmp_path / "src.csv", 7)
+    with _session(tmp_path) as db:
+        # Simulate a run that crashed after committing the first 4 rows' chunk
+        db.add(IngestMetadata(
+            source_path=csv_path, total_rows=4, loaded_rows=0, rows_processed=4,
+            file_hash=compute_file_hash(csv_path), status="running",
+        ))
+        db.commit()
+        meta = ingest_csv(db, csv_path, chunk_size=3)
+        assert (meta.status, meta.rows_processed, meta.loaded_rows) == ("complete", 7, 3)
+        assert sorted(db.scalars(select(Review.review_id))) == ["c4", "c5", "c6"]
+        assert len(db.scalars(select(IngestMetadata)).all()) == 1
+
+
+def test_reingest_dedupes_in_database(tmp_path):
+    from app.ingest import ingest_csv
+
+    with _session(tmp_path) as db:
+        ingest_csv(db, _write_source_csv(tmp_path / "first.csv", 4))
+        # Overlapping delivery: c0..c5, of which c0..c3 already exist
+        meta = ingest_csv(db, _write_source_csv(tmp_path / "second.csv", 6))
+        assert (meta.total_rows, meta.loaded_rows) == (6, 2)
+        assert len(db.scalars(select(Review)).all()) == 6
+
+
+def test_rating_aggregates_follow_ingest(tmp_path):
+    from app.aggregates import check, rebuild
+    from app.ingest import ingest_csv
+    from app.models import BusinessDailyRating
+
+    def buckets(db):
+        return sorted(tuple(row) for row in db.execute(select(
+            BusinessDailyRating.business_id, BusinessDailyRating.day,
+            BusinessDailyRating.rating, BusinessDailyRating.review_count,
+        )))
+
+    with _session(tmp_path) as db:
+        ingest_csv(db, _write_source_csv(tmp_path / "first.csv", 4))
+        # Overlap c0..c3 must not be counted twice; chunked loads count per chunk
+        ingest_csv(db, _write_source_csv(tmp_path / "second.csv", 6), chunk_size=4)
+        assert check(db) == []
+        incremental = buckets(db)
+        assert sum(n for *_, n in incremental) == 6
+        assert incremental[0] == ("cb0", date(2024, 1, 1), 1, 1)
+        rebuild(db)
+        assert buckets(db) == incremental
+
+
+def test_full_text_index_follows_ingest(tmp_path):
+    from app.ingest import ingest_csv
+    from app.migrate import upgrade
+
+    with _session(tmp_path) as db:
+        upgrade(db.get_bind())
+        ingest_csv(db, _write_source_csv(tmp_path / "first.csv", 4))
+        ingest_csv(db, _write_source_csv(tmp_path / "second.csv", 6), chunk_size=4)
+        conn = db.connection()
+        # Each review indexed exactly once, and the index agrees with its content table
+        assert conn.exec_driver_sql("SELECT count(*) FROM reviews_fts WHERE reviews_fts MATCH 'quoted'").scalar() == 6
+        conn.exec_driver_sql("INSERT INTO reviews_fts(reviews_fts, rank) VALUES ('integrity-check', 1)")
+
+
+def test_parallel_multi_file_ingest(tmp_path):
+    from app.ingest import expand_sources, ingest_files
+    from app.metadata import IngestMetadata
+
+    src = tmp_path / "drop"
+    src.mkdir()
+    for prefix in ("p", "q", "s"):
+        _write_source_csv(src / f"{prefix}.csv", 5, prefix=prefix)
+    paths = expand_sources([str(src)])
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["p.csv", "q.csv", "s.csv"]
+    with _session(tmp_path) as db:
+        metas = ingest_files(db, paths, workers=2)
+        assert [m.source_path for m in metas] == paths  # loaded in submission order
+        assert all(m.status == "complete" and m.loaded_rows == 5 for m in metas)
+        assert len(db.scalars(select(IngestMetadata)).all()) == 3
+        assert len(db.scalars(select(Review)).all()) == 15
+
+
+def test_reingest_of_identical_file_is_skipped(tmp_path, monkeypatch):
+    from app import ingest
+    from app.metadata import IngestMetadata
+
+    csv_path = _write_source_csv(tmp_path / "src.csv", 5)
+    with _session(tmp_path) as db:
+        first = ingest.ingest_csv(db, csv_path)
+        assert (first.file_hash, first.file_size) == (ingest.compute_file_hash(csv_path), (tmp_path / "src.csv").stat().st_size)
+
+        def no_parse(*args, **kwargs):
+            raise AssertionError("known file must not be parsed")
+
+        monkeypatch.setattr(ingest, "load_dataframe_hashed", no_parse)
+        monkeypatch.setattr(ingest, "iter_dataframes", no_parse)
+        assert ingest.ingest_csv(db, csv_path).id == first.id
+        assert ingest.ingest_csv(db, csv_path, chunk_size=2).id == first.id
+        monkeypatch.undo()
+
+        forced = ingest.ingest_csv(db, csv_path, force=True)
+        assert forced.id != first.id and forced.loaded_rows == 0
+        assert len(db.scalars(select(IngestMetadata)).all()) == 2
+
+
+def test_same_size_different_content_is_loaded(tmp_path):
+    from app.ingest import ingest_csv
+
+    a = _write_source_csv(tmp_path / "a.csv", 5, prefix="x")
+    b = _write_source_csv(tmp_path / "b.csv", 5, prefix="y")
+    assert (tmp_path / "a.csv").stat().st_size == (tmp_path / "b.csv").stat().st_size
+    with _session(tmp_path) as db:
+        ingest_csv(db, a)
+        meta = ingest_csv(db, b)
+        assert meta.loaded_rows == 5
+        assert len(db.scalars(select(Review)).all()) == 10
+
+
+def test_file_missing_key_columns_is_rejected_on_both_paths(tmp_path):
+    from app.ingest import ingest_csv
+    from app.metadata import IngestMetadata
+
+    csv_path = str(tmp_path / "no_ids.csv")
+    pd.read_csv(_write_source_csv(tmp_path / "src.csv", 4)).drop(columns=[C.COL_REVIEW_ID]).to_csv(csv_path, index=False)
+    with _session(tmp_path) as db:
+        for chunk_size in (None, 2):
+            with pytest.raises(ValueError, match=rf"Cannot ingest {csv_path}: Missing required columns: \['{C.F_REVIEW_ID}'\]"):
+                ingest_csv(db, csv_path, chunk_size=chunk_size)
+        # Rejected before a run is recorded or anything is loaded
+        assert db.scalars(select(IngestMetadata)).all() == []
+        assert db.scalars(select(Review)).all() == []
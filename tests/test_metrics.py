@@ -0,0 +1,45 @@
+from sqlalchemy import create_engine, text
+
+from app import metrics
+from app.metrics import Registry, instrument_engine, render_metrics
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("demo_requests_total", "Demo requests.", ("route",))
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    requests.inc(('/a "quoted"',), 2)
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(("/a",), value)
+    lines = registry.render()
+    assert "# TYPE demo_requests_total counter" in lines
+    assert 'demo_requests_total{route="/a \\"quoted\\""} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_sum{route="/a"} 5.55' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_snapshot_families_for_pool_and_cache():
+    pool = {"size": 5, "checked_out": 1, "overflow": -4, "checked_in": 3, "checkouts": 7, "timeouts": 0,
+            "slow_waits": 0, "wait_seconds_total": 0.25, "wait_seconds_max": 0.1}
+    cache = {"entries": 1, "bytes": 10, "max_bytes": 100, "hits": 2, "misses": 3, "evictions": 0}
+    text_ = render_metrics({"sync": pool}, cache)
+    assert 'db_pool_checked_out{pool="sync"} 1' in text_
+    assert 'db_pool_wait_seconds_total{pool="sync"} 0.25' in text_
+    assert "response_cache_hits_total 2" in text_
+
+
+def test_slow_queries_are_counted_and_logged_without_parameters(monkeypatch):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_SECONDS", 1e-9)
+    metrics.slow_queries.clear()
+    before = metrics.db_slow_queries.value((metrics.NO_ROUTE,))
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT :secret"), {"secret": "hunter2"})
+    assert metrics.db_slow_queries.value((metrics.NO_ROUTE,)) == before + 1
+    entry = metrics.slow_queries.recent()[0]
+    assert entry["statement"] == "SELECT ?" and entry["route"] == metrics.NO_ROUTE
+    assert "hunter2" not in repr(entry)
@@ -0,0 +1,84 @@
+from sqlalchemy import create_engine, inspect
+
+from app.migrate import upgrade
+
+
+def _index_names(engine, table):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+
+def test_upgrade_replaces_legacy_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        # Schema as created by earlier releases: single-column FK indexes only
+        conn.exec_driver_sql(
+            "CREATE TABLE reviews (review_id VARCHAR PRIMARY KEY, user_id VARCHAR, business_id VARCHAR, "
+            "rating INTEGER, title VARCHAR, text TEXT, ip_address VARCHAR, created_at DATETIME)"
+        )
+        conn.exec_driver_sql("CREATE INDEX ix_reviews_user_id ON reviews (user_id)")
+        conn.exec_driver_sql("CREATE INDEX ix_reviews_business_id ON reviews (business_id)")
+
+    applied = upgrade(engine)
+
+    names = _index_names(engine, "reviews")
+    assert {"ix_reviews_business_created", "ix_reviews_user_created"} <= names
+    assert not names & {"ix_reviews_user_id", "ix_reviews_business_id"}
+    assert "add_missing_columns: reviews.ingest_generation" in applied
+    assert upgrade(engine) == []  # idempotent
+
+
+def test_business_page_uses_composite_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    upgrade(engine)
+    with engine.connect() as conn:
+        plan = " ".join(
+            str(row[-1]) for row in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT * FROM reviews WHERE business_id = 'b' "
+                "ORDER BY created_at DESC, review_id DESC LIMIT 10"
+            )
+        )
+    assert "ix_reviews_business_created" in plan
+    assert "TEMP B-TREE" not in plan  # no sort step
+
+
+def test_upgrade_backfills_rating_aggregates(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pre_aggregates.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE reviews (review_id VARCHAR PRIMARY KEY, user_id VARCHAR, business_id VARCHAR, "
+            "rating INTEGER, title VARCHAR, text TEXT, ip_address VARCHAR, created_at DATETIME)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO reviews (review_id, business_id, rating, created_at) VALUES "
+            "('a', 'b', 5, '2024-01-01 10:00:00.000000'), ('b', 'b', 5, '2024-01-01 23:59:59.000000'), "
+            "('c', 'b', NULL, '2024-01-02 00:00:00.000000')"
+        )
+
+    assert "backfill_rating_aggregates: business_daily_ratings (2 buckets)" in upgrade(engine)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("SELECT day, rating, review_count FROM business_daily_ratings ORDER BY day").all()
+    assert rows == [("2024-01-01", 5, 2), ("2024-01-02", 0, 1)]
+    assert upgrade(engine) == []
+
+
+def test_upgrade_builds_full_text_index_for_existing_reviews(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pre_search.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE reviews (review_id VARCHAR PRIMARY KEY, user_id VARCHAR, business_id VARCHAR, "
+            "rating INTEGER, title VARCHAR, text TEXT, ip_address VARCHAR, created_at DATETIME)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO reviews (review_id, business_id, title, text, created_at) VALUES "
+            "('a', 'b', 'Late', 'The parcel was delivered late', '2024-01-01 10:00:00.000000'), "
+            "('b', 'b', 'Great', 'Fast delivery', '2024-01-02 10:00:00.000000')"
+        )
+
+    assert "create_search_index: reviews_fts" in upgrade(engine)
+    with engine.connect() as conn:
+        matches = conn.exec_driver_sql(
+            "SELECT reviews.review_id FROM reviews JOIN reviews_fts ON reviews_fts.rowid = reviews.rowid "
+            "WHERE reviews_fts MATCH 'deliv*' ORDER BY reviews.review_id"
+        ).scalars().all()
+    assert matches == ["a", "b"]
+    assert upgrade(engine) == []
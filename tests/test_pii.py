@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pyarrow as pa
+
+from app.constants import F_CREATED_AT, F_EMAIL, F_IP, F_USER_NAME
+from app.export import ENCODERS, iter_encoded
+from app.pii import PII_COLUMNS, compile_row_masker, mask_array, mask_email, mask_row
+from app.schemas import HEADERS
+
+EMAILS = ["alice@example.com", "nobody", "@example.com", "", None, "ølse@dk.dk", "a@b@c", "é", "x@"]
+NAMES = ["Alice Smith", "", None, "Ølse", "李雷", "B"]
+IPS = ["10.0.0.1", "", None, "::1"]
+
+
+def _rowwise(name, values):
+    fn = PII_COLUMNS[name]
+    return [fn(v) if v else v for v in values]
+
+
+def test_mask_email_without_at_sign():
+    assert mask_email("nobody") == "n***"
+    assert mask_email("@example.com") == "***@example.com"
+    assert mask_email("alice@example.com") == "a***@example.com"
+
+
+def test_compiled_row_masker_matches_dict_masking():
+    for headers in HEADERS.values():
+        mask = compile_row_masker(headers)
+        for i in range(len(EMAILS)):
+            fields = {F_EMAIL: EMAILS[i], F_USER_NAME: NAMES[i % len(NAMES)], F_IP: IPS[i % len(IPS)]}
+            row = tuple(fields.get(name, f"{name}-{i}") for name in headers)
+            expected = mask_row(dict(zip(headers, row)))
+            assert mask(row) == tuple(expected[name] for name in headers)
+
+
+def test_columnar_masks_match_row_wise():
+    for name, values in ((F_EMAIL, EMAILS), (F_USER_NAME, NAMES), (F_IP, IPS)):
+        expected = _rowwise(name, values)
+        for type_ in (pa.string(), pa.large_string()):
+            arr = pa.array(values, type_)
+            assert mask_array(name, arr).to_pylist() == expected
+            assert mask_array(name, arr.slice(1, 3)).to_pylist() == expected[1:4]
+        chunked = pa.chunked_array([values[:2], values[2:]], pa.string())
+        assert mask_array(name, chunked).to_pylist() == expected
+
+
+def test_columnar_mask_edge_arrays():
+    assert mask_array(F_EMAIL, pa.array([], pa.string())).to_pylist() == []
+    assert mask_array(F_EMAIL, pa.array([None, None])).to_pylist() == [None, None]
+    assert mask_array("review_id", pa.array(["r1"])).to_pylist() == ["r1"]
+
+
+def test_encoders_mask_pii_columns():
+    headers = ["review_id", F_USER_NAME, F_EMAIL]
+    rows = [("r1", "Alice Smith", "alice@example.com"), ("r2", None, "nobody")]
+    csv_text = b"".join(iter_encoded(ENCODERS["csv"](headers, mask_pii=True), rows)).decode()
+    assert csv_text.splitlines()[1:] == ["r1,A***,a***@example.com", "r2,,n***"]
+    created = b"".join(iter_encoded(ENCODERS["csv"]([F_EMAIL, F_CREATED_AT], mask_pii=True),
+                                    [("", datetime(2024, 1, 2))])).decode()
+    assert created.splitlines()[1:] == [",2024-01-02T00:00:00"]
+    arrow = b"".join(iter_encoded(ENCODERS["arrow"](headers, mask_pii=True), rows))
+    table = pa.ipc.open_stream(arrow).read_all()
+    assert table.column(F_EMAIL).to_pylist() == ["a***@example.com", "n***"]
+    assert table.column("review_id").to_pylist() == ["r1", "r2"]